@@ -38,6 +38,16 @@ class CompanyAdmin(admin.ModelAdmin):
                 ),
             },
         ),
+        (
+            "Photo ingest policy",
+            {
+                "fields": (
+                    "photo_max_long_edge",
+                    "photo_jpeg_quality",
+                    "photo_strip_metadata",
+                ),
+            },
+        ),
         (
             "Billing / Status",
             {
@@ -6,6 +6,7 @@ from rest_framework.views import APIView
 
 from django.contrib.auth import get_user_model
 from apps.accounts.models import Company
+from apps.accounts.usage import get_usage
 from apps.jobs.models import Job  # предполагаем, что модели jobs лежат здесь
 
 from .serializers import TrialStatusSerializer
@@ -135,14 +136,8 @@ class UsageSummaryView(APIView):
             .count()
         )
 
-        # Usage: кол-во активных клинеров
-        cleaners_count = (
-            User.objects.filter(
-                company=company,
-                role="cleaner",
-                is_active=True,
-            ).count()
-        )
+        # Usage: кол-во активных клинеров (счётчик CompanyUsage)
+        cleaners_count = get_usage(company).active_cleaners_count
 
         data = {
             "plan": company.plan,
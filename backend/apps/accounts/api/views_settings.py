@@ -9,6 +9,7 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone
 
 from apps.accounts.models import Company
+from apps.accounts.usage import get_usage
 from .serializers import (
     CurrentUserSerializer,
     UpdateProfileSerializer,
@@ -170,9 +171,8 @@ class BillingSummaryView(APIView):
             role__in=[User.ROLE_OWNER, User.ROLE_MANAGER, User.ROLE_STAFF]
         ).count()
 
-        # Count locations
-        from apps.locations.models import Location
-        locations_count = Location.objects.filter(company=company).count()
+        # Count locations (счётчик CompanyUsage)
+        locations_count = get_usage(company).locations_count
 
         # Count jobs this month
         now = timezone.now()
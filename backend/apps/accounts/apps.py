@@ -7,3 +7,7 @@ class AccountsConfig(AppConfig):
     name = "apps.accounts"
     # явный app_label, чтобы работал AUTH_USER_MODEL = "apps_accounts.User"
     label = "apps_accounts"
+
+    def ready(self):
+        # счётчики CompanyUsage (trial-лимиты / квоты)
+        from . import signals  # noqa: F401
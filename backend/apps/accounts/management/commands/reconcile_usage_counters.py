@@ -0,0 +1,71 @@
+"""
+Management command to reconcile CompanyUsage counters with actual data.
+
+Usage:
+    python manage.py reconcile_usage_counters                # Dry run (report drift only)
+    python manage.py reconcile_usage_counters --apply        # Rewrite drifted counters
+    python manage.py reconcile_usage_counters --company 42   # Single company
+
+Counters are maintained by signals (apps.accounts.signals); queryset-level
+bulk operations and raw SQL bypass them, so run this periodically.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.accounts.models import Company, CompanyUsage
+from apps.accounts.usage import USAGE_FIELDS, compute_usage, reconcile_usage
+
+
+class Command(BaseCommand):
+    help = "Recount CompanyUsage counters (jobs, active cleaners, locations, assets)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--apply",
+            action="store_true",
+            help="Actually rewrite drifted counters (default is dry-run)",
+        )
+        parser.add_argument(
+            "--company",
+            type=int,
+            help="Only reconcile this company id",
+        )
+
+    def handle(self, *args, **options):
+        apply_changes = options["apply"]
+        mode = "APPLY" if apply_changes else "DRY-RUN"
+
+        companies = Company.objects.order_by("id").values_list("id", flat=True)
+        if options["company"]:
+            companies = companies.filter(id=options["company"])
+
+        stored = {
+            usage.company_id: usage
+            for usage in CompanyUsage.objects.filter(company_id__in=companies)
+        }
+
+        drifted = 0
+        for company_id in companies.iterator():
+            actual = compute_usage(company_id)
+            usage = stored.get(company_id)
+            current = {field: getattr(usage, field) for field in USAGE_FIELDS} if usage else None
+
+            if current == actual:
+                continue
+
+            drifted += 1
+            if current is None:
+                self.stdout.write(f"Company {company_id}: no counters, actual {actual}")
+            else:
+                changes = ", ".join(
+                    f"{field} {current[field]} -> {actual[field]}"
+                    for field in USAGE_FIELDS
+                    if current[field] != actual[field]
+                )
+                self.stdout.write(f"Company {company_id}: {changes}")
+
+            if apply_changes:
+                reconcile_usage(company_id)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"[{mode}] {drifted} compan{'y' if drifted == 1 else 'ies'} with drifted counters")
+        )
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.9 on 2026-10-19 06:53
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps_accounts', '0007_add_plan_tier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='photo_jpeg_quality',
+            field=models.PositiveSmallIntegerField(default=82, validators=[django.core.validators.MinValueValidator(30), django.core.validators.MaxValueValidator(95)]),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='photo_max_long_edge',
+            field=models.PositiveIntegerField(default=2560),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='photo_strip_metadata',
+            field=models.BooleanField(default=True, help_text='Удалять EXIF/XMP из хранимого файла (ICC профиль сохраняется).'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-19 07:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps_accounts', '0008_company_photo_ingest_policy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyUsage',
+            fields=[
+                ('company', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='usage', serialize=False, to='apps_accounts.company')),
+                ('jobs_count', models.PositiveIntegerField(default=0)),
+                ('active_cleaners_count', models.PositiveIntegerField(default=0)),
+                ('locations_count', models.PositiveIntegerField(default=0)),
+                ('assets_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'company_usage',
+            },
+        ),
+    ]
@@ -2,6 +2,7 @@ from datetime import timedelta
 
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
 from django.contrib.auth.models import PermissionsMixin
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.utils import timezone
 from django.apps import apps  # 👈 добавлено для доступа к Job через apps.get_model
@@ -31,6 +32,20 @@ class Company(models.Model):
     notification_enabled = models.BooleanField(default=False)
     ramadan_mode_enabled = models.BooleanField(default=False)
 
+    # Политика хранения фото (apps.jobs.photo_processing):
+    # кадр ужимается до photo_max_long_edge по длинной стороне (0 — без ограничения)
+    # и перекодируется в JPEG с photo_jpeg_quality; EXIF координаты / время
+    # сохраняются в полях JobPhoto до перекодирования.
+    photo_max_long_edge = models.PositiveIntegerField(default=2560)
+    photo_jpeg_quality = models.PositiveSmallIntegerField(
+        default=82,
+        validators=[MinValueValidator(30), MaxValueValidator(95)],
+    )
+    photo_strip_metadata = models.BooleanField(
+        default=True,
+        help_text="Удалять EXIF/XMP из хранимого файла (ICC профиль сохраняется).",
+    )
+
     # Управление активностью компании
     is_active = models.BooleanField(
         default=True,
@@ -141,23 +156,29 @@ class Company(models.Model):
         if not self.is_trial_active:
             return False
 
-        # related_name="users" уже есть
-        return (
-            self.users.filter(role="cleaner", is_active=True).count()
-            >= self.TRIAL_MAX_CLEANERS
-        )
+        # Импортируем здесь: usage.py сам импортирует этот модуль
+        from .usage import get_usage
+
+        return get_usage(self).active_cleaners_count >= self.TRIAL_MAX_CLEANERS
 
     def trial_jobs_limit_reached(self) -> bool:
         """
         True, если на trial достигнут лимит по числу jobs.
         """
+        remaining = self.trial_jobs_remaining()
+        return remaining is not None and remaining <= 0
+
+    def trial_jobs_remaining(self):
+        """
+        Сколько jobs ещё можно создать на trial; None — лимита нет
+        (не trial или trial не активен).
+        """
         if not self.is_trial_active:
-            return False
+            return None
 
-        # Импортируем здесь, чтобы не ловить циклические импорты при загрузке моделей
-        from apps.jobs.models import Job
+        from .usage import get_usage
 
-        return Job.objects.filter(company=self).count() >= self.TRIAL_MAX_JOBS
+        return max(0, self.TRIAL_MAX_JOBS - get_usage(self).jobs_count)
 
     # -------- helpers (совместимость с существующей логикой) --------
 
@@ -399,3 +420,34 @@ class User(AbstractBaseUser, PermissionsMixin):
         current.update(kwargs)
         self.notification_preferences = current
         self.save(update_fields=["notification_preferences", "updated_at"])
+
+
+class CompanyUsage(models.Model):
+    """
+    Счётчики использования компании для trial-лимитов и квот планов.
+
+    Поддерживаются F()-инкрементами из сигналов (apps.accounts.usage),
+    поэтому проверка лимита — чтение одной строки, а не count() по таблице.
+    Строка создаётся лениво точным пересчётом; manage.py reconcile_usage_counters
+    выравнивает дрейф (bulk-операции queryset, правки в обход ORM).
+    """
+
+    company = models.OneToOneField(
+        Company,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="usage",
+    )
+
+    jobs_count = models.PositiveIntegerField(default=0)
+    active_cleaners_count = models.PositiveIntegerField(default=0)
+    locations_count = models.PositiveIntegerField(default=0)
+    assets_count = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "company_usage"
+
+    def __str__(self) -> str:
+        return f"Usage for {self.company_id}"
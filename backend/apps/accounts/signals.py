@@ -0,0 +1,83 @@
+# backend/apps/accounts/signals.py
+"""
+Поддержка CompanyUsage на create / delete / (де)активацию.
+bulk_create / queryset.update() сигналов не шлют — такие места
+вызывают adjust_usage сами (или выравнивает reconcile_usage_counters).
+"""
+from django.db.models.signals import post_delete, post_init, post_save
+
+from apps.jobs.models import Job
+from apps.locations.models import Location
+from apps.maintenance.models import Asset
+
+from .models import User
+from .usage import adjust_usage
+
+
+def _count_on_create_delete(model, field):
+    def on_save(sender, instance, created=False, raw=False, **kwargs):
+        if created and not raw:
+            adjust_usage(instance.company_id, **{field: 1})
+
+    def on_delete(sender, instance, **kwargs):
+        adjust_usage(instance.company_id, **{field: -1})
+
+    uid = f"company_usage:{model._meta.label}"
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=uid)
+
+
+for _model, _field in (
+    (Job, "jobs_count"),
+    (Location, "locations_count"),
+    (Asset, "assets_count"),
+):
+    _count_on_create_delete(_model, _field)
+
+
+# --- активные клинеры: считаем по переходам (company, role, is_active) -------
+
+
+# пользователь загружен через only()/defer() без нужных полей
+_UNKNOWN = object()
+
+
+def _cleaner_company(user):
+    # __dict__, а не атрибуты: отложенное поле в post_init стоило бы запроса
+    state = user.__dict__
+    if not {"role", "is_active", "company_id"} <= state.keys():
+        return _UNKNOWN
+    if state["role"] == User.ROLE_CLEANER and state["is_active"]:
+        return state["company_id"]
+    return None
+
+
+def _remember_cleaner_state(sender, instance, **kwargs):
+    instance._usage_cleaner_company = _cleaner_company(instance)
+
+
+def _on_user_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+
+    before = None if created else getattr(instance, "_usage_cleaner_company", None)
+    after = _cleaner_company(instance)
+    if before is _UNKNOWN or after is _UNKNOWN:
+        # неизвестное состояние — выровняет reconcile_usage_counters
+        instance._usage_cleaner_company = after
+        return
+    if before != after:
+        adjust_usage(before, active_cleaners_count=-1)
+        adjust_usage(after, active_cleaners_count=1)
+    instance._usage_cleaner_company = after
+
+
+def _on_user_delete(sender, instance, **kwargs):
+    company_id = _cleaner_company(instance)
+    if company_id is not _UNKNOWN:
+        adjust_usage(company_id, active_cleaners_count=-1)
+
+
+post_init.connect(_remember_cleaner_state, sender=User, dispatch_uid="company_usage:user_init")
+post_save.connect(_on_user_save, sender=User, dispatch_uid="company_usage:user_save")
+post_delete.connect(_on_user_delete, sender=User, dispatch_uid="company_usage:user_delete")
@@ -285,3 +285,84 @@ class TrialLimitsTestCase(TestCase):
         # Note: This would require mocking job creation endpoint
         # For now, just verify the model method
         self.assertFalse(self.company.trial_jobs_limit_reached())
+
+
+class CompanyUsageCountersTestCase(TestCase):
+    """CompanyUsage: счётчики через сигналы, O(1) проверка лимита, reconcile"""
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Usage Co")
+        # строку счётчиков создаёт первое чтение (точный пересчёт)
+        from apps.accounts.usage import get_usage
+
+        self.assertEqual(get_usage(self.company).jobs_count, 0)
+
+    def _usage(self):
+        from apps.accounts.models import CompanyUsage
+
+        return CompanyUsage.objects.get(company=self.company)
+
+    def test_counters_follow_create_delete_and_deactivation(self):
+        from apps.jobs.models import Job, Location
+
+        cleaner = User.objects.create_user(
+            email="cleaner@usage.test",
+            phone="+971501230001",
+            password="testpass123",
+            company=self.company,
+            role="cleaner",
+        )
+        location = Location.objects.create(name="Tower", company=self.company)
+        jobs = [
+            Job.objects.create(
+                company=self.company,
+                location=location,
+                cleaner=cleaner,
+                scheduled_date=timezone.now().date(),
+            )
+            for _ in range(3)
+        ]
+        jobs[0].delete()
+
+        usage = self._usage()
+        self.assertEqual(
+            (usage.jobs_count, usage.active_cleaners_count, usage.locations_count),
+            (2, 1, 1),
+        )
+
+        # last_login-only save и повторный save активного клинера не двигают счётчик
+        cleaner.last_login = timezone.now()
+        cleaner.save(update_fields=["last_login"])
+        cleaner.save()
+        self.assertEqual(self._usage().active_cleaners_count, 1)
+
+        cleaner.is_active = False
+        cleaner.save()
+        self.assertEqual(self._usage().active_cleaners_count, 0)
+
+        # проверка лимита — одна строка счётчиков, без count() по jobs
+        self.company.plan = Company.PLAN_TRIAL
+        self.company.trial_started_at = timezone.now() - timedelta(days=1)
+        self.company.trial_expires_at = timezone.now() + timedelta(days=6)
+        with self.assertNumQueries(1):
+            self.assertFalse(self.company.trial_jobs_limit_reached())
+
+    def test_reconcile_command_fixes_drift(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from apps.accounts.models import CompanyUsage
+        from apps.jobs.models import Location
+
+        Location.objects.create(name="Tower", company=self.company)
+        # обход сигналов: счётчик уезжает
+        CompanyUsage.objects.filter(company=self.company).update(locations_count=7)
+
+        out = StringIO()
+        call_command("reconcile_usage_counters", stdout=out)
+        self.assertIn("locations_count 7 -> 1", out.getvalue())
+        self.assertEqual(self._usage().locations_count, 7)
+
+        call_command("reconcile_usage_counters", "--apply", stdout=StringIO())
+        self.assertEqual(self._usage().locations_count, 1)
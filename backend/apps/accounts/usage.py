@@ -0,0 +1,83 @@
+# backend/apps/accounts/usage.py
+"""
+Счётчики CompanyUsage: чтение за O(1) и атомарные изменения.
+
+- get_usage(company) — строка счётчиков; нет строки — точный пересчёт;
+- lock_usage(company) — то же под SELECT ... FOR UPDATE (проверка лимита
+  и создание джоб одной транзакцией);
+- adjust_usage(company_id, jobs_count=+1, ...) — F()-инкремент в той же
+  транзакции, что и изменение данных; нет строки — ничего не делаем
+  (её создаст пересчёт при первом чтении);
+- reconcile_usage(company_id) — пересчёт count()-запросами.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import CompanyUsage, User
+
+USAGE_FIELDS = ("jobs_count", "active_cleaners_count", "locations_count", "assets_count")
+
+
+def compute_usage(company_id) -> dict:
+    # локальные импорты: jobs / locations / maintenance сами импортируют accounts
+    from apps.jobs.models import Job
+    from apps.locations.models import Location
+    from apps.maintenance.models import Asset
+
+    return {
+        "jobs_count": Job.objects.filter(company_id=company_id).count(),
+        "active_cleaners_count": User.objects.filter(
+            company_id=company_id,
+            role=User.ROLE_CLEANER,
+            is_active=True,
+        ).count(),
+        "locations_count": Location.objects.filter(company_id=company_id).count(),
+        "assets_count": Asset.objects.filter(company_id=company_id).count(),
+    }
+
+
+def reconcile_usage(company_id) -> CompanyUsage:
+    counts = compute_usage(company_id)
+    usage, _ = CompanyUsage.objects.update_or_create(company_id=company_id, defaults=counts)
+    return usage
+
+
+def get_usage(company) -> CompanyUsage:
+    usage = CompanyUsage.objects.filter(company_id=company.pk).first()
+    if usage is not None:
+        return usage
+
+    try:
+        with transaction.atomic():
+            return reconcile_usage(company.pk)
+    except IntegrityError:
+        # параллельный запрос создал строку первым
+        return CompanyUsage.objects.get(company_id=company.pk)
+
+
+def lock_usage(company) -> CompanyUsage:
+    """
+    Строка счётчиков под блокировкой до конца транзакции: параллельные
+    создатели джоб одной компании ждут друг друга и видят свежий jobs_count.
+    Вызывать внутри transaction.atomic().
+    """
+    get_usage(company)
+    return CompanyUsage.objects.select_for_update().get(company_id=company.pk)
+
+
+def adjust_usage(company_id, **deltas) -> None:
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not company_id or not deltas:
+        return
+
+    unknown = set(deltas) - set(USAGE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown usage counters: {', '.join(sorted(unknown))}")
+
+    # Greatest: дрейф не должен уронить удаление на CHECK >= 0
+    CompanyUsage.objects.filter(company_id=company_id).update(
+        updated_at=timezone.now(),
+        **{field: Greatest(F(field) + delta, Value(0)) for field, delta in deltas.items()},
+    )
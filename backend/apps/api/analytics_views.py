@@ -88,7 +88,7 @@ def _calculate_summary_for_range(company, date_from, date_to):
         on_time_numerator += 1
 
     # --- proof flags: before/after + checklist ---
-    photos = list(job.photos.all())
+    photos = [p for p in job.photos.all() if p.is_ready]
     before_uploaded = any(p.photo_type == JobPhoto.TYPE_BEFORE for p in photos)
     after_uploaded = any(p.photo_type == JobPhoto.TYPE_AFTER for p in photos)
 
@@ -631,7 +631,7 @@ def analytics_proof_completion(request):
     bucket["total"] += 1
 
     # --- proof: before / after ---
-    photos = list(job.photos.all())
+    photos = [p for p in job.photos.all() if p.is_ready]
     before_uploaded = any(p.photo_type == JobPhoto.TYPE_BEFORE for p in photos)
     after_uploaded = any(p.photo_type == JobPhoto.TYPE_AFTER for p in photos)
 
@@ -5,3 +5,7 @@ class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.api"
     label = "apps_api"
+
+    def ready(self):
+        # bump ResourceVersion для conditional GET console-списков
+        from . import signals  # noqa: F401
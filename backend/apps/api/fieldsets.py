@@ -0,0 +1,56 @@
+# backend/apps/api/fieldsets.py
+"""
+Sparse fieldsets для списков jobs: ?fields=id,status,location
+
+Каждый endpoint описывает, какие связи нужны каждому полю payload
+(FIELD_REQUIREMENTS). Queryset собирается только из запрошенных полей:
+незапрошенные связи не джойнятся и не префетчатся, а payload-билдер
+их не трогает.
+"""
+from typing import Iterable, Mapping, Optional
+
+
+class FieldsetError(ValueError):
+    pass
+
+
+def parse_fields(raw: Optional[str], allowed: Iterable[str]) -> Optional[frozenset]:
+    """
+    None — параметр не передан (полный payload).
+    Неизвестное поле — FieldsetError (опечатка не должна молча давать пустой ответ).
+    """
+    if raw is None:
+        return None
+
+    fields = frozenset(name.strip() for name in raw.split(",") if name.strip())
+    if not fields:
+        return None
+
+    unknown = sorted(fields - set(allowed))
+    if unknown:
+        raise FieldsetError(f"Unknown fields: {', '.join(unknown)}.")
+    return fields
+
+
+def apply_field_requirements(qs, fields: Optional[frozenset], requirements: Mapping[str, Mapping]):
+    """
+    requirements: {"location": {"select": ("location",)}, "proof": {"prefetch": ("photos",)}}
+    """
+    selected = set()
+    prefetched = set()
+
+    for name, needs in requirements.items():
+        if fields is not None and name not in fields:
+            continue
+        selected.update(needs.get("select", ()))
+        prefetched.update(needs.get("prefetch", ()))
+
+    if selected:
+        qs = qs.select_related(*sorted(selected))
+    if prefetched:
+        qs = qs.prefetch_related(*sorted(prefetched))
+    return qs
+
+
+def wants(fields: Optional[frozenset], *names: str) -> bool:
+    return fields is None or any(name in fields for name in names)
@@ -0,0 +1,113 @@
+"""
+Benchmark JSON rendering of large list payloads.
+
+Compares DRF's JSONRenderer, FastJSONRenderer (orjson) and the streaming
+list response on synthetic rows shaped like build_planning_job_payload
+(dates, times, datetimes, Decimals, nested dicts). Reports latency and
+peak Python memory (tracemalloc) per renderer.
+
+Usage:
+    python manage.py benchmark_json_render
+    python manage.py benchmark_json_render --rows 10000 --iterations 5
+"""
+import statistics
+import time
+import tracemalloc
+from datetime import date, datetime, time as dt_time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rest_framework.renderers import JSONRenderer
+
+from apps.api.renderers import ORJSON_AVAILABLE, FastJSONRenderer, iter_json_list
+
+
+class Command(BaseCommand):
+    help = "Benchmark JSON rendering latency and peak memory on large list payloads"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=10000,
+            help="Rows per payload (default: 10000)",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=5,
+            help="Renders per renderer (default: 5)",
+        )
+
+    def handle(self, *args, **options):
+        if not ORJSON_AVAILABLE:
+            raise CommandError("orjson is not installed — FastJSONRenderer falls back to JSONRenderer")
+
+        rows = max(1, options["rows"])
+        iterations = max(1, options["iterations"])
+        self.stdout.write(f"Rows: {rows}, iterations: {iterations}")
+
+        drf = JSONRenderer()
+        fast = FastJSONRenderer()
+
+        # Строки строятся внутри замера: streaming их не держит в памяти,
+        # list-рендереры получают готовый список (как Response(data)).
+        cases = {
+            "drf": lambda: drf.render(list(self._rows(rows))),
+            "orjson": lambda: fast.render(list(self._rows(rows))),
+            "streaming": lambda: sum(len(chunk) for chunk in iter_json_list(self._rows(rows))),
+        }
+
+        reference = drf.render(list(self._rows(rows)))
+        if fast.render(list(self._rows(rows))) != reference:
+            self.stdout.write(self.style.WARNING("orjson output differs from JSONRenderer"))
+
+        for name, render in cases.items():
+            timings, peak = self._run(render, iterations)
+            timings_ms = sorted(t * 1000 for t in timings)
+            self.stdout.write(
+                f"{name:>10}: mean={statistics.mean(timings_ms):.1f}ms "
+                f"p50={statistics.median(timings_ms):.1f}ms "
+                f"peak={peak / (1024 * 1024):.1f}MB n={len(timings_ms)}"
+            )
+
+    def _run(self, render, iterations):
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            render()
+            timings.append(time.perf_counter() - started)
+
+        # память — отдельным прогоном: tracemalloc сильно замедляет аллокации
+        tracemalloc.start()
+        try:
+            render()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return timings, peak
+
+    def _rows(self, count):
+        base_day = date(2026, 1, 1)
+        created = datetime(2026, 1, 1, 8, 30, tzinfo=dt_timezone.utc)
+        for i in range(count):
+            yield {
+                "id": i + 1,
+                "scheduled_date": base_day + timedelta(days=i % 180),
+                "scheduled_start_time": dt_time(8 + i % 10, 30),
+                "scheduled_end_time": dt_time(10 + i % 10, 0),
+                "status": "completed" if i % 3 else "scheduled",
+                "location": {"id": i % 50, "name": f"Location {i % 50}", "address": "Dubai Marina, Dubai, UAE"},
+                "cleaner": {"id": i % 20, "full_name": f"Cleaner {i % 20}"},
+                "proof": {
+                    "before_uploaded": True,
+                    "after_uploaded": bool(i % 2),
+                    "checklist_completed": bool(i % 5),
+                },
+                "sla_status": "ok" if i % 2 else "violated",
+                "sla_reasons": [] if i % 2 else ["missing_after_photo"],
+                "checklist_items": ["Vacuum all floors", "Mop hard floors", "Empty bins"],
+                "price": Decimal("149.90"),
+                "created_at": created + timedelta(minutes=i),
+            }
@@ -0,0 +1,37 @@
+"""
+Delete JobSyncTombstone rows older than the sync tombstone TTL.
+
+/api/jobs/sync/ answers a since token older than SYNC_TOMBSTONE_TTL with
+a full resync, so older tombstones are never read again.
+
+Usage:
+    python manage.py prune_sync_tombstones
+    python manage.py prune_sync_tombstones --dry-run
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.api.models import JobSyncTombstone
+from apps.api.views_cleaner import SYNC_TOMBSTONE_TTL
+
+
+class Command(BaseCommand):
+    help = "Delete job sync tombstones older than the sync TTL"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count tombstones that would be deleted",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - SYNC_TOMBSTONE_TTL
+        stale = JobSyncTombstone.objects.filter(created_at__lt=cutoff)
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"[DRY-RUN] {stale.count()} tombstones would be deleted"))
+            return
+
+        deleted, _ = stale.delete()
+        self.stdout.write(self.style.SUCCESS(f"[APPLY] {deleted} tombstones deleted"))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-19 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps_api', '0002_alter_accessauditlog_action'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResourceVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('company_id', models.PositiveIntegerField()),
+                ('family', models.CharField(max_length=32)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'resource_versions',
+                'constraints': [models.UniqueConstraint(fields=('company_id', 'family'), name='uniq_resource_version_company_family')],
+            },
+        ),
+    ]
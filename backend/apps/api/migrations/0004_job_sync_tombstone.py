@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-19 07:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps_api', '0003_resource_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSyncTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.PositiveBigIntegerField()),
+                ('cleaner_id', models.PositiveBigIntegerField()),
+                ('scheduled_date', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'job_sync_tombstones',
+                'indexes': [models.Index(fields=['cleaner_id', 'created_at'], name='job_tombstone_cleaner_idx'), models.Index(fields=['created_at'], name='job_tombstone_created_idx')],
+            },
+        ),
+    ]
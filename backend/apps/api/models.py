@@ -77,3 +77,63 @@ class AccessAuditLog(models.Model):
     def __str__(self) -> str:
         performer = self.performed_by.full_name if self.performed_by else "System"
         return f"{self.get_action_display()} - {self.cleaner.full_name} by {performer}"
+
+
+class ResourceVersion(models.Model):
+    """
+    Счётчик изменений семейства ресурсов компании (locations, assets, ...).
+
+    Увеличивается сигналами на save/delete (apps.api.signals) в той же
+    транзакции, что и само изменение. Conditional GET (resource_versions.
+    conditional_on) строит ETag / Last-Modified из этих строк и отвечает 304,
+    не читая основные таблицы.
+
+    company_id без FK: bump при каскадном удалении компании не должен
+    ссылаться на удаляемую строку.
+    """
+
+    company_id = models.PositiveIntegerField()
+    family = models.CharField(max_length=32)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "resource_versions"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["company_id", "family"],
+                name="uniq_resource_version_company_family",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.company_id}:{self.family} v{self.version}"
+
+
+class JobSyncTombstone(models.Model):
+    """
+    Джоба ушла из вида клинера: переназначена, перенесена на другую дату
+    или удалена. cleaner_id / scheduled_date — где она была видна до этого.
+
+    Пишется сигналами (apps.api.signals) в транзакции изменения;
+    /api/jobs/sync/?since=... строит из этих строк removed_ids. Строки
+    старше SYNC_TOMBSTONE_TTL удаляет manage.py prune_sync_tombstones,
+    более старый since получает полную выдачу окна (full_resync).
+
+    Без FK: джоба к моменту чтения может быть уже удалена.
+    """
+
+    job_id = models.PositiveBigIntegerField()
+    cleaner_id = models.PositiveBigIntegerField()
+    scheduled_date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "job_sync_tombstones"
+        indexes = [
+            models.Index(fields=["cleaner_id", "created_at"], name="job_tombstone_cleaner_idx"),
+            models.Index(fields=["created_at"], name="job_tombstone_created_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Job {self.job_id} left cleaner {self.cleaner_id} ({self.scheduled_date})"
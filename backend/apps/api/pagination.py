@@ -0,0 +1,143 @@
+# backend/apps/api/pagination.py
+"""
+Keyset (cursor) пагинация для больших списков.
+
+Страница N стоит столько же, сколько страница 1: вместо OFFSET фильтруем
+по значениям ключа сортировки последней строки предыдущей страницы.
+Курсор — непрозрачная base64-строка, клиент его не разбирает.
+
+Все поля ключа сортируются по убыванию, NULL — первыми (поведение
+Postgres для DESC по умолчанию, так совпадает с обычным индексом).
+"""
+import base64
+import json
+from datetime import date, time
+from typing import Optional, Sequence
+
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class CursorError(ValueError):
+    pass
+
+
+def parse_page_size(raw, default: int = DEFAULT_PAGE_SIZE, maximum: int = MAX_PAGE_SIZE) -> int:
+    try:
+        size = int(raw)
+    except (TypeError, ValueError):
+        return default
+    if size < 1:
+        return default
+    return min(size, maximum)
+
+
+def keyset_ordering(fields: Sequence[str]) -> list:
+    return [F(name).desc(nulls_first=True) for name in fields]
+
+
+def _encode_value(value):
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(obj, fields: Sequence[str]) -> str:
+    values = [_encode_value(getattr(obj, name)) for name in fields]
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, fields: Sequence[str], parsers: Sequence) -> list:
+    """
+    parsers — по одному на поле: str -> значение (date.fromisoformat, int, ...).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(fields):
+            raise CursorError("Invalid cursor.")
+        return [
+            None if value is None else parse(value)
+            for value, parse in zip(values, parsers)
+        ]
+    except (ValueError, TypeError, UnicodeError) as exc:
+        raise CursorError("Invalid cursor.") from exc
+
+
+def keyset_after(fields: Sequence[str], values: Sequence) -> Q:
+    """
+    Строки строго после (values) в порядке keyset_ordering(fields).
+
+    (a, b, c) после (va, vb, vc) ⇔
+        a after va
+        OR (a = va AND b after vb)
+        OR (a = va AND b = vb AND c after vc)
+    """
+    condition = Q(pk__in=[])
+    prefix = Q()
+
+    for name, value in zip(fields, values):
+        if value is None:
+            # NULL первыми: после NULL идут все не-NULL значения
+            after = Q(**{f"{name}__isnull": False})
+            equal = Q(**{f"{name}__isnull": True})
+        else:
+            after = Q(**{f"{name}__lt": value})
+            equal = Q(**{name: value})
+        condition |= prefix & after
+        prefix &= equal
+
+    return condition
+
+
+def estimate_count(qs) -> int:
+    """
+    Дешёвая оценка числа строк: на Postgres — из плана (EXPLAIN),
+    без прохода по данным; на остальных БД — обычный COUNT.
+    """
+    if connection.vendor != "postgresql":
+        return qs.count()
+
+    sql, params = qs.order_by().values("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def paginate_keyset(qs, fields: Sequence[str], parsers: Sequence, cursor: Optional[str], page_size: int):
+    """
+    (rows, next_cursor). qs уже отфильтрован; сортировку задаём здесь.
+    Бросает CursorError на битый курсор.
+    """
+    qs = qs.order_by(*keyset_ordering(fields))
+    if cursor:
+        qs = qs.filter(keyset_after(fields, decode_cursor(cursor, fields, parsers)))
+
+    rows = list(qs[: page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1], fields)
+    return rows, next_cursor
+
+
+def parse_sync_token(value: str):
+    """
+    sync_token delta-ответов (ISO datetime, выданный сервером).
+    "+" в query без кодирования приходит пробелом. None — невалидный токен.
+    """
+    parsed = parse_datetime(value.replace(" ", "+"))
+    if parsed is None:
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
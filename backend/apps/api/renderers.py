@@ -0,0 +1,94 @@
+# backend/apps/api/renderers.py
+"""
+Быстрый JSON для больших списков.
+
+FastJSONRenderer — замена rest_framework.renderers.JSONRenderer на orjson:
+datetime / date / time / UUID кодируются в C, остальное (Decimal, lazy-строки,
+QuerySet, ...) — тем же DRF JSONEncoder.default, поэтому вывод совпадает
+с JSONRenderer. Без orjson — обычный JSONRenderer.
+
+StreamingJSONListResponse — список, который пишется в ответ по мере обхода
+queryset (payload всех строк не собирается в памяти целиком).
+"""
+from django.http import StreamingHttpResponse
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson  # type: ignore
+
+    ORJSON_AVAILABLE = True
+except ImportError:  # pragma: no cover - orjson опционален
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+_drf_encoder = JSONEncoder()
+
+if ORJSON_AVAILABLE:
+    # UTC -> "Z", как у DRF; int-ключи словарей -> строки, как у json.dumps
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+else:
+    ORJSON_OPTIONS = 0
+
+
+def dumps(data, indent: bool = False) -> bytes:
+    if not ORJSON_AVAILABLE:
+        return JSONRenderer().render(data, renderer_context={"indent": 2 if indent else None})
+
+    options = ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+    out = orjson.dumps(data, default=_drf_encoder.default, option=options)
+    # как JSONRenderer: U+2028 / U+2029 экранируем (валидный JSON, но не JS)
+    return out.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Подключается в REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] вместо JSONRenderer
+    (тот же media_type / format — content negotiation не меняется).
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not ORJSON_AVAILABLE:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        return dumps(data, indent=bool(indent))
+
+
+def iter_json_list(rows, chunk_size: int = 200):
+    """
+    Итератор байтов JSON-массива: "[" + элементы через "," + "]".
+    Элементы склеиваются пачками по chunk_size, чтобы не отдавать
+    WSGI-серверу по одному мелкому куску на строку.
+    """
+    yield b"["
+    buffer = []
+    first = True
+    for row in rows:
+        encoded = dumps(row)
+        buffer.append(encoded if first else b"," + encoded)
+        first = False
+        if len(buffer) >= chunk_size:
+            yield b"".join(buffer)
+            buffer = []
+    if buffer:
+        yield b"".join(buffer)
+    yield b"]"
+
+
+class StreamingJSONListResponse(StreamingHttpResponse):
+    """
+    rows — итерируемое dict-ов (обычно генератор поверх qs.iterator()).
+    Обход идёт при отдаче ответа, поэтому ошибки сериализации после
+    первого куска уже не превратятся в 500 — rows должны быть готовы к JSON.
+    """
+
+    def __init__(self, rows, status=200, chunk_size: int = 200, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(iter_json_list(rows, chunk_size), status=status, **kwargs)
@@ -0,0 +1,128 @@
+# backend/apps/api/resource_versions.py
+"""
+Conditional GET для console-списков по счётчику изменений компании.
+
+Каждый список зависит от нескольких семейств ресурсов (FAMILY_*).
+Любой save/delete модели семейства увеличивает ResourceVersion
+(company, family) — см. apps.api.signals. Декоратор conditional_on
+строит ETag / Last-Modified из версий одним запросом к resource_versions
+и отвечает 304, не вызывая сам view.
+"""
+import hashlib
+from functools import wraps
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import ResourceVersion
+
+FAMILY_USERS = "users"
+FAMILY_LOCATIONS = "locations"
+FAMILY_CHECKLISTS = "checklists"
+FAMILY_ASSETS = "assets"
+FAMILY_MAINTENANCE_CATEGORIES = "maintenance_categories"
+FAMILY_RECURRING = "recurring"
+FAMILY_CONTRACTS = "contracts"
+
+
+def bump_resource_version(company_id, family: str) -> None:
+    if not company_id:
+        return
+
+    updated = ResourceVersion.objects.filter(company_id=company_id, family=family).update(
+        version=F("version") + 1,
+        updated_at=timezone.now(),
+    )
+    if updated:
+        return
+
+    try:
+        with transaction.atomic():
+            ResourceVersion.objects.create(company_id=company_id, family=family, version=1)
+    except IntegrityError:
+        # параллельный bump создал строку первым
+        ResourceVersion.objects.filter(company_id=company_id, family=family).update(
+            version=F("version") + 1,
+            updated_at=timezone.now(),
+        )
+
+
+def get_resource_stamp(company_id, families) -> tuple[str, object]:
+    """
+    (stamp, last_modified). stamp меняется при любом изменении семейств;
+    last_modified — None, пока ни одно семейство не менялось.
+    """
+    rows = dict(
+        (family, (version, updated_at))
+        for family, version, updated_at in ResourceVersion.objects.filter(
+            company_id=company_id, family__in=families
+        ).values_list("family", "version", "updated_at")
+    )
+
+    parts = []
+    last_modified = None
+    for family in sorted(families):
+        version, updated_at = rows.get(family, (0, None))
+        parts.append(f"{family}={version}")
+        if updated_at is not None and (last_modified is None or updated_at > last_modified):
+            last_modified = updated_at
+
+    return ",".join(parts), last_modified
+
+
+def _not_modified(request, etag: str, last_modified) -> bool:
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        return etag in parse_etags(if_none_match)
+
+    if_modified_since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE", ""))
+    if if_modified_since is not None and last_modified is not None:
+        return int(last_modified.timestamp()) <= if_modified_since
+    return False
+
+
+def conditional_on(*families: str):
+    """
+    Декоратор GET-метода APIView:
+
+        @conditional_on(FAMILY_ASSETS, FAMILY_LOCATIONS)
+        def get(self, request): ...
+
+    ETag зависит от версий семейств, пользователя (ответы бывают
+    персональными, напр. is_current_user), полного пути с query и даты
+    (warranty_status / is_expired считаются от сегодняшнего дня).
+    Пользователь без компании — без conditional-логики.
+    """
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            company_id = getattr(request.user, "company_id", None)
+            if not company_id:
+                return view_method(self, request, *args, **kwargs)
+
+            stamp, last_modified = get_resource_stamp(company_id, families)
+            raw = f"{stamp}:{timezone.localdate().isoformat()}:{request.user.pk}:{request.get_full_path()}"
+            etag = '"%s"' % hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+            if _not_modified(request, etag, last_modified):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+
+            response["ETag"] = etag
+            response["Cache-Control"] = "private, no-cache"
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified.timestamp())
+            return response
+
+        return wrapper
+
+    return decorator
@@ -1,9 +1,12 @@
 # backend/apps/api/serializers.py
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.urls import reverse
 from rest_framework import serializers
 
-from apps.jobs.models import Job, JobChecklistItem, JobCheckEvent, JobPhoto
-from apps.locations.models import Location, ChecklistTemplate, ChecklistTemplateItem
+from apps.jobs.models import Job, JobChecklistItem, JobCheckEvent, JobPhoto, RecurringJobSchedule
+from apps.jobs.photo_storage import storage_path_from_url
+from apps.locations.models import Location, ChecklistTemplate
 from apps.marketing.models import ReportEmailLog
 from apps.maintenance.models import Asset, MaintenanceCategory
 
@@ -62,8 +65,8 @@ def compute_sla_reasons_for_job(job):
     Возвращает список причин нарушения SLA для конкретной job.
 
     Кодовые значения:
-    - "missing_before_photo"      — нет фото "до"
-    - "missing_after_photo"       — нет фото "после"
+    - "missing_before_photo"      — нет обработанного (ready) фото "до"
+    - "missing_after_photo"       — нет обработанного (ready) фото "после"
     - "checklist_not_completed"   — чеклист не полностью закрыт
 
     Функция не меняет данных в БД, только читает связанные объекты.
@@ -76,12 +79,16 @@ def compute_sla_reasons_for_job(job):
         return reasons
 
     # 1) Фото "до"
-    has_before = JobPhoto.objects.filter(job=job, photo_type="before").exists()
+    has_before = JobPhoto.objects.filter(
+        job=job, photo_type="before", processing_status=JobPhoto.STATUS_READY
+    ).exists()
     if not has_before:
         reasons.append("missing_before_photo")
 
     # 2) Фото "после"
-    has_after = JobPhoto.objects.filter(job=job, photo_type="after").exists()
+    has_after = JobPhoto.objects.filter(
+        job=job, photo_type="after", processing_status=JobPhoto.STATUS_READY
+    ).exists()
     if not has_after:
         reasons.append("missing_after_photo")
 
@@ -98,6 +105,40 @@ def compute_sla_reasons_for_job(job):
     return reasons
 
 
+def _absolute_media_url(url, request=None):
+    if url and getattr(settings, "MEDIA_PROTECTED_URLS", False):
+        # раздача через /api/media/<key> с проверкой компании (views_media)
+        key = storage_path_from_url(url)
+        if key:
+            url = reverse("media-file", kwargs={"key": key})
+
+    if url and isinstance(url, str) and url.startswith("/") and request is not None:
+        return request.build_absolute_uri(url)
+    return url or None
+
+
+def build_job_photo_payload(photo, request=None) -> dict:
+    """
+    Единый payload фото для cleaner/manager API:
+    оригинал + превью (thumb_url / medium_url, None пока не сгенерированы),
+    processing_status: pending | ready | rejected.
+    """
+    file_obj = getattr(photo, "file", None)
+
+    return {
+        "photo_type": photo.photo_type,
+        "processing_status": photo.processing_status,
+        "processing_error": photo.processing_error or None,
+        "file_url": _absolute_media_url(getattr(file_obj, "file_url", None), request),
+        "thumb_url": _absolute_media_url(getattr(file_obj, "thumb_url", None), request),
+        "medium_url": _absolute_media_url(getattr(file_obj, "medium_url", None), request),
+        "latitude": photo.latitude,
+        "longitude": photo.longitude,
+        "photo_timestamp": photo.photo_timestamp,
+        "created_at": photo.created_at,
+    }
+
+
 class JobCheckInSerializer(serializers.Serializer):
     """
     Сериализатор для check-in / check-out клинера.
@@ -144,6 +185,7 @@ class JobDetailSerializer(serializers.ModelSerializer):
 
     checklist_items = JobChecklistItemSerializer(many=True, read_only=True)
     check_events = JobCheckEventSerializer(many=True, read_only=True)
+    photos = serializers.SerializerMethodField()
 
     sla_status = serializers.SerializerMethodField()
 
@@ -163,9 +205,15 @@ class JobDetailSerializer(serializers.ModelSerializer):
             "cleaner_notes",
             "checklist_items",
             "check_events",
+            "photos",
             "sla_status",
         )
 
+    def get_photos(self, obj):
+        request = self.context.get("request")
+        photos = sorted(obj.photos.all(), key=lambda p: (p.photo_type, p.id))
+        return [build_job_photo_payload(p, request) for p in photos]
+
     def get_location(self, obj):
         loc = getattr(obj, "location", None)
         if not loc:
@@ -204,6 +252,36 @@ class ChecklistBulkUpdateSerializer(serializers.Serializer):
         return items
 
 
+class JobMutationOperationSerializer(serializers.Serializer):
+    """
+    Одна операция офлайн-батча клинера (POST /api/jobs/<id>/mutations/).
+    payload — тело соответствующего одиночного endpoint'а.
+    """
+    TYPES = ("check_in", "checklist_toggle", "checklist_bulk", "check_out")
+
+    key = serializers.CharField(max_length=64)
+    type = serializers.ChoiceField(choices=TYPES)
+    device_timestamp = serializers.DateTimeField(required=False, allow_null=True, default=None)
+    payload = serializers.DictField(required=False, default=dict)
+
+
+class JobMutationBatchSerializer(serializers.Serializer):
+    operations = JobMutationOperationSerializer(many=True)
+
+    def validate_operations(self, operations):
+        if not operations:
+            raise serializers.ValidationError("operations must be a non-empty list")
+
+        max_operations = self.context.get("max_operations")
+        if max_operations and len(operations) > max_operations:
+            raise serializers.ValidationError(f"At most {max_operations} operations per batch")
+
+        keys = [op["key"] for op in operations]
+        if len(keys) != len(set(keys)):
+            raise serializers.ValidationError("Operation keys must be unique within a batch")
+        return operations
+
+
 class JobPhotoUploadSerializer(serializers.Serializer):
     """
     Upload job photo (before / after).
@@ -212,9 +290,30 @@ class JobPhotoUploadSerializer(serializers.Serializer):
     file = serializers.FileField()
 
 
+class JobPhotoUploadSlotSerializer(serializers.Serializer):
+    """
+    Запрос presigned upload slot (direct-to-storage, только JPEG).
+    """
+    photo_type = serializers.ChoiceField(choices=["before", "after"])
+    content_type = serializers.ChoiceField(choices=["image/jpeg"])
+    size_bytes = serializers.IntegerField(min_value=1)
+    sha256 = serializers.RegexField(r"^[0-9a-fA-F]{64}$")
+
+    def validate_sha256(self, value):
+        return value.lower()
+
+
+class JobPhotoFinalizeSerializer(serializers.Serializer):
+    token = serializers.CharField()
+
+
 class JobPhotoSerializer(serializers.Serializer):
     photo_type = serializers.CharField()
+    processing_status = serializers.CharField()
+    processing_error = serializers.CharField(allow_null=True)
     file_url = serializers.CharField()
+    thumb_url = serializers.CharField(allow_null=True)
+    medium_url = serializers.CharField(allow_null=True)
     latitude = serializers.FloatField(allow_null=True)
     longitude = serializers.FloatField(allow_null=True)
     photo_timestamp = serializers.DateTimeField(allow_null=True)
@@ -360,6 +459,7 @@ class ManagerJobCreateSerializer(serializers.Serializer):
             scheduled_start_time=validated_data.get("scheduled_start_time"),
             scheduled_end_time=validated_data.get("scheduled_end_time"),
             status="scheduled",
+            checklist_template=template,
             asset=asset,
             maintenance_category=maintenance_category,
             context=context,
@@ -368,22 +468,105 @@ class ManagerJobCreateSerializer(serializers.Serializer):
             priority=validated_data.get("priority", Job.PRIORITY_LOW),
             sla_deadline=validated_data.get("sla_deadline"),
         )
+        # snapshot пунктов шаблона делает Job.save()
+
+        return job
 
-        if template:
-            template_items = ChecklistTemplateItem.objects.filter(
-                template=template
-            ).order_by("order", "id")
-
-            for item in template_items:
-                JobChecklistItem.objects.create(
-                    job=job,
-                    order=getattr(item, "order", 0),
-                    text=getattr(item, "text", ""),
-                    is_required=getattr(item, "is_required", False),
-                    is_completed=False,
+
+class ManagerJobBulkRowSerializer(ManagerJobCreateSerializer):
+    """
+    Строка bulk-создания jobs: только формат полей.
+    Ссылки (location, cleaner, template, asset, category) проверяет
+    ManagerJobsBulkCreateView — одним запросом на тип для всего батча.
+    """
+
+    def validate(self, attrs):
+        return attrs
+
+
+class RecurringJobScheduleSerializer(serializers.ModelSerializer):
+    """
+    Регулярная уборка (/api/manager/recurring-jobs/).
+
+    location_id / cleaner_id / checklist_template_id проверяются в
+    компании менеджера; правило: weekly + weekdays (0 = пн … 6 = вс)
+    или monthly + month_day, каждые interval недель / месяцев.
+    """
+    location_id = serializers.IntegerField()
+    cleaner_id = serializers.IntegerField()
+    checklist_template_id = serializers.IntegerField(required=False, allow_null=True)
+
+    interval = serializers.IntegerField(min_value=1, max_value=52, required=False)
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6),
+        required=False,
+    )
+    month_day = serializers.IntegerField(min_value=1, max_value=31, required=False, allow_null=True)
+
+    class Meta:
+        model = RecurringJobSchedule
+        fields = [
+            "id",
+            "location_id",
+            "cleaner_id",
+            "checklist_template_id",
+            "scheduled_start_time",
+            "scheduled_end_time",
+            "manager_notes",
+            "frequency",
+            "interval",
+            "weekdays",
+            "month_day",
+            "start_date",
+            "end_date",
+            "is_active",
+            "created_at",
+        ]
+        read_only_fields = ["id", "created_at"]
+
+    def validate(self, attrs):
+        company = self.context["request"].user.company
+        instance = self.instance
+
+        def current(name):
+            if name in attrs:
+                return attrs[name]
+            return getattr(instance, name, None)
+
+        if "location_id" in attrs and not Location.objects.filter(
+            id=attrs["location_id"], company=company
+        ).exists():
+            raise serializers.ValidationError({"location_id": "Invalid location"})
+
+        if "cleaner_id" in attrs:
+            cleaner = User.objects.filter(id=attrs["cleaner_id"], company=company, role="cleaner").first()
+            if cleaner is None:
+                raise serializers.ValidationError({"cleaner_id": "Invalid cleaner"})
+            if not cleaner.is_active:
+                raise serializers.ValidationError(
+                    {"cleaner_id": "Cleaner is inactive and cannot be assigned to jobs"}
                 )
 
-        return job
+        if attrs.get("checklist_template_id") and not ChecklistTemplate.objects.filter(
+            id=attrs["checklist_template_id"], company=company
+        ).exists():
+            raise serializers.ValidationError({"checklist_template_id": "Invalid checklist template"})
+
+        if "weekdays" in attrs:
+            attrs["weekdays"] = sorted(set(attrs["weekdays"]))
+
+        if (
+            current("frequency") == RecurringJobSchedule.FREQUENCY_WEEKLY
+            and "weekdays" in attrs
+            and not attrs["weekdays"]
+        ):
+            raise serializers.ValidationError({"weekdays": "Pick at least one weekday"})
+
+        end_date = current("end_date")
+        if end_date and end_date < current("start_date"):
+            raise serializers.ValidationError({"end_date": "end_date cannot be before start_date"})
+
+        return attrs
 
 
 class PlanningJobSerializer(serializers.ModelSerializer):
@@ -0,0 +1,127 @@
+# backend/apps/api/signals.py
+"""
+Bump ResourceVersion на save/delete моделей, из которых строятся console-списки
+(см. resource_versions.conditional_on), и JobSyncTombstone, когда джоба
+уходит из вида клинера (для removed_ids в /api/jobs/sync/).
+"""
+from django.db.models.signals import post_delete, post_init, post_save
+
+from apps.accounts.models import User
+from apps.jobs.models import Job
+from apps.locations.models import (
+    ChecklistTemplate,
+    ChecklistTemplateItem,
+    Location,
+    LocationChecklistTemplate,
+)
+from apps.maintenance.models import (
+    Asset,
+    AssetType,
+    MaintenanceCategory,
+    RecurringVisitTemplate,
+    ServiceContract,
+)
+
+from .resource_versions import (
+    FAMILY_ASSETS,
+    FAMILY_CHECKLISTS,
+    FAMILY_CONTRACTS,
+    FAMILY_LOCATIONS,
+    FAMILY_MAINTENANCE_CATEGORIES,
+    FAMILY_RECURRING,
+    FAMILY_USERS,
+    bump_resource_version,
+)
+from .models import JobSyncTombstone
+
+# сохранения, которые не меняют ничего видимого в списках
+IGNORED_UPDATE_FIELDS = {
+    User: {"last_login"},
+}
+
+
+def _company_id(instance):
+    if isinstance(instance, ChecklistTemplateItem):
+        return ChecklistTemplate.objects.filter(pk=instance.template_id).values_list(
+            "company_id", flat=True
+        ).first()
+    if isinstance(instance, LocationChecklistTemplate):
+        return Location.objects.filter(pk=instance.location_id).values_list(
+            "company_id", flat=True
+        ).first()
+    return getattr(instance, "company_id", None)
+
+
+def _connect(model, family):
+    def on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+        if raw:
+            return
+        ignored = IGNORED_UPDATE_FIELDS.get(sender)
+        if ignored and update_fields and set(update_fields) <= ignored:
+            return
+        bump_resource_version(_company_id(instance), family)
+
+    def on_delete(sender, instance, **kwargs):
+        bump_resource_version(_company_id(instance), family)
+
+    uid = f"resource_version:{model._meta.label}"
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=uid)
+
+
+RESOURCE_FAMILIES = (
+    (User, FAMILY_USERS),
+    (Location, FAMILY_LOCATIONS),
+    (ChecklistTemplate, FAMILY_CHECKLISTS),
+    (ChecklistTemplateItem, FAMILY_CHECKLISTS),
+    (LocationChecklistTemplate, FAMILY_CHECKLISTS),
+    (Asset, FAMILY_ASSETS),
+    (AssetType, FAMILY_ASSETS),
+    (MaintenanceCategory, FAMILY_MAINTENANCE_CATEGORIES),
+    (RecurringVisitTemplate, FAMILY_RECURRING),
+    (ServiceContract, FAMILY_CONTRACTS),
+)
+
+for _model, _family in RESOURCE_FAMILIES:
+    _connect(_model, _family)
+
+
+# --- JobSyncTombstone: (cleaner, scheduled_date), в которых джоба была видна ---
+# queryset.update() сигналов не шлёт — переназначать / переносить джобы
+# нужно через save().
+
+
+def _job_visibility(job):
+    # __dict__, а не атрибуты: отложенное поле в post_init стоило бы запроса
+    state = job.__dict__
+    if not {"cleaner_id", "scheduled_date"} <= state.keys():
+        return None
+    return state["cleaner_id"], state["scheduled_date"]
+
+
+def _remember_job_visibility(sender, instance, **kwargs):
+    instance._sync_visibility = _job_visibility(instance)
+
+
+def _tombstone(job_id, visibility):
+    if visibility is None or visibility[0] is None:
+        return
+    cleaner_id, scheduled_date = visibility
+    JobSyncTombstone.objects.create(job_id=job_id, cleaner_id=cleaner_id, scheduled_date=scheduled_date)
+
+
+def _on_job_save(sender, instance, created=False, raw=False, **kwargs):
+    before = None if created or raw else getattr(instance, "_sync_visibility", None)
+    after = _job_visibility(instance)
+    if before is not None and after is not None and before != after:
+        _tombstone(instance.pk, before)
+    instance._sync_visibility = after
+
+
+def _on_job_delete(sender, instance, **kwargs):
+    _tombstone(instance.pk, getattr(instance, "_sync_visibility", None) or _job_visibility(instance))
+
+
+post_init.connect(_remember_job_visibility, sender=Job, dispatch_uid="job_sync_tombstone:init")
+post_save.connect(_on_job_save, sender=Job, dispatch_uid="job_sync_tombstone:save")
+post_delete.connect(_on_job_delete, sender=Job, dispatch_uid="job_sync_tombstone:delete")
@@ -20,7 +20,11 @@ PNG_1X1 = (
 )
 
 
-@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    PHOTO_PROCESSING_WORKERS=0,
+    PHOTO_DIRECT_UPLOAD_BACKEND="local",
+)
 class JobPhotosApiTests(TestCase):
     @classmethod
     def tearDownClass(cls):
@@ -102,6 +106,473 @@ class JobPhotosApiTests(TestCase):
         del_before2 = self.client.delete(f"/api/jobs/{self.job.id}/photos/before/")
         self.assertEqual(del_before2.status_code, 204)
 
+    def test_upload_generates_derivatives_after_commit(self):
+        from io import BytesIO
+        from PIL import Image
+        from django.core.files.storage import default_storage
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from apps.jobs.photo_storage import storage_path_from_url
+
+        buffer = BytesIO()
+        Image.new("RGB", (2000, 1500), (10, 120, 200)).save(buffer, format="JPEG")
+        upload = SimpleUploadedFile("big.jpg", buffer.getvalue(), content_type="image/jpeg")
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            resp = self.client.post(
+                f"/api/jobs/{self.job.id}/photos/",
+                data={"photo_type": "before", "file": upload},
+                format="multipart",
+            )
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(len(callbacks), 1)
+
+        listing = self.client.get(f"/api/jobs/{self.job.id}/photos/")
+        photo = listing.data[0]
+        self.assertTrue(photo["thumb_url"].startswith("http://testserver/media/company/"))
+        self.assertIn("/photos/before/", photo["medium_url"])
+
+        thumb_key = storage_path_from_url(photo["thumb_url"])
+        with default_storage.open(thumb_key, "rb") as f:
+            self.assertEqual(max(Image.open(f).size), 320)
+
+        detail = self.client.get(f"/api/jobs/{self.job.id}/")
+        self.assertEqual(detail.data["photos"][0]["thumb_url"], photo["thumb_url"])
+
+        # удаление фото убирает и derivatives
+        self.client.delete(f"/api/jobs/{self.job.id}/photos/before/")
+        self.assertFalse(default_storage.exists(thumb_key))
+
+    def test_resubmitted_upload_is_noop_and_storage_is_shared(self):
+        from unittest.mock import patch
+        from django.core.files.storage import default_storage
+        from apps.jobs.photo_storage import storage_path_from_url
+
+        with self.captureOnCommitCallbacks(execute=True):
+            r1 = self._upload("before")
+        self.assertEqual(r1.status_code, 201)
+        r1.data["file_url"] = self.client.get(f"/api/jobs/{self.job.id}/photos/").data[0]["file_url"]
+
+        # retry тех же байт — 200 с тем же фото, без записи в storage
+        with patch.object(default_storage, "save") as save:
+            retry = self._upload("before")
+            after = self._upload("after")
+        save.assert_not_called()
+        self.assertEqual(retry.status_code, 200)
+        self.assertTrue(retry.data["deduplicated"])
+        self.assertEqual(retry.data["file_url"], r1.data["file_url"])
+        self.assertEqual(after.status_code, 201)
+        self.assertEqual(after.data["file_url"], r1.data["file_url"])
+        self.assertEqual(File.objects.exclude(content_hash="").count(), 2)
+
+        # другие байты того же типа — по-прежнему конфликт
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        other = SimpleUploadedFile("other.png", PNG_1X1 + b"\x00", content_type="image/png")
+        conflict = self.client.post(
+            f"/api/jobs/{self.job.id}/photos/",
+            data={"photo_type": "before", "file": other},
+            format="multipart",
+        )
+        self.assertEqual(conflict.status_code, 409)
+
+        # объект удаляется только вместе с последней ссылкой
+        key = storage_path_from_url(r1.data["file_url"])
+        self.client.delete(f"/api/jobs/{self.job.id}/photos/after/")
+        self.assertTrue(default_storage.exists(key))
+        self.client.delete(f"/api/jobs/{self.job.id}/photos/before/")
+        self.assertFalse(default_storage.exists(key))
+
+    def test_upload_is_pending_until_processed_after_commit(self):
+        from io import BytesIO
+        from PIL import Image
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        # EXIF GPS ~ 1 км от Location
+        exif = Image.Exif()
+        gps = exif.get_ifd(0x8825)
+        gps[1], gps[2] = "N", (25.0, 12.0, 53.28)
+        gps[3], gps[4] = "E", (55.0, 16.0, 14.88)
+        buffer = BytesIO()
+        Image.new("RGB", (64, 48)).save(buffer, format="JPEG", exif=exif.tobytes())
+        far = SimpleUploadedFile("far.jpg", buffer.getvalue(), content_type="image/jpeg")
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            resp = self.client.post(
+                f"/api/jobs/{self.job.id}/photos/",
+                data={"photo_type": "before", "file": far},
+                format="multipart",
+            )
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["processing_status"], "pending")
+        self.assertIsNone(resp.data["exif_missing"])
+
+        for callback in callbacks:
+            callback()
+
+        photo = self.client.get(f"/api/jobs/{self.job.id}/photos/").data[0]
+        self.assertEqual(photo["processing_status"], "rejected")
+        self.assertIn("too far", photo["processing_error"])
+
+        # rejected фото заменяется новой загрузкой
+        with self.captureOnCommitCallbacks(execute=True):
+            retry = self._upload("before")
+        self.assertEqual(retry.status_code, 201)
+        photo = self.client.get(f"/api/jobs/{self.job.id}/photos/").data[0]
+        self.assertEqual(photo["processing_status"], "ready")
+        self.assertEqual(JobPhoto.objects.filter(job=self.job).count(), 1)
+
+    def test_reprocess_pending_photos_picks_up_lost_dispatch(self):
+        from datetime import timedelta
+        from io import StringIO
+
+        from django.core.management import call_command
+        from django.utils import timezone
+
+        # on_commit-callback потерян (рестарт воркера до обработки)
+        with self.captureOnCommitCallbacks(execute=False):
+            self.assertEqual(self._upload("before").status_code, 201)
+        photo = JobPhoto.objects.get(job=self.job, photo_type="before")
+        self.assertEqual(photo.processing_status, JobPhoto.STATUS_PENDING)
+
+        # свежие pending не трогаем — воркер может их ещё обрабатывать
+        out = StringIO()
+        call_command("reprocess_pending_photos", stdout=out)
+        self.assertIn("Stale pending photos: 0", out.getvalue())
+
+        JobPhoto.objects.filter(pk=photo.pk).update(created_at=timezone.now() - timedelta(minutes=20))
+        out = StringIO()
+        call_command("reprocess_pending_photos", "--dry-run", stdout=out)
+        self.assertIn("Stale pending photos: 1", out.getvalue())
+        photo.refresh_from_db()
+        self.assertEqual(photo.processing_status, JobPhoto.STATUS_PENDING)
+
+        out = StringIO()
+        call_command("reprocess_pending_photos", stdout=out)
+        self.assertIn("1 processed, 0 still pending", out.getvalue())
+        photo.refresh_from_db()
+        self.assertEqual(photo.processing_status, JobPhoto.STATUS_READY)
+        # прошло политику хранения (original_size_bytes пишет обработка)
+        self.assertIsNotNone(File.objects.get(pk=photo.file_id).original_size_bytes)
+
+    def _large_photo(self, with_gps: bool = True) -> bytes:
+        from io import BytesIO
+        from PIL import Image
+
+        exif = Image.Exif()
+        exif[0x0132] = "2026:01:15 09:30:00"
+        if with_gps:
+            gps = exif.get_ifd(0x8825)
+            gps[1], gps[2] = "N", (25.0, 12.0, 17.28)
+            gps[3], gps[4] = "E", (55.0, 16.0, 14.88)
+        buffer = BytesIO()
+        Image.effect_noise((3000, 2000), 30).convert("RGB").save(
+            buffer, format="JPEG", quality=95, exif=exif.tobytes()
+        )
+        return buffer.getvalue()
+
+    def test_ingest_policy_caps_resolution_and_strips_metadata(self):
+        from PIL import Image
+        from django.core.files.storage import default_storage
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from apps.jobs.photo_storage import storage_path_from_url
+
+        self.company.photo_max_long_edge = 1600
+        self.company.save(update_fields=["photo_max_long_edge"])
+
+        raw = self._large_photo()
+        upload = SimpleUploadedFile("big.jpg", raw, content_type="image/jpeg")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f"/api/jobs/{self.job.id}/photos/",
+                data={"photo_type": "before", "file": upload},
+                format="multipart",
+            )
+
+        photo = JobPhoto.objects.select_related("file").get(job=self.job)
+        self.assertEqual(photo.processing_status, JobPhoto.STATUS_READY)
+        self.assertAlmostEqual(photo.latitude, 25.2048, places=3)
+        self.assertEqual(photo.file.original_size_bytes, len(raw))
+        self.assertLess(photo.file.size_bytes, len(raw))
+
+        with default_storage.open(storage_path_from_url(photo.file.file_url), "rb") as f:
+            stored = Image.open(f)
+            self.assertEqual(stored.size, (1600, 1067))
+            self.assertEqual(len(stored.getexif()), 0)
+
+    def test_recompress_command_reencodes_historical_photos(self):
+        from io import StringIO
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+        from django.core.management import call_command
+
+        raw = self._large_photo(with_gps=False)
+        key = default_storage.save(
+            f"company/{self.company.id}/jobs/{self.job.id}/photos/before/legacy.jpg",
+            ContentFile(raw),
+        )
+        db_file = File.objects.create(file_url=default_storage.url(key), size_bytes=len(raw))
+        JobPhoto.objects.create(job=self.job, file=db_file, photo_type=JobPhoto.TYPE_BEFORE)
+
+        out = StringIO()
+        call_command("recompress_job_photos", stdout=out)
+
+        db_file.refresh_from_db()
+        self.assertEqual(db_file.original_size_bytes, len(raw))
+        self.assertLess(db_file.size_bytes, len(raw))
+        self.assertFalse(default_storage.exists(key))
+        self.assertIn("1 re-encoded", out.getvalue())
+
+        # повторный запуск — уже нечего делать
+        out = StringIO()
+        call_command("recompress_job_photos", stdout=out)
+        self.assertIn("Files to process: 0", out.getvalue())
+
+    def test_media_endpoint_authorizes_and_supports_conditional_and_range(self):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+
+        body = bytes(range(256)) * 4
+        key = default_storage.save(
+            f"company/{self.company.id}/jobs/{self.job.id}/photos/before/{'a' * 32}.jpg",
+            ContentFile(body),
+        )
+        url = f"/api/media/{key}"
+        db_file = File.objects.create(file_url=default_storage.url(key))
+        JobPhoto.objects.create(job=self.job, file=db_file, photo_type="before")
+
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(b"".join(resp.streaming_content), body)
+        self.assertIn("immutable", resp["Cache-Control"])
+        etag = resp["ETag"]
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        partial = self.client.get(url, HTTP_RANGE="bytes=10-19")
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial.content, body[10:20])
+        self.assertEqual(partial["Content-Range"], f"bytes 10-19/{len(body)}")
+
+        with self.settings(MEDIA_ACCEL_REDIRECT_PREFIX="/_protected_media/"):
+            accel = self.client.get(url)
+        self.assertEqual(accel["X-Accel-Redirect"], f"/_protected_media/{key}")
+        self.assertEqual(accel.content, b"")
+
+        # другая компания ключа не видит
+        other = User.objects.create_user(
+            email="manager@other.com",
+            phone="+15550002222",
+            password="pass12345",
+            role=User.ROLE_MANAGER,
+            company=Company.objects.create(name="OtherCo"),
+        )
+        outsider = APIClient()
+        outsider.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=other).key}")
+        self.assertEqual(outsider.get(url).status_code, 404)
+        self.assertEqual(self.client.get("/api/media/company/../secret.txt").status_code, 404)
+
+        # API может отдавать ссылки на защищённый endpoint
+        with self.settings(MEDIA_PROTECTED_URLS=True):
+            listing = self.client.get(f"/api/jobs/{self.job.id}/photos/")
+        self.assertEqual(listing.data[0]["file_url"], f"http://testserver{url}")
+
+        # объект удалён — 404 и по старому ETag, а не 304
+        default_storage.delete(key)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 404)
+
+    def test_media_endpoint_serves_deduplicated_photo_to_its_cleaner(self):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+
+        # объект лежит в папке job первого загрузившего
+        key = default_storage.save(
+            f"company/{self.company.id}/jobs/{self.job.id}/photos/before/{'b' * 32}.jpg",
+            ContentFile(b"jpeg-bytes"),
+        )
+        JobPhoto.objects.create(
+            job=self.job,
+            file=File.objects.create(file_url=default_storage.url(key)),
+            photo_type=JobPhoto.TYPE_BEFORE,
+        )
+
+        other_cleaner = User.objects.create_user(
+            email="second@test.com",
+            phone="+15550009999",
+            password="pass12345",
+            role=User.ROLE_CLEANER,
+            company=self.company,
+        )
+        other_job = Job.objects.create(
+            company=self.company,
+            location=self.job.location,
+            cleaner=other_cleaner,
+            scheduled_date=self.job.scheduled_date,
+        )
+        second = APIClient()
+        second.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=other_cleaner).key}")
+        url = f"/api/media/{key}"
+
+        # чужое фото — нет доступа
+        self.assertEqual(second.get(url).status_code, 403)
+
+        # dedup: фото второй джобы ссылается на тот же объект
+        JobPhoto.objects.create(
+            job=other_job,
+            file=File.objects.create(file_url=default_storage.url(key)),
+            photo_type=JobPhoto.TYPE_BEFORE,
+        )
+        self.assertEqual(second.get(url).status_code, 200)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def _jpeg_bytes(self) -> bytes:
+        from io import BytesIO
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.new("RGB", (64, 48), (200, 120, 40)).save(buffer, format="JPEG")
+        return buffer.getvalue()
+
+    def _request_slot(self, photo_type: str, data: bytes):
+        import hashlib
+
+        return self.client.post(
+            f"/api/jobs/{self.job.id}/photos/upload-slot/",
+            data={
+                "photo_type": photo_type,
+                "content_type": "image/jpeg",
+                "size_bytes": len(data),
+                "sha256": hashlib.sha256(data).hexdigest(),
+            },
+            format="json",
+        )
+
+    def test_direct_upload_slot_put_finalize(self):
+        from django.core.files.storage import default_storage
+
+        from apps.jobs.photo_storage import storage_path_from_url
+
+        data = self._jpeg_bytes()
+
+        slot = self._request_slot("before", data)
+        self.assertEqual(slot.status_code, 200)
+        self.assertTrue(slot.data["upload_required"])
+        self.assertTrue(slot.data["key"].startswith(
+            f"company/{self.company.id}/jobs/{self.job.id}/photos/before/"
+        ))
+        upload = slot.data["upload"]
+        self.assertEqual(upload["method"], "PUT")
+
+        # finalize до PUT — объекта ещё нет
+        early = self.client.post(
+            f"/api/jobs/{self.job.id}/photos/finalize/",
+            data={"token": slot.data["token"]},
+            format="json",
+        )
+        self.assertEqual(early.status_code, 400)
+
+        # PUT без авторизации (токен в URL), чужие байты отклоняются
+        anon = APIClient()
+        bad = anon.generic("PUT", upload["url"], data + b"x", content_type="image/jpeg")
+        self.assertEqual(bad.status_code, 400)
+        put = anon.generic("PUT", upload["url"], data, content_type="image/jpeg")
+        self.assertEqual(put.status_code, 200)
+        self.assertTrue(default_storage.exists(slot.data["key"]))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(
+                f"/api/jobs/{self.job.id}/photos/finalize/",
+                data={"token": slot.data["token"]},
+                format="json",
+            )
+        self.assertEqual(resp.status_code, 201)
+        # как multipart: pending, EXIF / политика / превью — после коммита
+        self.assertEqual(resp.data["processing_status"], JobPhoto.STATUS_PENDING)
+        self.assertIsNone(resp.data["exif_missing"])
+        self.assertTrue(resp.data["file_url"].endswith(slot.data["key"]))
+        before = JobPhoto.objects.select_related("file").get(job=self.job, photo_type="before")
+        self.assertEqual(before.processing_status, JobPhoto.STATUS_READY)
+        self.assertTrue(before.file.thumb_url)
+        self.assertIsNotNone(before.file.original_size_bytes)
+
+        # те же байты для after: грузить не нужно, finalize переиспользует объект
+        slot2 = self._request_slot("after", data)
+        self.assertFalse(slot2.data["upload_required"])
+        self.assertNotIn("upload", slot2.data)
+        resp2 = self.client.post(
+            f"/api/jobs/{self.job.id}/photos/finalize/",
+            data={"token": slot2.data["token"]},
+            format="json",
+        )
+        self.assertEqual(resp2.status_code, 201)
+        self.assertEqual(resp2.data["processing_status"], JobPhoto.STATUS_READY)
+        self.assertTrue(resp2.data["file_url"].endswith(storage_path_from_url(before.file.file_url)))
+
+    def _put_slot(self, photo_type: str, data: bytes):
+        slot = self._request_slot(photo_type, data)
+        put = APIClient().generic("PUT", slot.data["upload"]["url"], data, content_type="image/jpeg")
+        self.assertEqual(put.status_code, 200)
+        return slot
+
+    def test_direct_upload_finalize_race_and_retry(self):
+        from io import BytesIO
+        from unittest.mock import patch
+
+        from PIL import Image
+        from django.core.files.storage import default_storage
+
+        finalize_url = f"/api/jobs/{self.job.id}/photos/finalize/"
+
+        # повтор того же токена после обрыва: no-op, объект остаётся
+        slot = self._put_slot("before", self._jpeg_bytes())
+        first = self.client.post(finalize_url, data={"token": slot.data["token"]}, format="json")
+        self.assertEqual(first.status_code, 201)
+        retry = self.client.post(finalize_url, data={"token": slot.data["token"]}, format="json")
+        self.assertEqual(retry.status_code, 200)
+        self.assertTrue(retry.data["deduplicated"])
+        self.assertTrue(default_storage.exists(slot.data["key"]))
+
+        # параллельный finalize after: uniq_job_photo_type -> 409, не 500
+        buffer = BytesIO()
+        Image.new("RGB", (32, 32), (10, 200, 90)).save(buffer, format="JPEG")
+        other = self._put_slot("after", buffer.getvalue())
+        JobPhoto.objects.create(
+            job=self.job,
+            file=File.objects.create(file_url="/media/winner.jpg"),
+            photo_type=JobPhoto.TYPE_AFTER,
+        )
+        with patch("apps.api.views_cleaner._existing_photo_response", return_value=None):
+            conflict = self.client.post(finalize_url, data={"token": other.data["token"]}, format="json")
+        self.assertEqual(conflict.status_code, 409)
+        self.assertFalse(default_storage.exists(other.data["key"]))
+
+    def test_direct_upload_disabled_by_default_outside_debug(self):
+        with self.settings(PHOTO_DIRECT_UPLOAD_BACKEND=""):
+            slot = self._request_slot("before", self._jpeg_bytes())
+        self.assertEqual(slot.status_code, 404)
+
+    def test_direct_upload_rejects_foreign_token(self):
+        slot = self._request_slot("before", self._jpeg_bytes())
+
+        other_job = Job.objects.create(
+            company=self.company,
+            location=self.location,
+            cleaner=self.cleaner,
+            scheduled_date="2026-01-16",
+            status=Job.STATUS_IN_PROGRESS,
+        )
+        resp = self.client.post(
+            f"/api/jobs/{other_job.id}/photos/finalize/",
+            data={"token": slot.data["token"]},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 400)
+
+        tampered = self.client.post(
+            f"/api/jobs/{self.job.id}/photos/finalize/",
+            data={"token": slot.data["token"] + "x"},
+            format="json",
+        )
+        self.assertEqual(tampered.status_code, 400)
+
     def test_delete_only_in_progress(self):
         # создадим фотку напрямую (чтобы не зависеть от upload)
         f = File.objects.create(file_url="/media/company/1/jobs/999/photos/before/x.png")
@@ -387,3 +858,1189 @@ class CrossContextGuardrailTests(TestCase):
             visit_ids,
             "Cleaning job should NOT appear in /api/manager/service-visits/"
         )
+
+
+class ManagerJobsHistoryPaginationTests(TestCase):
+    """
+    Keyset-пагинация /api/manager/jobs/history/.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        from datetime import date, time
+
+        cls.company = Company.objects.create(name="HistoryCo")
+        cls.manager = User.objects.create_user(
+            email="manager@history.test",
+            phone="+15550007777",
+            password="testpass123",
+            role=User.ROLE_MANAGER,
+            company=cls.company,
+        )
+        cls.cleaner = User.objects.create_user(
+            email="cleaner@history.test",
+            phone="+15550006666",
+            password="testpass123",
+            role=User.ROLE_CLEANER,
+            company=cls.company,
+        )
+        cls.location = Location.objects.create(company=cls.company, name="History Location")
+
+        slots = [
+            (date(2026, 3, 1), time(9, 0)),
+            (date(2026, 3, 1), None),
+            (date(2026, 3, 1), time(9, 0)),
+            (date(2026, 3, 2), time(14, 30)),
+            (date(2026, 3, 2), None),
+            (date(2026, 3, 3), time(8, 0)),
+            (date(2026, 2, 27), time(10, 0)),
+        ]
+        for scheduled_date, start in slots:
+            Job.objects.create(
+                company=cls.company,
+                location=cls.location,
+                cleaner=cls.cleaner,
+                scheduled_date=scheduled_date,
+                scheduled_start_time=start,
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+        self.url = "/api/manager/jobs/history/?date_from=2026-02-28&date_to=2026-03-31"
+
+    def test_cursor_pages_match_full_list(self):
+        full = self.client.get(self.url)
+        self.assertEqual(full.status_code, 200)
+        expected = [job["id"] for job in full.data]
+        self.assertEqual(len(expected), 6)
+
+        collected = []
+        cursor = None
+        pages = 0
+        while True:
+            url = f"{self.url}&page_size=2"
+            if cursor:
+                url += f"&cursor={cursor}"
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            self.assertLessEqual(len(resp.data["results"]), 2)
+            collected.extend(job["id"] for job in resp.data["results"])
+            pages += 1
+            cursor = resp.data["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(collected, expected)
+        self.assertEqual(pages, 3)
+
+    def test_page_size_is_capped_and_count_is_optional(self):
+        resp = self.client.get(f"{self.url}&page_size=100000&include_count=1")
+        self.assertEqual(resp.data["page_size"], 200)
+        self.assertEqual(resp.data["estimated_count"], 6)
+        self.assertIsNone(resp.data["next_cursor"])
+
+        self.assertNotIn("estimated_count", self.client.get(f"{self.url}&page_size=5").data)
+
+    def test_invalid_cursor_returns_400(self):
+        resp = self.client.get(f"{self.url}&cursor=not-a-cursor")
+        self.assertEqual(resp.status_code, 400)
+
+    def test_sparse_fieldset_skips_unrequested_relations(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as full:
+            self.client.get(self.url)
+        with CaptureQueriesContext(connection) as sparse:
+            resp = self.client.get(f"{self.url}&fields=id,status,location")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(set(resp.data[0]), {"id", "status", "location"})
+        # без proof / checklist_items — нет prefetch photos и checklist_items
+        self.assertEqual(len(full) - len(sparse), 2)
+        self.assertFalse(any("job_photos" in q["sql"] for q in sparse.captured_queries))
+
+        planning = self.client.get("/api/manager/jobs/planning/?date=2026-03-01&fields=id,cleaner")
+        self.assertEqual([set(job) for job in planning.data], [{"id", "cleaner"}] * 3)
+
+        self.assertEqual(self.client.get(f"{self.url}&fields=id,bogus").status_code, 400)
+
+    def test_stream_matches_list_response(self):
+        import json
+
+        listed = self.client.get(f"{self.url}&fields=id,scheduled_date,scheduled_start_time,proof")
+        streamed = self.client.get(f"{self.url}&fields=id,scheduled_date,scheduled_start_time,proof&stream=1")
+
+        self.assertEqual(streamed.status_code, 200)
+        self.assertEqual(json.loads(b"".join(streamed.streaming_content)), listed.json())
+
+
+class FastJSONRendererTests(TestCase):
+    def test_output_matches_drf_json_renderer(self):
+        from datetime import date, datetime, time, timezone as dt_timezone
+        from decimal import Decimal
+
+        from rest_framework.renderers import JSONRenderer
+
+        from apps.api.renderers import FastJSONRenderer, iter_json_list
+
+        data = [
+            {
+                "day": date(2026, 3, 1),
+                "start": time(9, 30),
+                "at": datetime(2026, 3, 1, 9, 30, 15, 123456, tzinfo=dt_timezone.utc),
+                "price": Decimal("149.90"),
+                "note": "line\u2028break",
+                1: "int key",
+            }
+        ]
+        expected = JSONRenderer().render(data)
+
+        self.assertEqual(FastJSONRenderer().render(data), expected)
+        self.assertEqual(b"".join(iter_json_list(iter(data))), expected)
+        self.assertEqual(b"".join(iter_json_list(iter([]))), b"[]")
+
+
+class ServiceVisitsListTests(TestCase):
+    """
+    /api/manager/service-visits/: пагинация, SLA без запросов на визит.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name="VisitsCo")
+        cls.manager = User.objects.create_user(
+            email="manager@visits.test",
+            phone="+15550005555",
+            password="testpass123",
+            role=User.ROLE_MANAGER,
+            company=cls.company,
+        )
+        cls.technician = User.objects.create_user(
+            email="tech@visits.test",
+            phone="+15550004444",
+            password="testpass123",
+            role=User.ROLE_CLEANER,
+            company=cls.company,
+        )
+        cls.location = Location.objects.create(company=cls.company, name="Plant Room")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+
+    def _visit(self, day, completed=False, photos=(), open_required=False):
+        from datetime import date
+
+        job = Job.objects.create(
+            company=self.company,
+            location=self.location,
+            cleaner=self.technician,
+            scheduled_date=date(2026, 4, day),
+            context=Job.CONTEXT_MAINTENANCE,
+            status=Job.STATUS_COMPLETED if completed else Job.STATUS_SCHEDULED,
+        )
+        for photo_type in photos:
+            JobPhoto.objects.create(
+                job=job,
+                file=File.objects.create(file_url=f"https://cdn.example.com/{job.id}/{photo_type}.jpg"),
+                photo_type=photo_type,
+            )
+        job.checklist_items.create(text="Check pressure", is_required=True, is_completed=not open_required)
+        return job
+
+    def test_sla_matches_per_job_computation_in_constant_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from apps.api.views_reports import compute_sla_status_and_reasons_for_job
+
+        self._visit(1, completed=True, photos=("before", "after"))
+        self._visit(2, completed=True, photos=("before",))
+        self._visit(3, completed=True, photos=("before", "after"), open_required=True)
+
+        with CaptureQueriesContext(connection) as small:
+            resp = self.client.get("/api/manager/service-visits/")
+        self.assertEqual(resp.status_code, 200)
+
+        expected = {
+            job.id: compute_sla_status_and_reasons_for_job(job)[0]
+            for job in Job.objects.filter(company=self.company)
+        }
+        self.assertEqual({v["id"]: v["sla_status"] for v in resp.data}, expected)
+        self.assertEqual(sorted(expected.values()), ["ok", "violated", "violated"])
+
+        for day in range(4, 10):
+            self._visit(day, completed=True)
+        with CaptureQueriesContext(connection) as large:
+            self.client.get("/api/manager/service-visits/")
+        self.assertEqual(len(large), len(small))
+
+    def test_cursor_pagination_and_date_validation(self):
+        for day in range(1, 6):
+            self._visit(day)
+
+        first = self.client.get("/api/manager/service-visits/?page_size=3&date_from=2026-04-02")
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(len(first.data["results"]), 3)
+        second = self.client.get(
+            f"/api/manager/service-visits/?page_size=3&date_from=2026-04-02&cursor={first.data['next_cursor']}"
+        )
+        self.assertEqual(len(second.data["results"]), 1)
+        self.assertIsNone(second.data["next_cursor"])
+        dates = [v["scheduled_date"] for v in first.data["results"] + second.data["results"]]
+        self.assertEqual(dates, ["2026-04-05", "2026-04-04", "2026-04-03", "2026-04-02"])
+
+        resp = self.client.get("/api/manager/service-visits/?date_from=04/01/2026")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data["code"], "VALIDATION_ERROR")
+
+    def test_sparse_fieldset(self):
+        self._visit(1, completed=True, photos=("before", "after"))
+
+        resp = self.client.get("/api/manager/service-visits/?fields=id,sla_status,technician")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data, [{
+            "id": resp.data[0]["id"],
+            "sla_status": "ok",
+            "technician": {"id": self.technician.id, "name": self.technician.email},
+        }])
+
+
+class ManagerJobsActiveSyncTests(TestCase):
+    """
+    /api/manager/jobs/active/: ETag и delta sync по updated_since.
+    """
+
+    def setUp(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        self.company = Company.objects.create(name="ActiveSyncCo")
+        self.manager = User.objects.create_user(
+            email="manager@active.test",
+            phone="+15550003333",
+            password="testpass123",
+            role=User.ROLE_MANAGER,
+            company=self.company,
+        )
+        self.cleaner = User.objects.create_user(
+            email="cleaner@active.test",
+            phone="+15550002221",
+            password="testpass123",
+            role=User.ROLE_CLEANER,
+            company=self.company,
+        )
+        self.location = Location.objects.create(company=self.company, name="Tower A")
+        today = timezone.localdate()
+        self.jobs = [
+            Job.objects.create(
+                company=self.company,
+                location=self.location,
+                cleaner=self.cleaner,
+                scheduled_date=today + timedelta(days=offset),
+            )
+            for offset in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+        self.url = "/api/manager/jobs/active/"
+
+    def _backdate(self, seconds=120):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        Job.objects.filter(company=self.company).update(
+            updated_at=timezone.now() - timedelta(seconds=seconds)
+        )
+
+    def test_unchanged_poll_returns_304(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(len(first.data), 3)
+
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+        # изменение джобы меняет ETag
+        self.jobs[0].status = Job.STATUS_IN_PROGRESS
+        self.jobs[0].save()
+        changed = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], first["ETag"])
+
+    def test_updated_since_returns_changed_and_removed_ids(self):
+        from urllib.parse import quote
+
+        self._backdate()
+        base = self.client.get(f"{self.url}?updated_since={quote('2000-01-01T00:00:00+00:00')}")
+        self.assertEqual(len(base.data["jobs"]), 3)
+        token = base.data["sync_token"]
+
+        self._backdate(seconds=3600)
+        delta = self.client.get(f"{self.url}?updated_since={quote(token)}")
+        self.assertEqual(delta.data["jobs"], [])
+        self.assertEqual(delta.data["removed_ids"], [])
+
+        # изменения фото / чеклиста двигают Job.updated_at
+        Job.touch(self.jobs[1].id)
+        self.jobs[2].status = Job.STATUS_CANCELLED
+        self.jobs[2].save()
+
+        delta = self.client.get(f"{self.url}?updated_since={quote(token)}")
+        self.assertEqual([job["id"] for job in delta.data["jobs"]], [self.jobs[1].id])
+        self.assertEqual(delta.data["removed_ids"], [self.jobs[2].id])
+
+        self.assertEqual(self.client.get(f"{self.url}?updated_since=yesterday").status_code, 400)
+
+    def test_check_in_changes_etag_and_delta(self):
+        from urllib.parse import quote
+
+        self._backdate()
+        first = self.client.get(f"{self.url}?updated_since={quote('2000-01-01T00:00:00+00:00')}")
+        token = first.data["sync_token"]
+        etag = first["ETag"]
+
+        self._backdate(seconds=3600)
+        stale = self.client.get(self.url)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=stale["ETag"]).status_code, 304)
+
+        # check_in пишет update_fields — updated_at обязан попасть в UPDATE
+        job = Job.objects.get(pk=self.jobs[0].id)
+        job.check_in()
+
+        changed = self.client.get(self.url, HTTP_IF_NONE_MATCH=stale["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        statuses = {row["id"]: row["status"] for row in changed.data}
+        self.assertEqual(statuses[job.id], Job.STATUS_IN_PROGRESS)
+        self.assertNotEqual(changed["ETag"], etag)
+
+        delta = self.client.get(f"{self.url}?updated_since={quote(token)}")
+        self.assertEqual([row["id"] for row in delta.data["jobs"]], [job.id])
+        self.assertEqual(delta.data["jobs"][0]["status"], Job.STATUS_IN_PROGRESS)
+
+
+class ResourceVersionConditionalGetTests(TestCase):
+    """
+    Conditional GET console-списков по ResourceVersion компании.
+    """
+
+    def setUp(self):
+        self.company = Company.objects.create(name="VersionCo")
+        self.manager = User.objects.create_user(
+            email="manager@version.test",
+            phone="+15550004444",
+            password="testpass123",
+            role=User.ROLE_MANAGER,
+            company=self.company,
+        )
+        self.location = Location.objects.create(company=self.company, name="Tower A")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+        self.url = "/api/manager/locations/"
+
+    def test_locations_list_revalidates_until_location_changes(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        etag = first["ETag"]
+
+        with self.assertNumQueries(1):
+            again = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+
+        # last_login-only save не меняет списки
+        from django.utils import timezone
+
+        users_url = "/api/company/users/"
+        users_etag = self.client.get(users_url)["ETag"]
+        self.manager.last_login = timezone.now()
+        self.manager.save(update_fields=["last_login"])
+        self.assertEqual(self.client.get(users_url, HTTP_IF_NONE_MATCH=users_etag).status_code, 304)
+
+        self.location.name = "Tower B"
+        self.location.save()
+        changed = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+
+        # другая компания не двигает версию
+        other = Company.objects.create(name="OtherVersionCo")
+        Location.objects.create(company=other, name="Elsewhere")
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=changed["ETag"]).status_code, 304
+        )
+
+    def test_contracts_list_revalidates_on_recurring_template_change(self):
+        from datetime import date
+
+        from apps.maintenance.models import RecurringVisitTemplate, ServiceContract
+
+        contract = ServiceContract.objects.create(
+            company=self.company, name="Annual service", start_date=date(2026, 1, 1)
+        )
+        url = "/api/maintenance/contracts/"
+        first = self.client.get(url)
+        self.assertEqual(first.data[0]["recurring_templates_count"], 0)
+
+        # recurring_templates_count в ответе — новый шаблон меняет список
+        RecurringVisitTemplate.objects.create(
+            company=self.company,
+            name="Monthly check",
+            location=self.location,
+            start_date=date(2026, 1, 5),
+            service_contract=contract,
+        )
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.data[0]["recurring_templates_count"], 1)
+
+
+class CleanerJobsSyncTests(TestCase):
+    """
+    /api/jobs/sync/: день клинера одним запросом + delta по since.
+    """
+
+    def setUp(self):
+        from django.utils import timezone
+
+        from apps.jobs.models import JobChecklistItem
+
+        self.company = Company.objects.create(name="SyncCo")
+        self.cleaner = User.objects.create_user(
+            email="cleaner@sync.test",
+            phone="+15550005551",
+            password="testpass123",
+            role=User.ROLE_CLEANER,
+            company=self.company,
+        )
+        self.other_cleaner = User.objects.create_user(
+            email="other@sync.test",
+            phone="+15550005552",
+            password="testpass123",
+            role=User.ROLE_CLEANER,
+            company=self.company,
+        )
+        self.location = Location.objects.create(
+            company=self.company, name="Tower A", latitude=25.2, longitude=55.27
+        )
+        self.today = timezone.localdate()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.cleaner)
+        self.url = "/api/jobs/sync/"
+        self._item_model = JobChecklistItem
+
+    def _job(self):
+        job = Job.objects.create(
+            company=self.company,
+            location=self.location,
+            cleaner=self.cleaner,
+            scheduled_date=self.today,
+        )
+        self._item_model.objects.create(job=job, order=1, text="Mop floors")
+        return job
+
+    def test_window_payload_matches_detail_with_constant_queries(self):
+        job = self._job()
+        # jobs + location, checklist_items, check_events, photos
+        with self.assertNumQueries(4):
+            resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.data["jobs"]), 1)
+
+        detail = self.client.get(f"/api/jobs/{job.id}/")
+        self.assertEqual(resp.data["jobs"][0], detail.data)
+        self.assertEqual(resp.data["jobs"][0]["location"]["latitude"], 25.2)
+
+        for _ in range(4):
+            self._job()
+        with self.assertNumQueries(4):
+            resp = self.client.get(self.url)
+        self.assertEqual(len(resp.data["jobs"]), 5)
+
+        gzipped = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(gzipped["Content-Encoding"], "gzip")
+
+        self.assertEqual(self.client.get(f"{self.url}?date_from=nope").status_code, 400)
+        self.assertEqual(
+            self.client.get(f"{self.url}?date_to={self.today.replace(year=self.today.year + 1)}").status_code,
+            400,
+        )
+
+    def test_since_returns_changed_and_reassigned_jobs(self):
+        from datetime import timedelta
+        from urllib.parse import quote
+
+        from django.utils import timezone
+
+        kept, touched, reassigned = self._job(), self._job(), self._job()
+        Job.objects.filter(company=self.company).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+        token = self.client.get(self.url).data["sync_token"]
+
+        delta = self.client.get(f"{self.url}?since={quote(token)}")
+        self.assertEqual(delta.data["jobs"], [])
+        self.assertEqual(delta.data["removed_ids"], [])
+
+        Job.touch(touched.id)
+        reassigned.cleaner = self.other_cleaner
+        reassigned.save()
+
+        delta = self.client.get(f"{self.url}?since={quote(token)}")
+        self.assertEqual([job["id"] for job in delta.data["jobs"]], [touched.id])
+        self.assertEqual(delta.data["removed_ids"], [reassigned.id])
+        self.assertNotIn(kept.id, delta.data["removed_ids"])
+
+        self.assertEqual(self.client.get(f"{self.url}?since=yesterday").status_code, 400)
+
+    def test_removed_ids_cover_only_jobs_this_cleaner_had(self):
+        from datetime import timedelta
+        from urllib.parse import quote
+
+        from django.utils import timezone
+
+        rescheduled, deleted, bounced = self._job(), self._job(), self._job()
+        foreign = Job.objects.create(
+            company=self.company,
+            location=self.location,
+            cleaner=self.other_cleaner,
+            scheduled_date=self.today,
+        )
+        third = User.objects.create_user(
+            email="third@sync.test",
+            phone="+15550005553",
+            password="testpass123",
+            role=User.ROLE_CLEANER,
+            company=self.company,
+        )
+        token = self.client.get(self.url).data["sync_token"]
+
+        # перенос за окно, удаление
+        rescheduled.scheduled_date = self.today + timedelta(days=3)
+        rescheduled.save()
+        deleted_id = deleted.id
+        deleted.delete()
+        # переназначена туда и обратно — остаётся в jobs
+        bounced.cleaner = self.other_cleaner
+        bounced.save()
+        bounced.cleaner = self.cleaner
+        bounced.save()
+        # чужая джоба окна: изменение и переназначение третьему клинеру
+        foreign.cleaner = third
+        foreign.save()
+
+        delta = self.client.get(f"{self.url}?since={quote(token)}")
+        self.assertFalse(delta.data["full_resync"])
+        self.assertEqual(delta.data["removed_ids"], sorted([rescheduled.id, deleted_id]))
+        self.assertEqual([job["id"] for job in delta.data["jobs"]], [bounced.id])
+
+        # старый токен: всё окно целиком вместо delta
+        old_token = (timezone.now() - timedelta(days=31)).isoformat()
+        full = self.client.get(f"{self.url}?since={quote(old_token)}")
+        self.assertTrue(full.data["full_resync"])
+        self.assertEqual(full.data["removed_ids"], [])
+        self.assertEqual([job["id"] for job in full.data["jobs"]], [bounced.id])
+
+
+class JobMutationsBatchTests(TestCase):
+    """
+    /api/jobs/<id>/mutations/: офлайн-батч с идемпотентными ключами.
+    """
+
+    def setUp(self):
+        from django.utils import timezone
+
+        from apps.jobs.models import JobChecklistItem
+
+        self.company = Company.objects.create(name="BatchCo")
+        self.cleaner = User.objects.create_user(
+            email="cleaner@batch.test",
+            phone="+15550006661",
+            password="testpass123",
+            role=User.ROLE_CLEANER,
+            company=self.company,
+        )
+        self.location = Location.objects.create(
+            company=self.company, name="Tower A", latitude=25.2048, longitude=55.2708
+        )
+        self.job = Job.objects.create(
+            company=self.company,
+            location=self.location,
+            cleaner=self.cleaner,
+            scheduled_date=timezone.localdate(),
+        )
+        self.items = [
+            JobChecklistItem.objects.create(job=self.job, order=i, text=f"Item {i}")
+            for i in (1, 2)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.cleaner)
+        self.url = f"/api/jobs/{self.job.id}/mutations/"
+
+    def _batch(self):
+        here = {"latitude": 25.2048, "longitude": 55.2708}
+        return {
+            "operations": [
+                {"key": "k-check-in", "type": "check_in", "payload": here,
+                 "device_timestamp": "2026-01-17T08:00:00Z"},
+                {"key": "k-toggle", "type": "checklist_toggle",
+                 "payload": {"item_id": self.items[0].id, "is_completed": True}},
+                {"key": "k-missing", "type": "checklist_toggle", "payload": {"item_id": 999999}},
+                {"key": "k-bulk", "type": "checklist_bulk",
+                 "payload": {"items": [{"id": self.items[1].id, "is_completed": True}]}},
+                # слишком далеко от локации — check-out отклонён
+                {"key": "k-check-out", "type": "check_out",
+                 "payload": {"latitude": 25.3, "longitude": 55.3}},
+            ]
+        }
+
+    def test_batch_applies_in_order_and_replays_by_key(self):
+        from apps.jobs.models import JobCheckEvent, JobMutationReceipt
+
+        resp = self.client.post(self.url, self._batch(), format="json")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([r["status"] for r in resp.data["results"]], [200, 200, 404, 200, 400])
+        self.assertEqual(resp.data["job_status"], Job.STATUS_IN_PROGRESS)
+        self.assertEqual(resp.data["results"][4]["data"]["detail"], "Too far from job location.")
+        self.assertEqual(JobMutationReceipt.objects.filter(job=self.job).count(), 3)
+        for item in self.items:
+            item.refresh_from_db()
+            self.assertTrue(item.is_completed)
+
+        # повтор после потери сети: применённое не повторяется, ошибки пересчитываются
+        replay = self.client.post(self.url, self._batch(), format="json")
+        self.assertEqual(replay.status_code, 200)
+        self.assertEqual(
+            [(r["status"], r["replayed"]) for r in replay.data["results"]],
+            [(200, True), (200, True), (404, False), (200, True), (400, False)],
+        )
+        self.assertEqual(
+            JobCheckEvent.objects.filter(job=self.job, event_type=JobCheckEvent.TYPE_CHECK_IN).count(),
+            1,
+        )
+
+    def test_key_reused_on_another_job_is_rejected_not_replayed(self):
+        from django.utils import timezone
+
+        from apps.jobs.models import JobMutationReceipt
+
+        other_job = Job.objects.create(
+            company=self.company,
+            location=self.location,
+            cleaner=self.cleaner,
+            scheduled_date=timezone.localdate(),
+        )
+        here = {"latitude": 25.2048, "longitude": 55.2708}
+        op = {"operations": [{"key": "k-shared", "type": "check_in", "payload": here}]}
+
+        first = self.client.post(self.url, op, format="json")
+        self.assertEqual(first.data["results"][0]["status"], 200)
+
+        resp = self.client.post(f"/api/jobs/{other_job.id}/mutations/", op, format="json")
+        self.assertEqual(resp.status_code, 200)
+        result = resp.data["results"][0]
+        self.assertEqual(result["status"], 409)
+        self.assertFalse(result["replayed"])
+        other_job.refresh_from_db()
+        self.assertEqual(other_job.status, Job.STATUS_SCHEDULED)
+        self.assertEqual(
+            list(JobMutationReceipt.objects.filter(idempotency_key="k-shared").values_list("job_id", flat=True)),
+            [self.job.id],
+        )
+
+    def test_check_out_reports_structured_blockers(self):
+        Job.objects.filter(pk=self.job.pk).update(status=Job.STATUS_IN_PROGRESS)
+        self.items[1].is_completed = True
+        self.items[1].save(update_fields=["is_completed"])
+
+        resp = self.client.post(
+            f"/api/jobs/{self.job.id}/check-out/",
+            {"latitude": 25.2048, "longitude": 55.2708},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data["code"], "JOB_COMPLETION_BLOCKED")
+        self.assertEqual(
+            resp.data["fields"],
+            {
+                "photos.before": "required",
+                "photos.after": "required",
+                "checklist.required": [self.items[0].id],
+            },
+        )
+
+    def test_invalid_batch_is_rejected_as_a_whole(self):
+        duplicate_keys = {
+            "operations": [
+                {"key": "same", "type": "check_in", "payload": {}},
+                {"key": "same", "type": "check_out", "payload": {}},
+            ]
+        }
+        self.assertEqual(self.client.post(self.url, duplicate_keys, format="json").status_code, 400)
+        self.assertEqual(
+            self.client.post(self.url, {"operations": [{"key": "x", "type": "delete"}]}, format="json").status_code,
+            400,
+        )
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, Job.STATUS_SCHEDULED)
+
+
+class ManagerJobsBulkCreateTests(TestCase):
+    """
+    /api/manager/jobs/bulk/: JSON / CSV, ошибки по строкам, trial-лимит на батч.
+    """
+
+    def setUp(self):
+        from apps.locations.models import ChecklistTemplate, ChecklistTemplateItem
+
+        self.company = Company.objects.create(name="BulkCo")
+        self.manager = User.objects.create_user(
+            email="manager@bulk.test",
+            phone="+15550007771",
+            password="testpass123",
+            role=User.ROLE_MANAGER,
+            company=self.company,
+        )
+        self.cleaners = [
+            User.objects.create_user(
+                email=f"cleaner{i}@bulk.test",
+                phone=f"+1555000778{i}",
+                password="testpass123",
+                role=User.ROLE_CLEANER,
+                company=self.company,
+            )
+            for i in range(2)
+        ]
+        self.location = Location.objects.create(company=self.company, name="Tower A")
+        self.template = ChecklistTemplate.objects.create(company=self.company, name="Standard")
+        for order, text in enumerate(["Vacuum", "Mop", "Bins"], start=1):
+            ChecklistTemplateItem.objects.create(template=self.template, order=order, text=text)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+        self.url = "/api/manager/jobs/bulk/"
+
+    def _row(self, cleaner, day="2026-03-02", **extra):
+        row = {
+            "scheduled_date": day,
+            "location_id": self.location.id,
+            "cleaner_id": cleaner.id,
+            "checklist_template_id": self.template.id,
+        }
+        row.update(extra)
+        return row
+
+    def test_json_rows_create_jobs_and_checklists_in_bulk(self):
+        from apps.jobs.models import JobChecklistItem
+
+        rows = [self._row(cleaner, day) for cleaner in self.cleaners for day in ("2026-03-02", "2026-03-03")]
+        # location / cleaner / template (пустые asset / category — без запроса),
+        # INSERT jobs, счётчик usage, пункты шаблонов, INSERT пунктов + savepoint
+        with self.assertNumQueries(9):
+            resp = self.client.post(self.url, {"jobs": rows}, format="json")
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertEqual(resp.data["created_count"], 4)
+        self.assertEqual(resp.data["checklist_items_count"], 12)
+        self.assertEqual(
+            JobChecklistItem.objects.filter(job_id__in=resp.data["job_ids"]).count(), 12
+        )
+
+    def test_row_errors_reject_whole_batch(self):
+        rows = [
+            self._row(self.cleaners[0]),
+            self._row(self.cleaners[1], cleaner_id=999999),
+            {"location_id": self.location.id},
+        ]
+        resp = self.client.post(self.url, {"jobs": rows}, format="json")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual([e["row"] for e in resp.data["errors"]], [2, 3])
+        self.assertEqual(resp.data["errors"][0]["errors"], {"cleaner_id": "Invalid cleaner"})
+        self.assertIn("scheduled_date", resp.data["errors"][1]["errors"])
+        self.assertFalse(Job.objects.filter(company=self.company).exists())
+
+    def test_csv_upload_and_trial_limit_per_batch(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        lines = ["scheduled_date,location_id,cleaner_id,checklist_template_id,manager_notes"]
+        lines += [f"2026-03-0{day},{self.location.id},{self.cleaners[0].id},,Floor {day}" for day in (2, 3)]
+        upload = SimpleUploadedFile("week.csv", "\n".join(lines).encode("utf-8"), content_type="text/csv")
+        resp = self.client.post(self.url, {"file": upload}, format="multipart")
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertEqual(resp.data["checklist_items_count"], 0)
+        self.assertEqual(Job.objects.get(id=resp.data["job_ids"][1]).manager_notes, "Floor 3")
+
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        self.company.plan = Company.PLAN_TRIAL
+        self.company.trial_started_at = timezone.now() - timedelta(days=1)
+        self.company.trial_expires_at = timezone.now() + timedelta(days=6)
+        self.company.save()
+        rows = [self._row(self.cleaners[0]) for _ in range(Company.TRIAL_MAX_JOBS - 1)]
+        resp = self.client.post(self.url, {"jobs": rows}, format="json")
+        self.assertEqual(resp.status_code, 403)
+        self.assertEqual(resp.data["code"], "trial_jobs_limit_reached")
+        self.assertEqual(Job.objects.filter(company=self.company).count(), 2)
+
+    def test_trial_limit_rechecked_under_usage_lock(self):
+        from datetime import timedelta
+        from unittest import mock
+
+        from django.utils import timezone
+
+        from apps.api import views_manager_jobs
+
+        self.company.plan = Company.PLAN_TRIAL
+        self.company.trial_started_at = timezone.now() - timedelta(days=1)
+        self.company.trial_expires_at = timezone.now() + timedelta(days=6)
+        self.company.save()
+
+        build = views_manager_jobs._build_bulk_jobs
+
+        def build_while_another_request_creates_jobs(company, rows):
+            # параллельный запрос занимает квоту после первой проверки
+            for _ in range(3):
+                Job.objects.create(
+                    company=self.company,
+                    location=self.location,
+                    cleaner=self.cleaners[1],
+                    scheduled_date="2026-03-01",
+                )
+            return build(company, rows)
+
+        rows = [self._row(self.cleaners[0]) for _ in range(Company.TRIAL_MAX_JOBS - 1)]
+        with mock.patch.object(
+            views_manager_jobs, "_build_bulk_jobs", side_effect=build_while_another_request_creates_jobs
+        ):
+            resp = self.client.post(self.url, {"jobs": rows}, format="json")
+        self.assertEqual(resp.status_code, 403)
+        self.assertEqual(resp.data["code"], "trial_jobs_limit_reached")
+        self.assertEqual(Job.objects.filter(company=self.company).count(), 3)
+
+
+class RecurringVisitGenerationTests(TestCase):
+    """
+    /api/maintenance/recurring-templates/<id>/generate/: bulk-генерация визитов.
+    """
+
+    def setUp(self):
+        from datetime import date
+
+        from apps.locations.models import ChecklistTemplate, ChecklistTemplateItem
+        from apps.maintenance.models import RecurringVisitTemplate
+
+        self.company = Company.objects.create(name="RecurringCo")
+        self.manager = User.objects.create_user(
+            email="manager@recurring.test",
+            phone="+15550008881",
+            password="testpass123",
+            role=User.ROLE_MANAGER,
+            company=self.company,
+        )
+        self.technician = User.objects.create_user(
+            email="tech@recurring.test",
+            phone="+15550008882",
+            password="testpass123",
+            role=User.ROLE_CLEANER,
+            company=self.company,
+        )
+        self.location = Location.objects.create(company=self.company, name="Plant")
+        checklist = ChecklistTemplate.objects.create(company=self.company, name="Service")
+        for order, text in enumerate(["Inspect", "Replace filter"], start=1):
+            ChecklistTemplateItem.objects.create(template=checklist, order=order, text=text)
+
+        self.template = RecurringVisitTemplate.objects.create(
+            company=self.company,
+            name="Weekly service",
+            location=self.location,
+            frequency=RecurringVisitTemplate.FREQUENCY_CUSTOM,
+            interval_days=7,
+            start_date=date(2026, 1, 5),
+            checklist_template=checklist,
+            assigned_technician=self.technician,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+        self.url = f"/api/maintenance/recurring-templates/{self.template.id}/generate/"
+
+    def test_visits_are_generated_in_constant_queries(self):
+        from apps.jobs.models import JobChecklistItem
+        from apps.maintenance.models import GeneratedVisitLog, RecurringVisitTemplate
+        from apps.maintenance.recurring import generate_visits
+
+        template = RecurringVisitTemplate.objects.select_related("checklist_template").get(pk=self.template.pk)
+        # существующие даты, savepoint, INSERT jobs, счётчик usage, INSERT логов,
+        # проверка занятых дат, пункты шаблона, INSERT пунктов, release
+        with self.assertNumQueries(9):
+            result = generate_visits(template, date_to=template.start_date.replace(month=8, day=31))
+
+        self.assertEqual(result.generated_count, 35)
+        self.assertEqual(GeneratedVisitLog.objects.filter(template=template).count(), 35)
+        job = Job.objects.get(pk=result.visits[0][0])
+        self.assertEqual(job.context, Job.CONTEXT_MAINTENANCE)
+        self.assertTrue(job.checklist_snapshot_taken)
+        self.assertEqual(
+            list(JobChecklistItem.objects.filter(job=job).values_list("text", flat=True)),
+            ["Inspect", "Replace filter"],
+        )
+        self.assertEqual(JobChecklistItem.objects.filter(job__company=self.company).count(), 70)
+
+    def test_generation_is_idempotent_and_reports_throughput(self):
+        resp = self.client.post(self.url, {"date_to": "2026-02-01"}, format="json")
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["generated_count"], 4)
+        self.assertEqual(resp.data["checklist_items_count"], 8)
+        self.assertIn("duration_ms", resp.data)
+        self.assertIn("visits_per_second", resp.data)
+
+        again = self.client.post(self.url, {"date_to": "2026-02-01"}, format="json")
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.data["generated_count"], 0)
+
+        extended = self.client.post(self.url, {"date_to": "2026-02-15"}, format="json")
+        self.assertEqual(
+            [visit["scheduled_date"] for visit in extended.data["visits"]],
+            ["2026-02-02", "2026-02-09"],
+        )
+        self.assertEqual(Job.objects.filter(company=self.company).count(), 6)
+
+    def test_materialize_command_fills_horizon_once(self):
+        from datetime import timedelta
+        from io import StringIO
+
+        from django.core.management import call_command
+        from django.utils import timezone
+
+        from apps.maintenance.models import RecurringVisitTemplate, ServiceContract
+
+        today = timezone.localdate()
+        self.template.start_date = today - timedelta(days=30)
+        self.template.save(update_fields=["start_date"])
+        paused = RecurringVisitTemplate.objects.create(
+            company=self.company,
+            name="Contract on hold",
+            location=self.location,
+            frequency=RecurringVisitTemplate.FREQUENCY_CUSTOM,
+            interval_days=7,
+            start_date=today,
+            assigned_technician=self.technician,
+            service_contract=ServiceContract.objects.create(
+                company=self.company, name="On hold", start_date=today, status=ServiceContract.STATUS_DRAFT
+            ),
+        )
+
+        out = StringIO()
+        call_command("materialize_recurring_visits", "--horizon-days", "21", "--batch-size", "1", stdout=out)
+        dates = list(
+            Job.objects.filter(recurring_source__template=self.template)
+            .order_by("scheduled_date")
+            .values_list("scheduled_date", flat=True)
+        )
+        # прошлые даты сетки не догоняются, только [today, today + 21]
+        self.assertEqual(len(dates), 3)
+        self.assertTrue(all(today <= d <= today + timedelta(days=21) for d in dates))
+        self.assertFalse(Job.objects.filter(recurring_source__template=paused).exists())
+        self.assertIn("3 visits generated", out.getvalue())
+
+        call_command("materialize_recurring_visits", "--horizon-days", "21", stdout=StringIO())
+        self.assertEqual(Job.objects.filter(company=self.company).count(), 3)
+
+    def test_materialize_command_caps_trial_company_at_remaining_quota(self):
+        from datetime import timedelta
+        from io import StringIO
+
+        from django.core.management import call_command
+        from django.utils import timezone
+
+        from apps.maintenance.models import RecurringVisitTemplate
+
+        today = timezone.localdate()
+        self.template.interval_days = 1
+        self.template.start_date = today
+        self.template.save(update_fields=["interval_days", "start_date"])
+        second = RecurringVisitTemplate.objects.create(
+            company=self.company,
+            name="Daily check",
+            location=self.location,
+            frequency=RecurringVisitTemplate.FREQUENCY_CUSTOM,
+            interval_days=1,
+            start_date=today,
+            assigned_technician=self.technician,
+        )
+        Company.objects.filter(pk=self.company.pk).update(
+            plan=Company.PLAN_TRIAL,
+            trial_started_at=timezone.now() - timedelta(days=1),
+            trial_expires_at=timezone.now() + timedelta(days=6),
+        )
+        self.company.refresh_from_db()
+        Job.objects.create(
+            company=self.company,
+            location=self.location,
+            cleaner=self.technician,
+            scheduled_date=today,
+        )
+
+        # 2 шаблона x 7 дней = 14 визитов, квота trial — 10 джоб (1 уже есть)
+        out = StringIO()
+        call_command("materialize_recurring_visits", "--horizon-days", "6", "--dry-run", stdout=out)
+        self.assertIn("9 visits pending", out.getvalue())
+
+        # квота общая для всех шаблонов компании, ближайшие даты первыми
+        call_command("materialize_recurring_visits", "--horizon-days", "6", "--batch-size", "1", stdout=StringIO())
+        self.assertEqual(Job.objects.filter(company=self.company).count(), Company.TRIAL_MAX_JOBS)
+        self.assertTrue(self.company.trial_jobs_limit_reached())
+        self.assertEqual(
+            list(
+                Job.objects.filter(recurring_source__template=second)
+                .order_by("scheduled_date")
+                .values_list("scheduled_date", flat=True)
+            ),
+            [today, today + timedelta(days=1)],
+        )
+
+        out = StringIO()
+        call_command("materialize_recurring_visits", "--horizon-days", "6", stdout=out)
+        self.assertIn("2 skipped, 0 visits generated", out.getvalue())
+
+
+class ManagerRecurringJobsTests(TestCase):
+    """
+    /api/manager/recurring-jobs/: виртуальные вхождения и ленивая материализация.
+    """
+
+    def setUp(self):
+        from django.utils import timezone
+
+        from apps.locations.models import ChecklistTemplate, ChecklistTemplateItem
+
+        self.today = timezone.localdate()
+        self.company = Company.objects.create(name="RecurringCleanCo")
+        self.manager = User.objects.create_user(
+            email="manager@rclean.test",
+            phone="+15550009991",
+            password="testpass123",
+            role=User.ROLE_MANAGER,
+            company=self.company,
+        )
+        self.cleaner = User.objects.create_user(
+            email="cleaner@rclean.test",
+            phone="+15550009992",
+            password="testpass123",
+            role=User.ROLE_CLEANER,
+            company=self.company,
+        )
+        self.location = Location.objects.create(company=self.company, name="Office")
+        self.checklist = ChecklistTemplate.objects.create(company=self.company, name="Daily")
+        ChecklistTemplateItem.objects.create(template=self.checklist, order=1, text="Bins")
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+
+    def _create_schedule(self, **extra):
+        body = {
+            "location_id": self.location.id,
+            "cleaner_id": self.cleaner.id,
+            "checklist_template_id": self.checklist.id,
+            "scheduled_start_time": "09:00",
+            "frequency": "weekly",
+            "weekdays": [0, 1, 2, 3, 4, 5, 6],
+            "start_date": self.today.isoformat(),
+        }
+        body.update(extra)
+        return self.client.post("/api/manager/recurring-jobs/", body, format="json")
+
+    def test_occurrences_are_virtual_until_first_interaction(self):
+        from datetime import timedelta
+
+        resp = self._create_schedule()
+        self.assertEqual(resp.status_code, 201)
+        schedule_id = resp.data["id"]
+        day = self.today + timedelta(days=10)
+
+        occurrences = self.client.get(
+            "/api/manager/recurring-jobs/occurrences/",
+            {"date_from": self.today.isoformat(), "date_to": (self.today + timedelta(days=13)).isoformat()},
+        )
+        self.assertEqual(occurrences.status_code, 200)
+        self.assertEqual(len(occurrences.data), 14)
+        self.assertFalse(Job.objects.filter(company=self.company).exists())
+
+        planning = self.client.get(
+            "/api/manager/jobs/planning/", {"date": day.isoformat(), "include_recurring": "1"}
+        )
+        self.assertEqual(len(planning.data), 1)
+        self.assertTrue(planning.data[0]["is_virtual"])
+        self.assertIsNone(planning.data[0]["id"])
+
+        url = f"/api/manager/recurring-jobs/{schedule_id}/occurrences/{day.isoformat()}/"
+        created = self.client.post(url)
+        self.assertEqual(created.status_code, 201)
+        job = Job.objects.get(pk=created.data["id"])
+        self.assertEqual(job.recurring_schedule_id, schedule_id)
+        self.assertEqual(list(job.checklist_items.values_list("text", flat=True)), ["Bins"])
+        self.assertEqual(self.client.post(url).status_code, 200)
+
+        planning = self.client.get(
+            "/api/manager/jobs/planning/", {"date": day.isoformat(), "include_recurring": "1"}
+        )
+        self.assertEqual([row["id"] for row in planning.data], [job.id])
+
+        not_an_occurrence = f"/api/manager/recurring-jobs/{schedule_id}/occurrences/{(self.today - timedelta(days=1)).isoformat()}/"
+        self.assertEqual(self.client.post(not_an_occurrence).status_code, 400)
+
+    def test_materialize_command_creates_short_horizon_once(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        self._create_schedule()
+        self._create_schedule(weekdays=[], frequency="monthly", month_day=self.today.day)
+
+        call_command("materialize_recurring_jobs", "--horizon-days", "1", stdout=StringIO())
+        # ежедневное: сегодня и завтра; ежемесячное: сегодня
+        self.assertEqual(Job.objects.filter(company=self.company).count(), 3)
+
+        call_command("materialize_recurring_jobs", "--horizon-days", "1", stdout=StringIO())
+        self.assertEqual(Job.objects.filter(company=self.company).count(), 3)
+
+    def test_materialize_command_caps_trial_company_at_remaining_quota(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        self._create_schedule()
+        self._create_schedule(scheduled_start_time="14:00")
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        Company.objects.filter(pk=self.company.pk).update(
+            plan=Company.PLAN_TRIAL,
+            trial_started_at=timezone.now() - timedelta(days=1),
+            trial_expires_at=timezone.now() + timedelta(days=6),
+        )
+        self.company.refresh_from_db()
+        Job.objects.create(
+            company=self.company,
+            location=self.location,
+            cleaner=self.cleaner,
+            scheduled_date=self.today,
+        )
+
+        # 2 расписания x 7 дней = 14 вхождений, квота trial — 10 джоб (1 уже есть)
+        out = StringIO()
+        call_command("materialize_recurring_jobs", "--horizon-days", "6", "--dry-run", stdout=out)
+        self.assertIn("9 jobs would be created", out.getvalue())
+
+        # квота общая для всех батчей компании
+        call_command("materialize_recurring_jobs", "--horizon-days", "6", "--batch-size", "1", stdout=StringIO())
+        self.assertEqual(Job.objects.filter(company=self.company).count(), Company.TRIAL_MAX_JOBS)
+        self.assertTrue(self.company.trial_jobs_limit_reached())
+
+        out = StringIO()
+        call_command("materialize_recurring_jobs", "--horizon-days", "6", stdout=out)
+        self.assertIn("2 skipped, 0 jobs created", out.getvalue())
@@ -13,6 +13,7 @@ from . import views
 # - views_cleaner.py
 # - views_manager_company.py
 # - views_manager_jobs.py
+# - views_manager_recurring.py
 # - views_reports.py
 from apps.api import views as api_views
 
@@ -66,11 +67,21 @@ urlpatterns = [
         api_views.TodayJobsView.as_view(),
         name="jobs-today",
     ),
+    path(
+        "jobs/sync/",
+        api_views.CleanerJobsSyncView.as_view(),
+        name="jobs-sync",
+    ),
     path(
         "jobs/<int:pk>/",
         api_views.JobDetailView.as_view(),
         name="job-detail",
     ),
+    path(
+        "jobs/<int:pk>/mutations/",
+        api_views.JobMutationsView.as_view(),
+        name="job-mutations",
+    ),
     # Check-in / check-out
     path(
         "jobs/<int:pk>/check-in/",
@@ -99,11 +110,32 @@ urlpatterns = [
         api_views.JobPhotosView.as_view(),
         name="job-photos",
     ),
+    path(
+        "jobs/<int:pk>/photos/upload-slot/",
+        api_views.JobPhotoUploadSlotView.as_view(),
+        name="job-photo-upload-slot",
+    ),
+    path(
+        "jobs/<int:pk>/photos/finalize/",
+        api_views.JobPhotoFinalizeView.as_view(),
+        name="job-photo-finalize",
+    ),
+    path(
+        "uploads/photos/<str:token>/",
+        api_views.JobPhotoDirectUploadView.as_view(),
+        name="job-photo-direct-upload",
+    ),
     path(
         "jobs/<int:pk>/photos/<str:photo_type>/",
         api_views.JobPhotoDeleteView.as_view(),
         name="job-photo-delete",
     ),
+    # Protected media (photos / derivatives / logos)
+    path(
+        "media/<path:key>",
+        api_views.MediaFileView.as_view(),
+        name="media-file",
+    ),
     # PDF report
     path(
         "jobs/<int:pk>/report/pdf/",
@@ -179,6 +211,11 @@ urlpatterns = [
         api_views.ManagerJobsCreateView.as_view(),
         name="manager-jobs-create",
     ),
+    path(
+        "manager/jobs/bulk/",
+        api_views.ManagerJobsBulkCreateView.as_view(),
+        name="manager-jobs-bulk-create",
+    ),
     path(
         "manager/jobs/today/",
         api_views.ManagerJobsTodayView.as_view(),
@@ -194,6 +231,27 @@ urlpatterns = [
         api_views.ManagerJobDetailView.as_view(),
         name="manager-job-detail",
     ),
+    # Recurring cleaning schedules
+    path(
+        "manager/recurring-jobs/",
+        api_views.ManagerRecurringJobsView.as_view(),
+        name="manager-recurring-jobs",
+    ),
+    path(
+        "manager/recurring-jobs/occurrences/",
+        api_views.ManagerRecurringOccurrencesView.as_view(),
+        name="manager-recurring-jobs-occurrences",
+    ),
+    path(
+        "manager/recurring-jobs/<int:pk>/",
+        api_views.ManagerRecurringJobDetailView.as_view(),
+        name="manager-recurring-job-detail",
+    ),
+    path(
+        "manager/recurring-jobs/<int:pk>/occurrences/<str:day>/",
+        api_views.ManagerRecurringOccurrenceMaterializeView.as_view(),
+        name="manager-recurring-job-occurrence",
+    ),
     path(
         "manager/jobs/<int:pk>/force-complete/",
         api_views.ManagerJobForceCompleteView.as_view(),
@@ -12,13 +12,22 @@ from apps.locations.models import (
     ChecklistTemplateItem,
 )
 
+from .resource_versions import (
+    FAMILY_CHECKLISTS,
+    FAMILY_LOCATIONS,
+    FAMILY_USERS,
+    conditional_on,
+)
+
 from .views_auth import *  # noqa
 from .views_cleaner import *  # noqa
 from .views_company import *  # noqa
 from .views_manager_company import *  # noqa
 from .views_manager_jobs import *  # noqa
+from .views_manager_recurring import *  # noqa
 from .views_reports import *  # noqa
 from .views_maintenance import *  # noqa
+from .views_media import *  # noqa
 
 
 # === Default checklist templates for new companies ===
@@ -208,6 +217,7 @@ class ManagerMetaView(APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @conditional_on(FAMILY_USERS, FAMILY_LOCATIONS, FAMILY_CHECKLISTS)
     def get(self, request):
         user = request.user
         company = getattr(user, "company", None)
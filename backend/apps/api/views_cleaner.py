@@ -1,38 +1,70 @@
 # backend/apps/api/views_cleaner.py
 
-import uuid
+from datetime import date, timedelta
 
 from django.core.exceptions import ValidationError as DjangoValidationError
-from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import BooleanField, Case, Count, Exists, F, OuterRef, Q, Value, When
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.gzip import gzip_page
 
 from rest_framework import status
 from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.accounts.models import User
-from apps.jobs.image_utils import normalize_job_photo_to_jpeg
+from apps.jobs.direct_upload import (
+    BACKEND_LOCAL,
+    DirectUploadError,
+    build_upload_instructions,
+    get_backend,
+    get_expires_seconds,
+    get_max_bytes,
+    is_enabled as direct_upload_enabled,
+    load_upload_token,
+    make_upload_token,
+    store_local_upload,
+    verify_uploaded_object,
+)
+from apps.jobs.image_utils import raw_upload_extension
 from apps.jobs.models import (
     File,
     Job,
     JobCheckEvent,
     JobChecklistItem,
+    JobMutationReceipt,
     JobPhoto,
 )
-from apps.jobs.utils import distance_m, extract_exif_data
+from apps.jobs.photo_storage import (
+    compute_content_hash,
+    find_photo_by_content_hash,
+    generate_photo_derivatives_for_file_id,
+    photo_storage_key,
+    release_photo_objects,
+)
+from apps.jobs.photo_processing import dispatch_photo_processing, photo_distance_violation
+from apps.jobs.utils import distance_m
 
+from .models import JobSyncTombstone
+from .pagination import parse_sync_token
 from .serializers import (
     ChecklistBulkUpdateSerializer,
     ChecklistToggleSerializer,
     JobCheckInSerializer,
     JobChecklistItemSerializer,
     JobDetailSerializer,
+    JobMutationBatchSerializer,
+    JobPhotoFinalizeSerializer,
     JobPhotoUploadSerializer,
+    JobPhotoUploadSlotSerializer,
+    build_job_photo_payload,
 )
 
 
@@ -102,98 +134,399 @@ class JobDetailView(APIView):
             cleaner=user,
         )
 
-        data = JobDetailSerializer(job).data
-
-        photos = data.get("photos") or []
-        for p in photos:
-            file_url = p.get("file_url")
-            if file_url and isinstance(file_url, str) and file_url.startswith("/"):
-                p["file_url"] = request.build_absolute_uri(file_url)
+        data = JobDetailSerializer(job, context={"request": request}).data
 
         return Response(data, status=status.HTTP_200_OK)
 
 
-class JobCheckInView(APIView):
+# окно синхронизации дня (приложение обычно берёт сегодня ± пару дней)
+SYNC_MAX_WINDOW_DAYS = 14
+# перекрытие delta-окна: транзакции, закоммиченные чуть позже выдачи
+# sync_token, но с updated_at до него, клиент получит повторно (upsert по id)
+SYNC_OVERLAP = timedelta(seconds=30)
+# сколько живут JobSyncTombstone; since старше — полная выдача окна
+SYNC_TOMBSTONE_TTL = timedelta(days=30)
+
+
+@method_decorator(gzip_page, name="dispatch")
+class CleanerJobsSyncView(APIView):
     """
-    Check in клинера на задачу.
+    Всё, что нужно приложению клинера на окно дат, одним запросом
+    (вместо /api/jobs/today/ + /api/jobs/<id>/ на каждую джобу).
 
-    POST /api/jobs/<id>/check-in/
-    Body: { "latitude": 25.2048, "longitude": 55.2708 }
+    GET /api/jobs/sync/?date_from=YYYY-MM-DD&date_to=YYYY-MM-DD&since=<sync_token>
+
+    - date_from / date_to — по умолчанию сегодня, окно не больше SYNC_MAX_WINDOW_DAYS;
+    - jobs — payload как у JobDetailView (чеклист, события, фото, координаты);
+    - since — sync_token предыдущего ответа: в jobs только изменённые джобы,
+      removed_ids — джобы, которые были в окне у этого клинера и ушли из
+      него (переназначены, перенесены, удалены; см. JobSyncTombstone);
+    - since старше SYNC_TOMBSTONE_TTL — full_resync: true и всё окно целиком,
+      клиент заменяет свой набор;
+    - ответ сжимается gzip при Accept-Encoding: gzip.
+
+    Число запросов не зависит от числа джоб (фиксированные prefetch).
     """
 
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
-    def post(self, request, pk: int):
+    def get(self, request):
         user = request.user
 
         if user.role != User.ROLE_CLEANER:
             return Response(
-                {"detail": "Only cleaners can check in."},
+                {"detail": "Only cleaners can sync jobs."},
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        # Block inactive cleaners from check-in
-        if not user.is_active:
+        today = timezone.localdate()
+        try:
+            date_from = _parse_sync_date(request.query_params.get("date_from"), today)
+            date_to = _parse_sync_date(request.query_params.get("date_to"), date_from)
+        except ValueError:
             return Response(
-                {"detail": "Account deactivated. Cannot check in."},
-                status=status.HTTP_403_FORBIDDEN,
+                {"detail": "Invalid date. Use YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-        job = get_object_or_404(
-            Job.objects.select_related("location"),
-            pk=pk,
-            cleaner=user,
-        )
-
-        if job.status != Job.STATUS_SCHEDULED:
+        if date_to < date_from or (date_to - date_from).days >= SYNC_MAX_WINDOW_DAYS:
             return Response(
-                {"detail": "Check in allowed only for scheduled jobs."},
+                {"detail": f"date_to must be within {SYNC_MAX_WINDOW_DAYS} days after date_from."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        serializer = JobCheckInSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-
-        lat = serializer.validated_data["latitude"]
-        lon = serializer.validated_data["longitude"]
+        since = None
+        since_param = request.query_params.get("since")
+        if since_param:
+            since = parse_sync_token(since_param)
+            if since is None:
+                return Response(
+                    {"detail": "Invalid since. Use the sync_token from a previous response."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
-        location = job.location
-        if location.latitude is None or location.longitude is None:
-            return Response(
-                {"detail": "Job location has no coordinates."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        # токен фиксируем до чтения, чтобы изменения во время запроса
+        # попали в следующий delta
+        sync_token = timezone.now()
 
-        dist = distance_m(lat, lon, location.latitude, location.longitude)
+        window = {"scheduled_date__gte": date_from, "scheduled_date__lte": date_to}
 
-        if dist > 100:
-            return Response(
-                {"detail": "Too far from job location.", "distance_m": round(dist, 2)},
-                status=status.HTTP_400_BAD_REQUEST,
+        qs = (
+            Job.objects.filter(cleaner=user, **window)
+            .select_related("location")
+            .prefetch_related("checklist_items", "check_events", "photos__file")
+            .annotate(
+                # для compute_sla_status_for_job без запроса на каждую джобу
+                checklist_completed=~Exists(
+                    JobChecklistItem.objects.filter(job=OuterRef("pk"), is_completed=False)
+                )
             )
+            .order_by("scheduled_date", "scheduled_start_time", "id")
+        )
 
-        job.check_in()
+        full_resync = since is not None and since < sync_token - SYNC_TOMBSTONE_TTL
+        removed_ids = []
+        if since is not None and not full_resync:
+            changed_after = since - SYNC_OVERLAP
+            qs = qs.filter(updated_at__gt=changed_after)
+            removed_ids = _sync_removed_ids(user, window, changed_after)
 
-        JobCheckEvent.objects.create(
-            job=job,
-            user=user,
-            event_type=JobCheckEvent.TYPE_CHECK_IN,
-            latitude=lat,
-            longitude=lon,
-            distance_m=dist,
-        )
+        jobs = JobDetailSerializer(qs, many=True, context={"request": request}).data
 
         return Response(
             {
-                "detail": "Check in successful.",
-                "job_id": job.id,
-                "job_status": job.status,
+                "date_from": date_from,
+                "date_to": date_to,
+                "jobs": jobs,
+                "removed_ids": removed_ids,
+                "full_resync": full_resync,
+                "sync_token": sync_token.isoformat(),
             },
             status=status.HTTP_200_OK,
         )
 
 
+def _sync_removed_ids(user, window, changed_after) -> list[int]:
+    """
+    id джоб, которые после changed_after ушли из (клинер, окно): есть
+    tombstone со старым назначением в окне, и сейчас джоба в окне клинера
+    не видна (переназначенная туда и обратно придёт в jobs).
+    Чужие джобы сюда не попадают — tombstone пишется на прежнего клинера.
+    """
+    still_visible = Job.objects.filter(cleaner=user, **window).values("id")
+    return list(
+        JobSyncTombstone.objects.filter(
+            cleaner_id=user.id,
+            created_at__gt=changed_after,
+            **window,
+        )
+        .exclude(job_id__in=still_visible)
+        .order_by("job_id")
+        .values_list("job_id", flat=True)
+        .distinct()
+    )
+
+
+def _parse_sync_date(raw, default: date) -> date:
+    if not raw:
+        return default
+    return date.fromisoformat(raw)
+
+
+# --- Операции клинера над джобой -------------------------------------------
+# Общие для одиночных endpoint'ов и офлайн-батча (JobMutationsView).
+# Возвращают Response; Http404 / ValidationError пробрасываются как есть.
+
+
+def _location_distance_error(job, lat, lon):
+    """
+    (distance, error_response). error_response — None, если клинер рядом.
+    """
+    location = job.location
+    if location.latitude is None or location.longitude is None:
+        return None, Response(
+            {"detail": "Job location has no coordinates."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    dist = distance_m(lat, lon, location.latitude, location.longitude)
+
+    if dist > 100:
+        return dist, Response(
+            {"detail": "Too far from job location.", "distance_m": round(dist, 2)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return dist, None
+
+
+def _check_in_job(job, user, data) -> Response:
+    if job.status != Job.STATUS_SCHEDULED:
+        return Response(
+            {"detail": "Check in allowed only for scheduled jobs."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    serializer = JobCheckInSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+
+    lat = serializer.validated_data["latitude"]
+    lon = serializer.validated_data["longitude"]
+
+    dist, error = _location_distance_error(job, lat, lon)
+    if error is not None:
+        return error
+
+    job.check_in()
+
+    JobCheckEvent.objects.create(
+        job=job,
+        user=user,
+        event_type=JobCheckEvent.TYPE_CHECK_IN,
+        latitude=lat,
+        longitude=lon,
+        distance_m=dist,
+    )
+
+    return Response(
+        {
+            "detail": "Check in successful.",
+            "job_id": job.id,
+            "job_status": job.status,
+        },
+        status=status.HTTP_200_OK,
+    )
+
+
+def _check_out_job(job, user, data) -> Response:
+    """
+    job должен быть заблокирован (select_for_update) вызывающим.
+    """
+    if job.status != Job.STATUS_IN_PROGRESS:
+        return Response(
+            {"detail": "Check out allowed only for in_progress jobs."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    serializer = JobCheckInSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+
+    lat = serializer.validated_data["latitude"]
+    lon = serializer.validated_data["longitude"]
+
+    dist, error = _location_distance_error(job, lat, lon)
+    if error is not None:
+        return error
+
+    try:
+        job.check_out()
+    except DjangoValidationError as e:
+        # Support structured error format {code, message, fields}
+        if hasattr(e, 'message') and isinstance(e.message, dict):
+            return Response(e.message, status=status.HTTP_400_BAD_REQUEST)
+        # Fallback to standardized format (no {detail} allowed)
+        return Response({
+            "code": "VALIDATION_ERROR",
+            "message": str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    JobCheckEvent.objects.create(
+        job=job,
+        user=user,
+        event_type=JobCheckEvent.TYPE_CHECK_OUT,
+        latitude=lat,
+        longitude=lon,
+        distance_m=dist,
+    )
+
+    return Response(
+        {
+            "detail": "Check out successful.",
+            "job_id": job.id,
+            "job_status": job.status,
+        },
+        status=status.HTTP_200_OK,
+    )
+
+
+def _checklist_update_error(job_id, user) -> Response:
+    """
+    Условный UPDATE чеклиста не затронул строк — выясняем почему
+    (редкий путь, отдельный запрос).
+    """
+    job_status = Job.objects.filter(id=job_id, cleaner=user).values_list("status", flat=True).first()
+    if job_status is None:
+        raise Http404
+    if job_status != Job.STATUS_IN_PROGRESS:
+        return Response(
+            {"detail": "Checklist can be updated only when job is in progress"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return None
+
+
+def _checklist_summary(job_id) -> dict:
+    summary = JobChecklistItem.objects.filter(job_id=job_id).aggregate(
+        total_count=Count("id"),
+        completed_count=Count("id", filter=Q(is_completed=True)),
+        required_remaining=Count("id", filter=Q(is_required=True, is_completed=False)),
+    )
+    summary["checklist_completed"] = summary["required_remaining"] == 0
+    return summary
+
+
+def _editable_checklist_items(job_id, user):
+    """Пункты джобы, которые клинер может менять прямо сейчас (условие UPDATE)."""
+    return JobChecklistItem.objects.filter(
+        job_id=job_id,
+        job__cleaner=user,
+        job__status=Job.STATUS_IN_PROGRESS,
+    )
+
+
+def _toggle_checklist_item(job_id, user, item_id, data) -> Response:
+    """
+    Один условный UPDATE (пункт + джоба клинера + in_progress) без
+    блокировок: число затронутых строк решает, успех это или ошибка.
+    """
+    serializer = ChecklistToggleSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+    is_completed = serializer.validated_data["is_completed"]
+
+    updated = _editable_checklist_items(job_id, user).filter(id=item_id).update(is_completed=is_completed)
+    if not updated:
+        error = _checklist_update_error(job_id, user)
+        if error is not None:
+            return error
+        raise Http404
+
+    Job.touch(job_id)
+
+    return Response(
+        {
+            "id": item_id,
+            "job_id": job_id,
+            "is_completed": is_completed,
+            "summary": _checklist_summary(job_id),
+        },
+        status=status.HTTP_200_OK,
+    )
+
+
+def _bulk_update_checklist(job_id, user, data) -> Response:
+    """
+    Один UPDATE ... CASE по всем пунктам. Всё или ничего: если обновлено
+    меньше пунктов, чем прислано, транзакция откатывается.
+    """
+    serializer = ChecklistBulkUpdateSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+
+    updates = {it["id"]: bool(it.get("is_completed", True)) for it in serializer.validated_data["items"]}
+
+    with transaction.atomic():
+        updated = _editable_checklist_items(job_id, user).filter(id__in=updates).update(
+            is_completed=Case(
+                *(When(id=item_id, then=Value(value)) for item_id, value in updates.items()),
+                default=F("is_completed"),
+                output_field=BooleanField(),
+            )
+        )
+        if updated != len(updates):
+            transaction.set_rollback(True)
+
+    if updated != len(updates):
+        error = _checklist_update_error(job_id, user) if not updated else None
+        if error is not None:
+            return error
+        return Response(
+            {"detail": "One or more checklist items not found for this job"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    Job.touch(job_id)
+
+    return Response(
+        {"updated_count": updated, "summary": _checklist_summary(job_id)},
+        status=status.HTTP_200_OK,
+    )
+
+
+class JobCheckInView(APIView):
+    """
+    Check in клинера на задачу.
+
+    POST /api/jobs/<id>/check-in/
+    Body: { "latitude": 25.2048, "longitude": 55.2708 }
+    """
+
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk: int):
+        user = request.user
+
+        if user.role != User.ROLE_CLEANER:
+            return Response(
+                {"detail": "Only cleaners can check in."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Block inactive cleaners from check-in
+        if not user.is_active:
+            return Response(
+                {"detail": "Account deactivated. Cannot check in."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        job = get_object_or_404(
+            Job.objects.select_related("location"),
+            pk=pk,
+            cleaner=user,
+        )
+
+        return _check_in_job(job, user, request.data)
+
+
 class JobCheckOutView(APIView):
     """
     Check out клинера с задачи.
@@ -228,77 +561,43 @@ class JobCheckOutView(APIView):
                 pk=pk,
                 cleaner=user,
             )
+            response = _check_out_job(job, user, request.data)
 
-            if job.status != Job.STATUS_IN_PROGRESS:
-                return Response(
-                    {"detail": "Check out allowed only for in_progress jobs."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+        return response
 
-            serializer = JobCheckInSerializer(data=request.data)
-            serializer.is_valid(raise_exception=True)
 
-            lat = serializer.validated_data["latitude"]
-            lon = serializer.validated_data["longitude"]
+class ChecklistItemToggleView(APIView):
+    """
+    Toggle одного пункта чеклиста.
 
-            location = job.location
-            if location.latitude is None or location.longitude is None:
-                return Response(
-                    {"detail": "Job location has no coordinates."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+    POST /api/jobs/<job_id>/checklist/<item_id>/toggle/
+    Body: { "is_completed": true/false }  (опционально, по умолчанию true)
+    """
 
-            dist = distance_m(lat, lon, location.latitude, location.longitude)
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
 
-            if dist > 100:
-                return Response(
-                    {"detail": "Too far from job location.", "distance_m": round(dist, 2)},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+    def post(self, request, job_id: int, item_id: int):
+        user = request.user
 
-            try:
-                job.check_out()
-            except DjangoValidationError as e:
-                # Support structured error format {code, message, fields}
-                if hasattr(e, 'message') and isinstance(e.message, dict):
-                    return Response(e.message, status=status.HTTP_400_BAD_REQUEST)
-                # Fallback to standardized format (no {detail} allowed)
-                return Response({
-                    "code": "VALIDATION_ERROR",
-                    "message": str(e)
-                }, status=status.HTTP_400_BAD_REQUEST)
-
-            JobCheckEvent.objects.create(
-                job=job,
-                user=user,
-                event_type=JobCheckEvent.TYPE_CHECK_OUT,
-                latitude=lat,
-                longitude=lon,
-                distance_m=dist,
+        if user.role != User.ROLE_CLEANER:
+            return Response(
+                {"detail": "Only cleaners can update checklist."},
+                status=status.HTTP_403_FORBIDDEN,
             )
 
-        return Response(
-            {
-                "detail": "Check out successful.",
-                "job_id": job.id,
-                "job_status": job.status,
-            },
-            status=status.HTTP_200_OK,
-        )
+        return _toggle_checklist_item(job_id, user, item_id, request.data)
 
 
-class ChecklistItemToggleView(APIView):
+class ChecklistBulkUpdateView(APIView):
     """
-    Toggle одного пункта чеклиста.
-
-    POST /api/jobs/<job_id>/checklist/<item_id>/toggle/
-    Body: { "is_completed": true/false }  (опционально, по умолчанию true)
+    Bulk update чеклиста.
     """
 
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
-    def post(self, request, job_id: int, item_id: int):
+    def post(self, request, job_id: int):
         user = request.user
 
         if user.role != User.ROLE_CLEANER:
@@ -307,85 +606,270 @@ class ChecklistItemToggleView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        # AUDIT FIX: Add atomic transaction
-        with transaction.atomic():
-            job = get_object_or_404(Job, id=job_id, cleaner=user)
+        return _bulk_update_checklist(job_id, user, request.data)
 
-            if job.status != Job.STATUS_IN_PROGRESS:
-                return Response(
-                    {"detail": "Checklist can be updated only when job is in progress"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
 
-            # AUDIT FIX: Add select_for_update() to prevent lost updates
-            item = get_object_or_404(
-                JobChecklistItem.objects.select_for_update(),
-                id=item_id,
-                job=job
-            )
+# --- Офлайн-батч (JobMutationsView) ---------------------------------------
 
-            serializer = ChecklistToggleSerializer(data=request.data)
-            serializer.is_valid(raise_exception=True)
+MUTATION_MAX_OPERATIONS = 100
 
-            item.is_completed = serializer.validated_data["is_completed"]
-            item.save(update_fields=["is_completed"])
 
-        return Response(
-            {"id": item.id, "job_id": job.id, "is_completed": item.is_completed},
-            status=status.HTTP_200_OK,
-        )
+def _mutation_check_in(job, user, payload):
+    return _check_in_job(job, user, payload)
 
 
-class ChecklistBulkUpdateView(APIView):
+def _mutation_check_out(job, user, payload):
+    return _check_out_job(job, user, payload)
+
+
+def _mutation_checklist_toggle(job, user, payload):
+    return _toggle_checklist_item(job.id, user, payload.get("item_id"), payload)
+
+
+def _mutation_checklist_bulk(job, user, payload):
+    return _bulk_update_checklist(job.id, user, payload)
+
+
+# ключи совпадают с JobMutationOperationSerializer.TYPES
+MUTATION_HANDLERS = {
+    "check_in": _mutation_check_in,
+    "checklist_toggle": _mutation_checklist_toggle,
+    "checklist_bulk": _mutation_checklist_bulk,
+    "check_out": _mutation_check_out,
+}
+
+
+class _MutationFailed(Exception):
+    """Откат savepoint операции батча с сохранением её ответа."""
+
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
+
+
+class JobMutationsView(APIView):
     """
-    Bulk update чеклиста.
+    Офлайн-батч операций клинера над одной джобой.
+
+    POST /api/jobs/<id>/mutations/
+    Body:
+    {
+      "operations": [
+        {"key": "<uuid>", "type": "check_in", "device_timestamp": "...",
+         "payload": {"latitude": 25.2, "longitude": 55.27}},
+        {"key": "<uuid>", "type": "checklist_toggle", "payload": {"item_id": 7, "is_completed": true}},
+        {"key": "<uuid>", "type": "checklist_bulk", "payload": {"items": [{"id": 7, "is_completed": true}]}},
+        {"key": "<uuid>", "type": "check_out", "payload": {"latitude": 25.2, "longitude": 55.27}}
+      ]
+    }
+
+    Операции применяются по порядку в одной транзакции под одной блокировкой
+    Job; каждая — в своём savepoint, ошибка откатывает только её.
+    Успешные операции запоминаются по (user, key) в JobMutationReceipt:
+    повтор того же ключа возвращает сохранённый результат ("replayed": true).
+    Ключ, уже применённый на другой джобе, — 409 для этой операции
+    (ни применения, ни чужого результата). Неуспешные не запоминаются —
+    их можно повторить с тем же ключом.
+
+    device_timestamp только сохраняется в квитанции (для разбора
+    инцидентов): порядок и время событий определяет сервер.
     """
 
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
-    def post(self, request, job_id: int):
+    def post(self, request, pk: int):
         user = request.user
 
         if user.role != User.ROLE_CLEANER:
             return Response(
-                {"detail": "Only cleaners can update checklist."},
+                {"detail": "Only cleaners can sync job changes."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        if not user.is_active:
+            return Response(
+                {"detail": "Account deactivated. Cannot sync job changes."},
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        # AUDIT FIX: Add atomic transaction
+        serializer = JobMutationBatchSerializer(
+            data=request.data,
+            context={"max_operations": MUTATION_MAX_OPERATIONS},
+        )
+        serializer.is_valid(raise_exception=True)
+        operations = serializer.validated_data["operations"]
+
         with transaction.atomic():
-            job = get_object_or_404(Job, id=job_id, cleaner=user)
+            job = get_object_or_404(
+                Job.objects.select_related("location").select_for_update(),
+                pk=pk,
+                cleaner=user,
+            )
 
-            if job.status != Job.STATUS_IN_PROGRESS:
-                return Response(
-                    {"detail": "Checklist can be updated only when job is in progress"},
-                    status=status.HTTP_400_BAD_REQUEST,
+            seen = {
+                receipt.idempotency_key: receipt
+                for receipt in JobMutationReceipt.objects.filter(
+                    user=user,
+                    idempotency_key__in=[op["key"] for op in operations],
                 )
+            }
+
+            results = []
+            receipts = []
+            for op in operations:
+                receipt = seen.get(op["key"])
+                if receipt is not None and receipt.job_id != job.id:
+                    results.append(_mutation_result(
+                        op,
+                        status.HTTP_409_CONFLICT,
+                        {"detail": "Idempotency key already used for another job."},
+                    ))
+                    continue
+                if receipt is not None:
+                    results.append(_mutation_result(op, receipt.status_code, receipt.result, replayed=True))
+                    continue
+
+                response = _apply_mutation(job, user, op)
+                results.append(_mutation_result(op, response.status_code, response.data))
+
+                if response.status_code == status.HTTP_200_OK:
+                    receipt = JobMutationReceipt(
+                        user=user,
+                        job=job,
+                        idempotency_key=op["key"],
+                        operation=op["type"],
+                        device_timestamp=op.get("device_timestamp"),
+                        status_code=response.status_code,
+                        result=response.data,
+                    )
+                    receipts.append(receipt)
+                    seen[op["key"]] = receipt
 
-            serializer = ChecklistBulkUpdateSerializer(data=request.data)
-            serializer.is_valid(raise_exception=True)
+            if receipts:
+                # ключи других джоб отсеяны выше; конфликт остаётся только
+                # при гонке с параллельным батчем этого же клинера на другой
+                # джобе — запомнится та квитанция, что закоммитилась первой
+                JobMutationReceipt.objects.bulk_create(receipts, ignore_conflicts=True)
+                Job.touch(job.id)
 
-            items = serializer.validated_data["items"]
-            ids = [it["id"] for it in items]
-            updates = {it["id"]: it.get("is_completed", True) for it in items}
+        return Response(
+            {
+                "job_id": job.id,
+                "job_status": job.status,
+                "results": results,
+            },
+            status=status.HTTP_200_OK,
+        )
 
-            # AUDIT FIX: Add select_for_update() to prevent lost updates
-            qs = JobChecklistItem.objects.filter(job=job, id__in=ids).select_for_update()
-            found = {obj.id: obj for obj in qs}
 
-            if len(found) != len(set(ids)):
-                return Response(
-                    {"detail": "One or more checklist items not found for this job"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+def _apply_mutation(job, user, op) -> Response:
+    handler = MUTATION_HANDLERS[op["type"]]
+    snapshot = (job.status, job.actual_start_time, job.actual_end_time)
 
-            for iid, obj in found.items():
-                obj.is_completed = bool(updates[iid])
+    try:
+        with transaction.atomic():
+            response = handler(job, user, op["payload"])
+            if response.status_code >= 400:
+                raise _MutationFailed(response)
+    except _MutationFailed as exc:
+        response = exc.response
+    except Http404:
+        response = Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+    except ValidationError as exc:
+        response = Response(exc.detail, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        return response
+
+    # savepoint откатил БД — возвращаем и объект в памяти
+    job.status, job.actual_start_time, job.actual_end_time = snapshot
+    return response
+
+
+def _mutation_result(op, status_code, data, replayed=False) -> dict:
+    return {
+        "key": op["key"],
+        "type": op["type"],
+        "status": status_code,
+        "data": data,
+        "replayed": replayed,
+    }
+
+
+def _photo_order_error(job, photo_type):
+    """
+    AFTER требует BEFORE.
+    """
+    if photo_type == JobPhoto.TYPE_AFTER and not JobPhoto.objects.filter(
+        job=job, photo_type=JobPhoto.TYPE_BEFORE
+    ).exists():
+        return Response(
+            {"detail": "Cannot upload after photo before before photo."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return None
+
+
+def _photo_upload_payload(photo, request, exif_missing=None):
+    out = build_job_photo_payload(photo, request)
+    if exif_missing is None and photo.is_ready:
+        exif_missing = photo.photo_timestamp is None and photo.latitude is None
+    # pending: EXIF ещё не прочитан
+    out["exif_missing"] = None if exif_missing is None else bool(exif_missing)
+    return out
 
-            JobChecklistItem.objects.bulk_update(found.values(), ["is_completed"])
 
-        return Response({"updated_count": len(found)}, status=status.HTTP_200_OK)
+def _delete_job_photo(photo) -> None:
+    file_obj = photo.file
+    photo.delete()
+    Job.touch(photo.job_id)
+    if file_obj:
+        file_obj.delete()
+        # объект в storage может быть общим (dedup по content_hash)
+        release_photo_objects(file_obj)
+
+
+def _existing_photo_response(job, photo_type, content_hash, request):
+    """
+    Максимум одно фото каждого типа;
+    повторная отправка тех же байт (retry после обрыва) — no-op.
+    Отклонённое (rejected) фото заменяется новой загрузкой.
+    """
+    existing = (
+        JobPhoto.objects.filter(job=job, photo_type=photo_type)
+        .select_related("file")
+        .first()
+    )
+    if existing is None:
+        return None
+
+    if existing.processing_status == JobPhoto.STATUS_REJECTED:
+        _delete_job_photo(existing)
+        return None
+
+    if existing.file.content_hash and existing.file.content_hash == content_hash:
+        out = _photo_upload_payload(existing, request)
+        out["deduplicated"] = True
+        return Response(out, status=status.HTTP_200_OK)
+
+    return Response(
+        {"detail": f"{photo_type} photo already exists for this job."},
+        status=status.HTTP_409_CONFLICT,
+    )
+
+
+def _photo_distance_error(job, exif_lat, exif_lon):
+    dist = photo_distance_violation(job.location, exif_lat, exif_lon)
+    if dist is None:
+        return None
+
+    return Response(
+        {
+            "detail": "Photo too far from job location.",
+            "distance_m": round(dist, 2),
+        },
+        status=status.HTTP_400_BAD_REQUEST,
+    )
 
 
 class JobPhotosView(APIView):
@@ -395,6 +879,10 @@ class JobPhotosView(APIView):
     POST /api/jobs/<id>/photos/
       multipart: photo_type=before|after, file=<file>
 
+    Сырые байты сохраняются как есть, фото создаётся в состоянии
+    processing_status="pending"; EXIF, проверка расстояния, HEIC -> JPEG
+    и превью — после коммита (apps.jobs.photo_processing).
+
     GET /api/jobs/<id>/photos/
     """
 
@@ -418,24 +906,133 @@ class JobPhotosView(APIView):
             .order_by("photo_type", "id")
         )
 
-        data = []
-        for p in photos:
-            file_url = p.file.file_url if p.file else None
-            if file_url and file_url.startswith("/"):
-                file_url = request.build_absolute_uri(file_url)
+        data = [build_job_photo_payload(p, request) for p in photos]
+
+        return Response(data, status=status.HTTP_200_OK)
+
+    def post(self, request, pk: int):
+        user = request.user
 
-            data.append(
-                {
-                    "photo_type": p.photo_type,
-                    "file_url": file_url,
-                    "latitude": p.latitude,
-                    "longitude": p.longitude,
-                    "photo_timestamp": p.photo_timestamp,
-                    "created_at": p.created_at,
-                }
+        if user.role != User.ROLE_CLEANER:
+            return Response(
+                {"detail": "Only cleaners can upload photos."},
+                status=status.HTTP_403_FORBIDDEN,
             )
 
-        return Response(data, status=status.HTTP_200_OK)
+        job = get_object_or_404(
+            Job.objects.select_related("location"),
+            pk=pk,
+            cleaner=user
+        )
+
+        if job.status != Job.STATUS_IN_PROGRESS:
+            return Response(
+                {"detail": "Photos can be uploaded only when job is in progress."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = JobPhotoUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        photo_type = serializer.validated_data["photo_type"]
+        uploaded = serializer.validated_data["file"]
+
+        error = _photo_order_error(job, photo_type)
+        if error is not None:
+            return error
+
+        content_hash = compute_content_hash(uploaded)
+
+        existing = _existing_photo_response(job, photo_type, content_hash, request)
+        if existing is not None:
+            return existing
+
+        # те же байты уже обработаны у компании — переиспользуем объект
+        # (и EXIF: одинаковые байты = одинаковые метаданные)
+        source_photo = find_photo_by_content_hash(job.company_id, content_hash)
+
+        raw_key = None
+        if source_photo is not None:
+            error = _photo_distance_error(job, source_photo.latitude, source_photo.longitude)
+            if error is not None:
+                return error
+        else:
+            # запись в storage — вне транзакции
+            raw_key = default_storage.save(
+                photo_storage_key(
+                    job.company_id, job.id, photo_type, ext=raw_upload_extension(uploaded)
+                ),
+                uploaded,
+            )
+
+        try:
+            with transaction.atomic():
+                if source_photo is not None:
+                    source_file = source_photo.file
+                    db_file = File.objects.create(
+                        file_url=source_file.file_url,
+                        thumb_url=source_file.thumb_url,
+                        medium_url=source_file.medium_url,
+                        content_hash=content_hash,
+                        original_name=uploaded.name or "",
+                        content_type=source_file.content_type,
+                        size_bytes=source_file.size_bytes,
+                    )
+                    job_photo = JobPhoto.objects.create(
+                        job=job,
+                        file=db_file,
+                        photo_type=photo_type,
+                        latitude=source_photo.latitude,
+                        longitude=source_photo.longitude,
+                        photo_timestamp=source_photo.photo_timestamp,
+                    )
+                    if not db_file.thumb_url:
+                        transaction.on_commit(
+                            lambda: generate_photo_derivatives_for_file_id(db_file.id)
+                        )
+                else:
+                    db_file = File.objects.create(
+                        file_url=default_storage.url(raw_key),
+                        content_hash=content_hash,
+                        original_name=uploaded.name or "",
+                        content_type=getattr(uploaded, "content_type", "") or "",
+                        size_bytes=getattr(uploaded, "size", None),
+                    )
+                    job_photo = JobPhoto.objects.create(
+                        job=job,
+                        file=db_file,
+                        photo_type=photo_type,
+                        processing_status=JobPhoto.STATUS_PENDING,
+                    )
+                    transaction.on_commit(
+                        lambda: dispatch_photo_processing(job_photo.id)
+                    )
+                Job.touch(job.id)
+        except IntegrityError:
+            # параллельная загрузка того же типа (uniq_job_photo_type)
+            if raw_key:
+                default_storage.delete(raw_key)
+            return Response(
+                {"detail": f"{photo_type} photo already exists for this job."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        return Response(_photo_upload_payload(job_photo, request), status=status.HTTP_201_CREATED)
+
+
+class JobPhotoUploadSlotView(APIView):
+    """
+    Шаг 1 direct-to-storage загрузки: выдаёт подписанный PUT URL.
+
+    POST /api/jobs/<id>/photos/upload-slot/
+      {photo_type, content_type: "image/jpeg", size_bytes, sha256}
+
+    upload_required=false — эти байты уже есть в storage компании,
+    клиент сразу вызывает finalize.
+    """
+
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
 
     def post(self, request, pk: int):
         user = request.user
@@ -446,119 +1043,255 @@ class JobPhotosView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        # AUDIT FIX: Atomic transaction for photo upload
-        with transaction.atomic():
-            job = get_object_or_404(
-                Job.objects.select_related("location"),
-                pk=pk,
-                cleaner=user
+        if not direct_upload_enabled():
+            return Response(
+                {"detail": "Direct upload is not enabled."},
+                status=status.HTTP_404_NOT_FOUND,
             )
 
-            if job.status != Job.STATUS_IN_PROGRESS:
-                return Response(
-                    {"detail": "Photos can be uploaded only when job is in progress."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+        job = get_object_or_404(Job, pk=pk, cleaner=user)
 
-            serializer = JobPhotoUploadSerializer(data=request.data)
-            serializer.is_valid(raise_exception=True)
+        if job.status != Job.STATUS_IN_PROGRESS:
+            return Response(
+                {"detail": "Photos can be uploaded only when job is in progress."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-            photo_type = serializer.validated_data["photo_type"]
-            uploaded = serializer.validated_data["file"]
+        serializer = JobPhotoUploadSlotSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
 
-            # AFTER требует BEFORE
-            if photo_type == JobPhoto.TYPE_AFTER:
-                if not JobPhoto.objects.filter(
-                    job=job, photo_type=JobPhoto.TYPE_BEFORE
-                ).exists():
-                    return Response(
-                        {"detail": "Cannot upload after photo before before photo."},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
+        if data["size_bytes"] > get_max_bytes():
+            return Response(
+                {"detail": "Photo is too large.", "max_bytes": get_max_bytes()},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-            # максимум одно фото каждого типа
-            if JobPhoto.objects.filter(job=job, photo_type=photo_type).exists():
-                return Response(
-                    {"detail": f"{photo_type} photo already exists for this job."},
-                    status=status.HTTP_409_CONFLICT,
-                )
+        error = _photo_order_error(job, data["photo_type"])
+        if error is not None:
+            return error
 
-            # EXIF и валидация
-            exif_lat, exif_lon, exif_dt, exif_missing = extract_exif_data(uploaded)
-
-            loc = job.location
-            if exif_lat is not None and exif_lon is not None:
-                if loc.latitude is not None and loc.longitude is not None:
-                    dist = distance_m(exif_lat, exif_lon, loc.latitude, loc.longitude)
-                    if dist > 100:
-                        return Response(
-                            {
-                                "detail": "Photo too far from job location.",
-                                "distance_m": round(dist, 2),
-                            },
-                            status=status.HTTP_400_BAD_REQUEST,
-                        )
+        existing = _existing_photo_response(job, data["photo_type"], data["sha256"], request)
+        if existing is not None:
+            return existing
+
+        upload_required = find_photo_by_content_hash(job.company_id, data["sha256"]) is None
+
+        payload = {
+            "job_id": job.id,
+            "user_id": user.id,
+            "photo_type": data["photo_type"],
+            "key": photo_storage_key(job.company_id, job.id, data["photo_type"]),
+            "size_bytes": data["size_bytes"],
+            "sha256": data["sha256"],
+            "content_type": data["content_type"],
+        }
+        token = make_upload_token(**payload)
 
-            # нормализация формата в JPEG
+        out = {
+            "token": token,
+            "key": payload["key"],
+            "upload_required": upload_required,
+            "expires_at": timezone.now() + timedelta(seconds=get_expires_seconds()),
+        }
+        if upload_required:
             try:
-                normalized_file = normalize_job_photo_to_jpeg(uploaded)
-            except Exception as exc:
+                out["upload"] = build_upload_instructions(request, token, payload)
+            except DirectUploadError as exc:
                 return Response(
-                    {"detail": f"Unsupported image format: {exc}"},
-                    status=status.HTTP_400_BAD_REQUEST,
+                    {"detail": str(exc)},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
                 )
 
-            ext = ".jpg"
-            key = (
-                f"company/{job.company_id}/jobs/{job.id}/photos/"
-                f"{photo_type}/{uuid.uuid4().hex}{ext}"
+        return Response(out, status=status.HTTP_200_OK)
+
+
+class JobPhotoFinalizeView(APIView):
+    """
+    Шаг 2 direct-to-storage загрузки: проверяет объект в storage и
+    создаёт File / JobPhoto.
+
+    POST /api/jobs/<id>/photos/finalize/
+      {token}
+
+    sha256 байтов проверил PUT-приёмник (JobPhotoDirectUploadView). Здесь —
+    только наличие объекта, размер и JPEG-сигнатура; дальше как у multipart-загрузки:
+    фото создаётся в состоянии "pending", EXIF, расстояние, политика
+    хранения компании и превью — после коммита (apps.jobs.photo_processing).
+    """
+
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk: int):
+        user = request.user
+
+        if user.role != User.ROLE_CLEANER:
+            return Response(
+                {"detail": "Only cleaners can upload photos."},
+                status=status.HTTP_403_FORBIDDEN,
             )
 
-            try:
-                normalized_file.seek(0)
-            except Exception:
-                pass
+        serializer = JobPhotoFinalizeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            payload = load_upload_token(serializer.validated_data["token"])
+        except DirectUploadError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-            saved_path = default_storage.save(
-                key,
-                ContentFile(normalized_file.read()),
+        if payload["job_id"] != pk or payload["user_id"] != user.id:
+            return Response(
+                {"detail": "Upload token does not match this job."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            file_url = default_storage.url(saved_path)
 
-            db_file = File.objects.create(
-                file_url=file_url,
-                original_name=uploaded.name or "",
-                content_type=getattr(normalized_file, "content_type", "")
-                or getattr(uploaded, "content_type", "")
-                or "",
-                size_bytes=getattr(normalized_file, "size", None)
-                or getattr(uploaded, "size", None),
+        photo_type = payload["photo_type"]
+        key = payload["key"]
+        content_hash = payload["sha256"]
+
+        job = get_object_or_404(
+            Job.objects.select_related("location"),
+            pk=pk,
+            cleaner=user,
+        )
+
+        if job.status != Job.STATUS_IN_PROGRESS:
+            return Response(
+                {"detail": "Photos can be uploaded only when job is in progress."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        error = _photo_order_error(job, photo_type)
+        if error is not None:
+            return error
+
+        existing = _existing_photo_response(job, photo_type, content_hash, request)
+        if existing is not None:
+            _discard_uploaded_object(key)
+            return existing
+
+        source_photo = find_photo_by_content_hash(job.company_id, content_hash)
+
+        # чтения storage — вне транзакции
+        if source_photo is not None:
+            # байты уже есть у компании — загруженная копия не нужна
+            _discard_uploaded_object(key)
+            error = _photo_distance_error(job, source_photo.latitude, source_photo.longitude)
+            if error is not None:
+                return error
+        else:
+            try:
+                verify_uploaded_object(payload)
+            except DirectUploadError as exc:
+                return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                if source_photo is not None:
+                    source_file = source_photo.file
+                    db_file = File.objects.create(
+                        file_url=source_file.file_url,
+                        thumb_url=source_file.thumb_url,
+                        medium_url=source_file.medium_url,
+                        content_hash=content_hash,
+                        original_name=source_file.original_name,
+                        content_type=source_file.content_type,
+                        size_bytes=source_file.size_bytes,
+                    )
+                    job_photo = JobPhoto.objects.create(
+                        job=job,
+                        file=db_file,
+                        photo_type=photo_type,
+                        latitude=source_photo.latitude,
+                        longitude=source_photo.longitude,
+                        photo_timestamp=source_photo.photo_timestamp,
+                    )
+                    if not db_file.thumb_url:
+                        transaction.on_commit(
+                            lambda: generate_photo_derivatives_for_file_id(db_file.id)
+                        )
+                else:
+                    db_file = File.objects.create(
+                        file_url=default_storage.url(key),
+                        content_hash=content_hash,
+                        original_name=key.rsplit("/", 1)[-1],
+                        content_type=payload["content_type"],
+                        size_bytes=payload["size_bytes"],
+                    )
+                    job_photo = JobPhoto.objects.create(
+                        job=job,
+                        file=db_file,
+                        photo_type=photo_type,
+                        processing_status=JobPhoto.STATUS_PENDING,
+                    )
+                    transaction.on_commit(
+                        lambda: dispatch_photo_processing(job_photo.id)
+                    )
+                Job.touch(job.id)
+        except IntegrityError:
+            # параллельный finalize того же типа (uniq_job_photo_type)
+            if source_photo is None:
+                _discard_uploaded_object(key)
+            return Response(
+                {"detail": f"{photo_type} photo already exists for this job."},
+                status=status.HTTP_409_CONFLICT,
             )
 
-            job_photo = JobPhoto.objects.create(
-                job=job,
-                file=db_file,
-                photo_type=photo_type,
-                latitude=exif_lat,
-                longitude=exif_lon,
-                photo_timestamp=exif_dt,
+        return Response(_photo_upload_payload(job_photo, request), status=status.HTTP_201_CREATED)
+
+
+def _discard_uploaded_object(key: str) -> None:
+    # ключ уникален (uuid) для слота, но finalize того же токена мог уже
+    # сослаться на него (повтор после обрыва, параллельный запрос)
+    if File.objects.filter(file_url=default_storage.url(key)).exists():
+        return
+    try:
+        if default_storage.exists(key):
+            default_storage.delete(key)
+    except Exception:
+        pass
+
+
+class JobPhotoDirectUploadView(APIView):
+    """
+    PUT-приёмник direct upload (PHOTO_DIRECT_UPLOAD_BACKEND="local").
+
+    PUT /api/uploads/photos/<token>/
+      body: сырые байты JPEG
+
+    Авторизация — сам подписанный токен (как у presigned URL).
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def put(self, request, token: str):
+        if get_backend() != BACKEND_LOCAL:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            payload = load_upload_token(token)
+        except DirectUploadError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_403_FORBIDDEN)
+
+        content_type = (request.content_type or "").split(";")[0].strip()
+        if content_type != payload["content_type"]:
+            return Response(
+                {"detail": "Content-Type does not match upload slot."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-        out_file_url = db_file.file_url
-        if out_file_url and out_file_url.startswith("/"):
-            out_file_url = request.build_absolute_uri(out_file_url)
+        # request.body упирается в DATA_UPLOAD_MAX_MEMORY_SIZE — читаем stream
+        stream = request.stream
+        body = stream.read(payload["size_bytes"] + 1) if stream is not None else b""
 
-        out = {
-            "photo_type": job_photo.photo_type,
-            "file_url": out_file_url,
-            "latitude": job_photo.latitude,
-            "longitude": job_photo.longitude,
-            "photo_timestamp": job_photo.photo_timestamp,
-            "created_at": job_photo.created_at,
-            "exif_missing": bool(exif_missing),
-        }
+        try:
+            store_local_upload(payload, body)
+        except DirectUploadError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(out, status=status.HTTP_201_CREATED)
+        return Response(status=status.HTTP_200_OK)
 
 
 class JobPhotoDeleteView(APIView):
@@ -613,21 +1346,6 @@ class JobPhotoDeleteView(APIView):
                 {"detail": "Photo not found."}, status=status.HTTP_404_NOT_FOUND
             )
 
-        file_obj = photo.file
-        storage_path = None
-        if file_obj and file_obj.file_url:
-            prefix = "/media/"
-            if file_obj.file_url.startswith(prefix):
-                storage_path = file_obj.file_url[len(prefix) :]
-
-        photo.delete()
-        if file_obj:
-            file_obj.delete()
-
-        if storage_path:
-            try:
-                default_storage.delete(storage_path)
-            except Exception:
-                pass
+        _delete_job_photo(photo)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
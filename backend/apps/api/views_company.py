@@ -22,6 +22,7 @@ from rest_framework.views import APIView
 
 from apps.accounts.models import Company, User
 from apps.api.models import AccessAuditLog
+from apps.api.resource_versions import FAMILY_USERS, conditional_on
 
 # Console roles that can access the manager dashboard
 CONSOLE_ROLES = {User.ROLE_OWNER, User.ROLE_MANAGER, User.ROLE_STAFF}
@@ -199,10 +200,15 @@ class CompanyLogoUploadView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Save file to ImageField
+        # Save file to ImageField; старый файл удаляем (иначе он остаётся в storage)
+        old_logo_name = company.logo.name if company.logo else None
+
         company.logo = file_obj
         company.save(update_fields=["logo"])
 
+        if old_logo_name and old_logo_name != company.logo.name:
+            company.logo.storage.delete(old_logo_name)
+
         # Return URL
         logo_url = request.build_absolute_uri(company.logo.url) if company.logo else None
 
@@ -559,6 +565,7 @@ class CompanyUsersView(APIView):
 
         return company, None
 
+    @conditional_on(FAMILY_USERS)
     def get(self, request):
         """Get list of console users (owner, manager, staff)."""
         company, error_response = self._ensure_company_admin(request)
@@ -11,6 +11,9 @@ RBAC:
 - cleaner: no access
 """
 
+from datetime import date, time
+
+from django.db.models import Count
 from django.shortcuts import get_object_or_404
 
 from rest_framework import status
@@ -31,9 +34,28 @@ from apps.maintenance.notifications import (
     send_maintenance_notification,
     send_assignment_notification,
 )
+from apps.maintenance.recurring import generate_visits
 from apps.locations.models import Location
 from apps.jobs.models import Job
-from apps.api.views_reports import compute_sla_status_and_reasons_for_job
+from apps.api.fieldsets import FieldsetError, apply_field_requirements, parse_fields, wants
+from apps.api.pagination import (
+    CursorError,
+    keyset_ordering,
+    paginate_keyset,
+    parse_page_size,
+)
+from apps.api.renderers import StreamingJSONListResponse
+from apps.api.resource_versions import (
+    FAMILY_ASSETS,
+    FAMILY_CHECKLISTS,
+    FAMILY_CONTRACTS,
+    FAMILY_LOCATIONS,
+    FAMILY_MAINTENANCE_CATEGORIES,
+    FAMILY_RECURRING,
+    FAMILY_USERS,
+    conditional_on,
+)
+from apps.api.views_reports import annotate_sla_proof, compute_sla_status_and_reasons_for_job
 
 
 # =============================================================================
@@ -285,6 +307,7 @@ class AssetListCreateView(MaintenancePermissionMixin, APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @conditional_on(FAMILY_ASSETS, FAMILY_LOCATIONS)
     def get(self, request):
         company, error = self._check_read_access(request)
         if error:
@@ -760,6 +783,104 @@ class MaintenanceCategoryDetailView(MaintenancePermissionMixin, APIView):
 # Service Visits Views (Jobs with asset link = maintenance visits)
 # =============================================================================
 
+# Тот же порядок, что у manager history — индекс jobs_company_history_idx
+SERVICE_VISIT_KEYSET_FIELDS = ("scheduled_date", "scheduled_start_time", "id")
+SERVICE_VISIT_KEYSET_PARSERS = (date.fromisoformat, time.fromisoformat, int)
+
+
+# Поля payload service visit и связи, которые им нужны (?fields=)
+SERVICE_VISIT_FIELDS = {
+    "id": {},
+    "scheduled_date": {},
+    "scheduled_start_time": {},
+    "scheduled_end_time": {},
+    "status": {},
+    "sla_status": {},  # annotate_sla_proof
+    "priority": {},
+    "sla_deadline": {},
+    "location": {"select": ("location",)},
+    "technician": {"select": ("cleaner",)},
+    "asset": {"select": ("asset", "asset__asset_type")},
+    "category": {"select": ("maintenance_category",)},
+    "manager_notes": {},
+    "actual_start_time": {},
+    "actual_end_time": {},
+    "created_at": {},
+}
+
+
+def _service_visit_payload(visit, fields=None) -> dict:
+    payload = {
+        "id": visit.id,
+        "scheduled_date": visit.scheduled_date.isoformat(),
+        "scheduled_start_time": visit.scheduled_start_time.isoformat() if visit.scheduled_start_time else None,
+        "scheduled_end_time": visit.scheduled_end_time.isoformat() if visit.scheduled_end_time else None,
+        "status": visit.status,
+    }
+
+    if wants(fields, "sla_status"):
+        # Compute SLA status for this visit
+        payload["sla_status"], _ = compute_sla_status_and_reasons_for_job(visit)
+
+    payload.update({
+        "priority": visit.priority,
+        "sla_deadline": visit.sla_deadline.isoformat() if visit.sla_deadline else None,
+    })
+
+    if wants(fields, "location"):
+        payload["location"] = {
+            "id": visit.location.id,
+            "name": visit.location.name,
+        }
+
+    if wants(fields, "technician"):
+        payload["technician"] = {
+            "id": visit.cleaner.id,
+            "name": visit.cleaner.full_name or visit.cleaner.email,
+        }
+
+    if wants(fields, "asset"):
+        # Handle optional asset (maintenance jobs may not have asset linked)
+        asset_data = None
+        if visit.asset:
+            asset_data = {
+                "id": visit.asset.id,
+                "name": visit.asset.name,
+                "asset_type": {
+                    "id": visit.asset.asset_type.id,
+                    "name": visit.asset.asset_type.name,
+                } if visit.asset.asset_type else None,
+            }
+        payload["asset"] = asset_data
+
+    if wants(fields, "category"):
+        payload["category"] = {
+            "id": visit.maintenance_category.id,
+            "name": visit.maintenance_category.name,
+        } if visit.maintenance_category else None
+
+    payload.update({
+        "manager_notes": visit.manager_notes,
+        "actual_start_time": visit.actual_start_time.isoformat() if visit.actual_start_time else None,
+        "actual_end_time": visit.actual_end_time.isoformat() if visit.actual_end_time else None,
+        "created_at": visit.created_at.isoformat(),
+    })
+
+    if fields is None:
+        return payload
+    return {key: value for key, value in payload.items() if key in fields}
+
+
+def _parse_optional_date(value):
+    """
+    YYYY-MM-DD -> date; пусто -> None; иначе ValueError.
+    """
+    value = (value or "").strip()
+    if not value:
+        return None
+    return date.fromisoformat(value)
+
+
 class ServiceVisitsListView(MaintenancePermissionMixin, APIView):
     """
     List service visits (Jobs that have an asset linked).
@@ -773,6 +894,11 @@ class ServiceVisitsListView(MaintenancePermissionMixin, APIView):
         - date_from: filter by scheduled_date >= date_from (YYYY-MM-DD)
         - date_to: filter by scheduled_date <= date_to (YYYY-MM-DD)
         - category_id: filter by maintenance_category
+        - page_size / cursor: keyset pagination (opt-in), response becomes
+          {"results", "next_cursor", "page_size"}
+        - fields: sparse fieldset, e.g. fields=id,scheduled_date,status,location
+          (unrequested relations are not joined)
+        - stream=1 (without pagination): the list is streamed as it is read
     """
 
     authentication_classes = [TokenAuthentication]
@@ -784,16 +910,22 @@ class ServiceVisitsListView(MaintenancePermissionMixin, APIView):
             return error
 
         # Maintenance context service visits
-        visits = Job.objects.filter(
-            company=company,
-            context=Job.CONTEXT_MAINTENANCE,  # Maintenance context (not based on asset nullability)
-        ).select_related(
-            "location",
-            "cleaner",
-            "asset",
-            "asset__asset_type",
-            "maintenance_category",
-        ).order_by("-scheduled_date", "-created_at")
+        try:
+            fields = parse_fields(request.query_params.get("fields"), SERVICE_VISIT_FIELDS)
+        except FieldsetError as exc:
+            return Response(
+                {"code": "VALIDATION_ERROR", "message": str(exc)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        visits = apply_field_requirements(
+            Job.objects.filter(
+                company=company,
+                context=Job.CONTEXT_MAINTENANCE,  # Maintenance context (not based on asset nullability)
+            ),
+            fields,
+            SERVICE_VISIT_FIELDS,
+        )
 
         # Filtering
         status_filter = request.query_params.get("status")
@@ -816,59 +948,52 @@ class ServiceVisitsListView(MaintenancePermissionMixin, APIView):
         if category_id:
             visits = visits.filter(maintenance_category_id=category_id)
 
-        date_from = request.query_params.get("date_from")
+        try:
+            date_from = _parse_optional_date(request.query_params.get("date_from"))
+            date_to = _parse_optional_date(request.query_params.get("date_to"))
+        except ValueError:
+            return Response(
+                {"code": "VALIDATION_ERROR", "message": "Invalid date format. Use YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         if date_from:
             visits = visits.filter(scheduled_date__gte=date_from)
-
-        date_to = request.query_params.get("date_to")
         if date_to:
             visits = visits.filter(scheduled_date__lte=date_to)
 
-        data = []
-        for visit in visits:
-            # Handle optional asset (maintenance jobs may not have asset linked)
-            asset_data = None
-            if visit.asset:
-                asset_data = {
-                    "id": visit.asset.id,
-                    "name": visit.asset.name,
-                    "asset_type": {
-                        "id": visit.asset.asset_type.id,
-                        "name": visit.asset.asset_type.name,
-                    } if visit.asset.asset_type else None,
-                }
+        # SLA proof — EXISTS-подзапросы в том же запросе, без запросов на визит
+        if wants(fields, "sla_status"):
+            visits = annotate_sla_proof(visits)
 
-            # Compute SLA status for this visit
-            sla_status, _ = compute_sla_status_and_reasons_for_job(visit)
+        cursor = request.query_params.get("cursor")
+        page_size_param = request.query_params.get("page_size")
+        paginated = cursor is not None or page_size_param is not None
 
-            data.append({
-                "id": visit.id,
-                "scheduled_date": visit.scheduled_date.isoformat(),
-                "scheduled_start_time": visit.scheduled_start_time.isoformat() if visit.scheduled_start_time else None,
-                "scheduled_end_time": visit.scheduled_end_time.isoformat() if visit.scheduled_end_time else None,
-                "status": visit.status,
-                "sla_status": sla_status,
-                "priority": visit.priority,
-                "sla_deadline": visit.sla_deadline.isoformat() if visit.sla_deadline else None,
-                "location": {
-                    "id": visit.location.id,
-                    "name": visit.location.name,
-                },
-                "technician": {
-                    "id": visit.cleaner.id,
-                    "name": visit.cleaner.full_name or visit.cleaner.email,
-                },
-                "asset": asset_data,
-                "category": {
-                    "id": visit.maintenance_category.id,
-                    "name": visit.maintenance_category.name,
-                } if visit.maintenance_category else None,
-                "manager_notes": visit.manager_notes,
-                "actual_start_time": visit.actual_start_time.isoformat() if visit.actual_start_time else None,
-                "actual_end_time": visit.actual_end_time.isoformat() if visit.actual_end_time else None,
-                "created_at": visit.created_at.isoformat(),
-            })
+        if paginated:
+            page_size = parse_page_size(page_size_param)
+            try:
+                visits, next_cursor = paginate_keyset(
+                    visits, SERVICE_VISIT_KEYSET_FIELDS, SERVICE_VISIT_KEYSET_PARSERS, cursor, page_size
+                )
+            except CursorError:
+                return Response(
+                    {"code": "VALIDATION_ERROR", "message": "Invalid cursor."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        else:
+            visits = visits.order_by(*keyset_ordering(SERVICE_VISIT_KEYSET_FIELDS))
+            if request.query_params.get("stream") in ("1", "true"):
+                return StreamingJSONListResponse(
+                    _service_visit_payload(visit, fields) for visit in visits.iterator(chunk_size=500)
+                )
 
+        data = [_service_visit_payload(visit, fields) for visit in visits]
+
+        if paginated:
+            return Response(
+                {"results": data, "next_cursor": next_cursor, "page_size": page_size},
+                status=status.HTTP_200_OK,
+            )
         return Response(data, status=status.HTTP_200_OK)
 
 
@@ -2102,6 +2227,14 @@ class RecurringTemplateListCreateView(MaintenancePermissionMixin, APIView):
             "created_at": template.created_at.isoformat(),
         }
 
+    @conditional_on(
+        FAMILY_RECURRING,
+        FAMILY_ASSETS,
+        FAMILY_LOCATIONS,
+        FAMILY_CHECKLISTS,
+        FAMILY_MAINTENANCE_CATEGORIES,
+        FAMILY_USERS,
+    )
     def get(self, request):
         company, error = self._check_read_access(request)
         if error:
@@ -2588,12 +2721,16 @@ class RecurringTemplateGenerateView(MaintenancePermissionMixin, APIView):
     Body: { "date_to": "YYYY-MM-DD" }
 
     Generates Jobs from template.start_date up to date_to,
-    respecting the frequency interval and skipping already-generated dates.
+    respecting the frequency interval and skipping already-generated dates
+    (bulk insert, see apps.maintenance.recurring.generate_visits).
 
     Returns:
     {
         "generated_count": 6,
-        "visits": [{ "id": 123, "scheduled_date": "2026-03-01" }, ...]
+        "visits": [{ "id": 123, "scheduled_date": "2026-03-01" }, ...],
+        "checklist_items_count": 24,
+        "duration_ms": 12.3,
+        "visits_per_second": 487.8
     }
     """
 
@@ -2653,80 +2790,32 @@ class RecurringTemplateGenerateView(MaintenancePermissionMixin, APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Get already-generated dates for this template
-        existing_dates = set(
-            GeneratedVisitLog.objects.filter(template=template)
-            .values_list("scheduled_date", flat=True)
-        )
-
-        # Calculate visit dates
-        interval_days = template.get_interval_days()
-        current_date = template.start_date
-        end_date = date_to
-        if template.end_date and template.end_date < end_date:
-            end_date = template.end_date
+        # Job.cleaner обязателен — без техника визит не создать
+        if not template.assigned_technician_id:
+            return Response(
+                {"code": "VALIDATION_ERROR", "message": "Template has no assigned technician.",
+                 "fields": {"assigned_technician_id": ["Assign a technician before generating visits."]}},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        visit_dates = []
-        while current_date <= end_date:
-            if current_date not in existing_dates:
-                visit_dates.append(current_date)
-            current_date += timedelta(days=interval_days)
+        result = generate_visits(template, date_to, generated_by=request.user)
 
-        if not visit_dates:
+        if not result.visits:
             return Response({
                 "generated_count": 0,
                 "visits": [],
                 "message": "No new visits to generate. All dates already have visits."
             }, status=status.HTTP_200_OK)
 
-        # Create Jobs and logs
-        created_visits = []
-        user = request.user
-
-        for visit_date in visit_dates:
-            # Create Job with context=CONTEXT_MAINTENANCE
-            job = Job.objects.create(
-                company=company,
-                location=template.location,
-                asset=template.asset,
-                cleaner=template.assigned_technician,
-                scheduled_date=visit_date,
-                scheduled_start_time=template.scheduled_start_time,
-                scheduled_end_time=template.scheduled_end_time,
-                status=Job.STATUS_SCHEDULED,
-                context=Job.CONTEXT_MAINTENANCE,
-                maintenance_category=template.maintenance_category,
-                manager_notes=template.manager_notes,
-            )
-
-            # Copy checklist items from template
-            if template.checklist_template:
-                from apps.jobs.models import JobChecklistItem
-                template_items = template.checklist_template.items.all()
-                for item in template_items:
-                    JobChecklistItem.objects.create(
-                        job=job,
-                        label=item.label,
-                        order=item.order,
-                        completed=False,
-                    )
-
-            # Create log entry
-            GeneratedVisitLog.objects.create(
-                template=template,
-                job=job,
-                scheduled_date=visit_date,
-                generated_by=user,
-            )
-
-            created_visits.append({
-                "id": job.id,
-                "scheduled_date": visit_date.isoformat(),
-            })
-
         return Response({
-            "generated_count": len(created_visits),
-            "visits": created_visits,
+            "generated_count": result.generated_count,
+            "visits": [
+                {"id": job_id, "scheduled_date": visit_date.isoformat()}
+                for job_id, visit_date in result.visits
+            ],
+            "checklist_items_count": result.checklist_items_count,
+            "duration_ms": result.duration_ms,
+            "visits_per_second": result.visits_per_second,
         }, status=status.HTTP_201_CREATED)
 
 
@@ -2751,14 +2840,19 @@ class ServiceContractListCreateView(MaintenancePermissionMixin, APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    # recurring_templates_count — шаблоны тоже часть ответа
+    @conditional_on(FAMILY_CONTRACTS, FAMILY_LOCATIONS, FAMILY_RECURRING)
     def get(self, request):
         company, error = self._check_read_access(request)
         if error:
             return error
 
-        contracts = ServiceContract.objects.filter(
-            company=company
-        ).select_related("location", "created_by").order_by("-created_at")
+        contracts = (
+            ServiceContract.objects.filter(company=company)
+            .select_related("location")
+            .annotate(recurring_templates_total=Count("recurring_templates"))
+            .order_by("-created_at")
+        )
 
         # Filtering
         status_filter = request.query_params.get("status")
@@ -2796,7 +2890,7 @@ class ServiceContractListCreateView(MaintenancePermissionMixin, APIView):
                 "visits_included": contract.visits_included,
                 "is_expired": contract.is_expired,
                 "days_remaining": contract.days_remaining,
-                "recurring_templates_count": contract.recurring_templates.count(),
+                "recurring_templates_count": contract.recurring_templates_total,
                 "created_at": contract.created_at.isoformat(),
             })
 
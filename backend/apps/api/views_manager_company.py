@@ -17,6 +17,7 @@ from rest_framework.views import APIView
 
 from apps.accounts.models import Company, User
 from apps.api.models import AccessAuditLog
+from apps.jobs.photo_storage import storage_path_from_url
 
 
 class ManagerCompanyView(APIView):
@@ -129,9 +130,15 @@ class ManagerCompanyLogoUploadView(APIView):
         saved_path = default_storage.save(path, ContentFile(file_obj.read()))
         logo_url = default_storage.url(saved_path)
 
+        old_logo_key = storage_path_from_url(company.logo_url or "")
+
         company.logo_url = logo_url
         company.save(update_fields=["logo_url"])
 
+        # предыдущий логотип больше никому не нужен
+        if old_logo_key and old_logo_key != saved_path:
+            default_storage.delete(old_logo_key)
+
         return Response({"logo_url": logo_url}, status=status.HTTP_200_OK)
 
 
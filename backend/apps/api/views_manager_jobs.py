@@ -1,7 +1,9 @@
+import csv
+import hashlib
 import logging
 import io
 from collections import defaultdict
-from datetime import datetime, timedelta, time
+from datetime import date, datetime, timedelta, time
 
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
@@ -14,39 +16,62 @@ from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.utils.dateparse import parse_date
-from django.db.models import Q
+from django.utils.http import parse_etags
+from django.db.models import Count, Max, Q, Sum
 
 from rest_framework import status
 from rest_framework.authentication import TokenAuthentication
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.exceptions import ValidationError
 
 from apps.accounts.models import Company, User
+from apps.accounts.usage import adjust_usage, lock_usage
 from apps.jobs.models import (
     File,  # оставляем для совместимости
     Job,
     JobCheckEvent,
     JobChecklistItem,
     JobPhoto,
+    RecurringJobSchedule,
 )
+from apps.jobs.recurring import expand_occurrences
 from apps.marketing.models import ReportEmailLog
-from apps.locations.models import Location
-
+from apps.locations.models import ChecklistTemplate, Location
+from apps.maintenance.models import Asset, MaintenanceCategory
+
+from .fieldsets import FieldsetError, apply_field_requirements, parse_fields, wants
+from .pagination import (
+    CursorError,
+    estimate_count,
+    keyset_ordering,
+    paginate_keyset,
+    parse_page_size,
+    parse_sync_token,
+)
 from .pdf import generate_job_report_pdf
+from .renderers import StreamingJSONListResponse
 from .permissions import IsManagerUser as IsManager
 from .serializers import (
     JobChecklistItemSerializer,
     JobCheckEventSerializer,
     JobDetailSerializer,
+    ManagerJobBulkRowSerializer,
     ManagerJobCreateSerializer,
     PlanningJobSerializer,
+    build_job_photo_payload,
     compute_sla_status_for_job,
     compute_sla_reasons_for_job,
 )
 logger = logging.getLogger(__name__)
 
+# Сортировка history: (-scheduled_date, -scheduled_start_time, -id),
+# индекс jobs_company_history_idx
+HISTORY_KEYSET_FIELDS = ("scheduled_date", "scheduled_start_time", "id")
+HISTORY_KEYSET_PARSERS = (date.fromisoformat, time.fromisoformat, int)
+
 # Console roles that have access to manager endpoints
 # Owner = Billing Admin, Manager = Ops Admin, Staff = Limited Access
 CONSOLE_ROLES = {User.ROLE_OWNER, User.ROLE_MANAGER, User.ROLE_STAFF}
@@ -407,6 +432,9 @@ class ManagerJobsTodayView(APIView):
 
 # Сколько дней показывать в Completed на странице Jobs
 ACTIVE_COMPLETED_DAYS = 30
+# delta sync: перекрытие окна на транзакции, закоммиченные после нашего чтения
+# с updated_at раньше sync_token (клиент получает их повторно — upsert по id)
+ACTIVE_SYNC_OVERLAP = timedelta(seconds=30)
 
 
 class ManagerJobsActiveView(APIView):
@@ -418,6 +446,14 @@ class ManagerJobsActiveView(APIView):
     - completed за последние ACTIVE_COMPLETED_DAYS дней.
 
     Остальной полный архив — через Job History.
+
+    Polling:
+    - ETag / If-None-Match: неизменный набор → 304 без сериализации
+      (ETag считается одним агрегатным запросом);
+    - ?updated_since=<sync_token> → {"jobs", "removed_ids", "sync_token"}:
+      только изменённые джобы (Job.updated_at, фото / чеклист его двигают
+      через Job.touch) и id, выпавшие из набора.
+    - ?fields=id,status,... — sparse fieldset (ACTIVE_JOB_FIELDS).
     """
 
     authentication_classes = [TokenAuthentication]
@@ -433,70 +469,171 @@ class ManagerJobsActiveView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        updated_since = None
+        updated_since_param = request.query_params.get("updated_since")
+        if updated_since_param:
+            updated_since = parse_sync_token(updated_since_param)
+            if updated_since is None:
+                return Response(
+                    {"detail": "Invalid updated_since. Use the sync_token from a previous response."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        try:
+            fields = parse_fields(request.query_params.get("fields"), ACTIVE_JOB_FIELDS)
+        except FieldsetError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # фиксируем до чтения: всё, что изменится позже, попадёт в следующий delta
+        sync_token = timezone.now()
         today = timezone.localdate()
         completed_from = today - timedelta(days=ACTIVE_COMPLETED_DAYS)
 
-        qs = (
-            Job.objects.filter(
-                company=company,
-                context=Job.CONTEXT_CLEANING,  # Cleaning context only (exclude maintenance)
-            )
-            .filter(
-                Q(status__in=[Job.STATUS_SCHEDULED, Job.STATUS_IN_PROGRESS])
-                | Q(
-                    status=Job.STATUS_COMPLETED,
-                    actual_end_time__isnull=False,
-                    actual_end_time__date__gte=completed_from,
-                )
-            )
-            .select_related("location", "cleaner")
-            .prefetch_related("photos")
-            .order_by("scheduled_date", "scheduled_start_time", "id")
+        company_jobs = Job.objects.filter(
+            company=company,
+            context=Job.CONTEXT_CLEANING,  # Cleaning context only (exclude maintenance)
+        )
+        active_filter = Q(status__in=[Job.STATUS_SCHEDULED, Job.STATUS_IN_PROGRESS]) | Q(
+            status=Job.STATUS_COMPLETED,
+            actual_end_time__isnull=False,
+            actual_end_time__date__gte=completed_from,
+        )
+        active = company_jobs.filter(active_filter)
+
+        etag = _active_jobs_etag(active, today, request.query_params.urlencode())
+        if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response["ETag"] = etag
+            response["Cache-Control"] = "private, no-cache"
+            return response
+
+        qs = active
+        if updated_since is not None:
+            qs = qs.filter(updated_at__gt=updated_since - ACTIVE_SYNC_OVERLAP)
+
+        qs = apply_field_requirements(
+            qs.order_by("scheduled_date", "scheduled_start_time", "id"),
+            fields,
+            ACTIVE_JOB_FIELDS,
         )
 
-        data: list[dict] = []
+        data = [_active_job_payload(job, fields) for job in qs]
 
-        for job in qs:
-            location = getattr(job, "location", None)
-            cleaner = getattr(job, "cleaner", None)
+        if updated_since is None:
+            response = Response(data, status=status.HTTP_200_OK)
+        else:
+            response = Response(
+                {
+                    "jobs": data,
+                    "removed_ids": _active_removed_ids(
+                        company, active_filter, updated_since, completed_from
+                    ),
+                    "sync_token": sync_token.isoformat(),
+                },
+                status=status.HTTP_200_OK,
+            )
 
-            photos_qs = getattr(job, "photos", None)
-            photos = list(photos_qs.all()) if photos_qs is not None else []
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
 
-            has_before = any(
-                p.photo_type == JobPhoto.TYPE_BEFORE for p in photos
-            )
-            has_after = any(
-                p.photo_type == JobPhoto.TYPE_AFTER for p in photos
-            )
 
-            data.append(
-                {
-                    "id": job.id,
-                    "status": job.status,
-                    "scheduled_date": job.scheduled_date.isoformat()
-                    if job.scheduled_date
-                    else None,
-                    "scheduled_start_time": job.scheduled_start_time.strftime(
-                        "%H:%M"
-                    )
-                    if job.scheduled_start_time
-                    else None,
-                    "scheduled_end_time": job.scheduled_end_time.strftime(
-                        "%H:%M"
-                    )
-                    if job.scheduled_end_time
-                    else None,
-                    "location_name": getattr(location, "name", "") or "",
-                    "location_address": getattr(location, "address", "") or "",
-                    "cleaner_name": getattr(cleaner, "full_name", "") or "",
-                    # флаги для has_proof на фронте
-                    "has_before_photo": has_before,
-                    "has_after_photo": has_after,
-                }
-            )
+def _active_jobs_etag(active_qs, today, query) -> str:
+    """
+    Strong ETag набора active без его сериализации: count + max(updated_at)
+    + sum(id) (замена одной джобы на другую меняет сумму) + today
+    (окно completed сдвигается с датой) + query (updated_since, fields).
+    """
+    agg = active_qs.aggregate(
+        count=Count("id"),
+        last_updated=Max("updated_at"),
+        id_sum=Sum("id"),
+    )
+    last_updated = agg["last_updated"].isoformat() if agg["last_updated"] else ""
+    raw = f"{agg['count']}:{agg['id_sum'] or 0}:{last_updated}:{today.isoformat()}:{query}"
+    return '"%s"' % hashlib.sha1(raw.encode("utf-8")).hexdigest()
 
-        return Response(data, status=status.HTTP_200_OK)
+
+def _active_removed_ids(company, active_filter, updated_since, completed_from) -> list[int]:
+    """
+    id, которые клиент мог видеть в active, но которых там больше нет:
+    - изменены после updated_since и не подходят под active (отмена, смена
+      контекста);
+    - completed, выпавшие из окна ACTIVE_COMPLETED_DAYS по времени.
+    """
+    since = updated_since - ACTIVE_SYNC_OVERLAP
+    since_window_from = timezone.localdate(since) - timedelta(days=ACTIVE_COMPLETED_DAYS)
+
+    changed = Q(updated_at__gt=since)
+    aged_out = Q(
+        context=Job.CONTEXT_CLEANING,
+        status=Job.STATUS_COMPLETED,
+        actual_end_time__date__gte=since_window_from,
+        actual_end_time__date__lt=completed_from,
+    )
+
+    return list(
+        Job.objects.filter(company=company)
+        .filter(changed | aged_out)
+        .exclude(Q(context=Job.CONTEXT_CLEANING) & active_filter)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+
+ACTIVE_JOB_FIELDS = {
+    "id": {},
+    "status": {},
+    "scheduled_date": {},
+    "scheduled_start_time": {},
+    "scheduled_end_time": {},
+    "location_name": {"select": ("location",)},
+    "location_address": {"select": ("location",)},
+    "cleaner_name": {"select": ("cleaner",)},
+    "has_before_photo": {"prefetch": ("photos",)},
+    "has_after_photo": {"prefetch": ("photos",)},
+}
+
+
+def _active_job_payload(job: Job, fields=None) -> dict:
+    payload = {
+        "id": job.id,
+        "status": job.status,
+        "scheduled_date": job.scheduled_date.isoformat()
+        if job.scheduled_date
+        else None,
+        "scheduled_start_time": job.scheduled_start_time.strftime("%H:%M")
+        if job.scheduled_start_time
+        else None,
+        "scheduled_end_time": job.scheduled_end_time.strftime("%H:%M")
+        if job.scheduled_end_time
+        else None,
+    }
+
+    if wants(fields, "location_name", "location_address"):
+        location = getattr(job, "location", None)
+        payload["location_name"] = getattr(location, "name", "") or ""
+        payload["location_address"] = getattr(location, "address", "") or ""
+
+    if wants(fields, "cleaner_name"):
+        cleaner = getattr(job, "cleaner", None)
+        payload["cleaner_name"] = getattr(cleaner, "full_name", "") or ""
+
+    if wants(fields, "has_before_photo", "has_after_photo"):
+        photos_qs = getattr(job, "photos", None)
+        photos = list(photos_qs.all()) if photos_qs is not None else []
+
+        # флаги для has_proof на фронте
+        payload["has_before_photo"] = any(
+            p.photo_type == JobPhoto.TYPE_BEFORE and p.is_ready for p in photos
+        )
+        payload["has_after_photo"] = any(
+            p.photo_type == JobPhoto.TYPE_AFTER and p.is_ready for p in photos
+        )
+
+    if fields is None:
+        return payload
+    return {key: value for key, value in payload.items() if key in fields}
 
 
 class ManagerJobsCreateView(APIView):
@@ -514,33 +651,9 @@ class ManagerJobsCreateView(APIView):
 
         company = user.company
 
-        # ⛔ Компания заблокирована (истёк trial или явно заблокирована)
-        if company.is_blocked():
-            code = "trial_expired" if company.is_trial_expired() else "company_blocked"
-            detail = (
-                "Your free trial has ended. You can still view existing jobs and "
-                "download reports, but creating new jobs requires an upgrade."
-                if code == "trial_expired"
-                else "Your account is currently blocked. Please contact support."
-            )
-            return Response(
-                {"code": code, "detail": detail},
-                status=status.HTTP_403_FORBIDDEN,
-            )
-
-        # ⛔ Trial-лимит по количеству jobs
-        if company.is_trial_active and company.trial_jobs_limit_reached():
-            return Response(
-                {
-                    "code": "trial_jobs_limit_reached",
-                    "detail": (
-                        "Your free trial allows up to "
-                        f"{Company.TRIAL_MAX_JOBS} jobs. "
-                        "Please upgrade your plan to create more jobs."
-                    ),
-                },
-                status=status.HTTP_403_FORBIDDEN,
-            )
+        blocked = _job_creation_blocked(company)
+        if blocked is not None:
+            return blocked
 
         serializer = ManagerJobCreateSerializer(
             data=request.data,
@@ -564,6 +677,235 @@ class ManagerJobsCreateView(APIView):
         return Response(out, status=status.HTTP_201_CREATED)
 
 
+def _job_creation_blocked(company, new_jobs: int = 1):
+    """
+    Response 403, если компания не может создать new_jobs джоб
+    (заблокирована / trial истёк / trial-лимит), иначе None.
+    """
+    # ⛔ Компания заблокирована (истёк trial или явно заблокирована)
+    if company.is_blocked():
+        code = "trial_expired" if company.is_trial_expired() else "company_blocked"
+        detail = (
+            "Your free trial has ended. You can still view existing jobs and "
+            "download reports, but creating new jobs requires an upgrade."
+            if code == "trial_expired"
+            else "Your account is currently blocked. Please contact support."
+        )
+        return Response(
+            {"code": code, "detail": detail},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    # ⛔ Trial-лимит по количеству jobs (для батча — с учётом всех его строк)
+    remaining = company.trial_jobs_remaining()
+    if remaining is not None and new_jobs > remaining:
+        return Response(
+            {
+                "code": "trial_jobs_limit_reached",
+                "detail": (
+                    "Your free trial allows up to "
+                    f"{Company.TRIAL_MAX_JOBS} jobs. "
+                    "Please upgrade your plan to create more jobs."
+                ),
+            },
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    return None
+
+
+BULK_JOBS_MAX_ROWS = 1000
+
+
+class ManagerJobsBulkCreateView(APIView):
+    """
+    Массовое создание jobs (планирование недели).
+
+    POST /api/manager/jobs/bulk/
+    - JSON: {"jobs": [<строка как у POST /api/manager/jobs/>, ...]}
+    - multipart: file=<CSV> с заголовком из тех же полей
+      (scheduled_date, location_id, cleaner_id, checklist_template_id, ...)
+
+    Все ссылки проверяются одним запросом на тип, jobs и snapshot чеклистов
+    пишутся bulk_create. Батч атомарный: при ошибках хотя бы в одной строке
+    ничего не создаётся, ответ 400 с ошибками по строкам (row — с 1).
+    Trial-лимит проверяется один раз на весь батч.
+    """
+
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser, MultiPartParser, FormParser]
+
+    def post(self, request):
+        user = request.user
+
+        if user.role not in CONSOLE_ROLES:
+            return Response(
+                {"detail": "Only console users can create jobs."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        company = user.company
+
+        try:
+            rows = _read_bulk_job_rows(request)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not rows:
+            return Response(
+                {"detail": "No jobs to create."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(rows) > BULK_JOBS_MAX_ROWS:
+            return Response(
+                {"detail": f"At most {BULK_JOBS_MAX_ROWS} jobs per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        blocked = _job_creation_blocked(company, new_jobs=len(rows))
+        if blocked is not None:
+            return blocked
+
+        jobs, errors = _build_bulk_jobs(company, rows)
+        if errors:
+            return Response(
+                {"detail": "Some rows are invalid. No jobs were created.", "errors": errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            if company.is_trial_active:
+                # проверка выше — без блокировки: параллельный запрос мог
+                # занять квоту, пока строки валидировались
+                lock_usage(company)
+                blocked = _job_creation_blocked(company, new_jobs=len(rows))
+                if blocked is not None:
+                    return blocked
+
+            created = Job.objects.bulk_create(jobs, batch_size=500)
+            # bulk_create не шлёт post_save — счётчик двигаем сами
+            adjust_usage(company.id, jobs_count=len(created))
+            items_count = Job.snapshot_checklists(
+                {job.id: job.checklist_template_id for job in created if job.checklist_template_id}
+            )
+
+        return Response(
+            {
+                "created_count": len(created),
+                "checklist_items_count": items_count,
+                "job_ids": [job.id for job in created],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+def _read_bulk_job_rows(request) -> list:
+    upload = request.FILES.get("file")
+    if upload is None:
+        rows = request.data.get("jobs") if hasattr(request.data, "get") else None
+        if not isinstance(rows, list):
+            raise ValueError("Provide a 'jobs' list or a CSV 'file'.")
+        return rows
+
+    try:
+        text = upload.read().decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("CSV file must be UTF-8 encoded.")
+
+    # пустые ячейки = поле не передано (опциональные поля получают default)
+    return [
+        {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+        for row in csv.DictReader(io.StringIO(text))
+    ]
+
+
+def _build_bulk_jobs(company, rows):
+    """
+    (jobs, errors): несохранённые Job и ошибки по строкам —
+    те же, что у ManagerJobCreateSerializer.
+    """
+    parsed = []
+    errors = []
+    for index, row in enumerate(rows, start=1):
+        serializer = ManagerJobBulkRowSerializer(data=row)
+        if serializer.is_valid():
+            parsed.append((index, serializer.validated_data))
+        else:
+            errors.append({"row": index, "errors": serializer.errors})
+
+    def ids(field):
+        return {data[field] for _, data in parsed if data.get(field)}
+
+    # одна выборка на тип ссылки для всего батча
+    locations = Location.objects.filter(company=company).in_bulk(ids("location_id"))
+    cleaners = User.objects.filter(company=company, role=User.ROLE_CLEANER).in_bulk(ids("cleaner_id"))
+    templates = ChecklistTemplate.objects.filter(company=company).in_bulk(ids("checklist_template_id"))
+    assets = Asset.objects.filter(company=company).in_bulk(ids("asset_id"))
+    categories = MaintenanceCategory.objects.filter(company=company).in_bulk(ids("maintenance_category_id"))
+
+    jobs = []
+    for index, data in parsed:
+        row_errors = {}
+
+        location = locations.get(data["location_id"])
+        if location is None:
+            row_errors["location_id"] = "Invalid location"
+        elif not location.is_active:
+            row_errors["location_id"] = "This location is inactive. Please choose another location."
+
+        cleaner = cleaners.get(data["cleaner_id"])
+        if cleaner is None:
+            row_errors["cleaner_id"] = "Invalid cleaner"
+        elif not cleaner.is_active:
+            row_errors["cleaner_id"] = "Cleaner is inactive and cannot be assigned to jobs"
+
+        template_id = data.get("checklist_template_id")
+        if template_id and template_id not in templates:
+            row_errors["checklist_template_id"] = "Invalid checklist template"
+
+        asset = None
+        if data.get("asset_id"):
+            asset = assets.get(data["asset_id"])
+            if asset is None:
+                row_errors["asset_id"] = "Invalid asset"
+            elif location is not None and asset.location_id != location.id:
+                row_errors["asset_id"] = "Asset location does not match job location"
+
+        category = None
+        if data.get("maintenance_category_id"):
+            category = categories.get(data["maintenance_category_id"])
+            if category is None:
+                row_errors["maintenance_category_id"] = "Invalid maintenance category"
+
+        if row_errors:
+            errors.append({"row": index, "errors": row_errors})
+            continue
+
+        jobs.append(
+            Job(
+                company=company,
+                location=location,
+                cleaner=cleaner,
+                scheduled_date=data["scheduled_date"],
+                scheduled_start_time=data.get("scheduled_start_time"),
+                scheduled_end_time=data.get("scheduled_end_time"),
+                status=Job.STATUS_SCHEDULED,
+                checklist_template_id=template_id or None,
+                # bulk_create не вызывает save() — snapshot делаем сами ниже
+                checklist_snapshot_taken=bool(template_id),
+                asset=asset,
+                maintenance_category=category,
+                context=data.get("context", Job.CONTEXT_CLEANING),
+                manager_notes=data.get("manager_notes") or "",
+                priority=data.get("priority", Job.PRIORITY_LOW),
+                sla_deadline=data.get("sla_deadline"),
+            )
+        )
+
+    errors.sort(key=lambda error: error["row"])
+    return jobs, errors
+
+
 class ManagerJobDetailView(APIView):
     """
     Детали job для менеджера + фото, чеклист, события.
@@ -597,22 +939,10 @@ class ManagerJobDetailView(APIView):
         cleaner = job.cleaner
         asset = job.asset
 
-        photos_data = []
-        for p in job.photos.all().select_related("file").order_by("photo_type", "id"):
-            file_url = p.file.file_url if p.file else None
-            if file_url and file_url.startswith("/"):
-                file_url = request.build_absolute_uri(file_url)
-
-            photos_data.append(
-                {
-                    "photo_type": p.photo_type,
-                    "file_url": file_url,
-                    "latitude": p.latitude,
-                    "longitude": p.longitude,
-                    "photo_timestamp": p.photo_timestamp,
-                    "created_at": p.created_at,
-                }
-            )
+        photos_data = [
+            build_job_photo_payload(p, request)
+            for p in sorted(job.photos.all(), key=lambda p: (p.photo_type, p.id))
+        ]
 
         checklist_data = JobChecklistItemSerializer(
             job.checklist_items.all(), many=True
@@ -669,22 +999,49 @@ class ManagerJobDetailView(APIView):
         return Response(data, status=status.HTTP_200_OK)
 
 
-def build_planning_job_payload(job: Job):
+# Поля build_planning_job_payload и связи, которые им нужны (?fields=)
+PLANNING_JOB_FIELDS = {
+    "id": {},
+    "scheduled_date": {},
+    "scheduled_start_time": {},
+    "scheduled_end_time": {},
+    "status": {},
+    "location": {"select": ("location",)},
+    "cleaner": {"select": ("cleaner",)},
+    "proof": {"prefetch": ("photos", "checklist_items")},
+    "sla_status": {"prefetch": ("photos", "checklist_items")},
+    "sla_reasons": {"prefetch": ("photos", "checklist_items")},
+    "checklist_template": {"select": ("checklist_template",)},
+    "checklist_items": {"prefetch": ("checklist_items",)},
+    "asset": {"select": ("asset",)},
+    "manager_notes": {},
+}
+
+
+def build_planning_job_payload(job: Job, fields=None):
     """
     Helper: единый payload для planning/history (один и тот же формат).
+
+    fields — sparse fieldset (parse_fields); None — все поля.
+    Связи незапрошенных полей не читаются.
     """
-    location = job.location
-    cleaner = job.cleaner
+    need_proof = wants(fields, "proof", "sla_status", "sla_reasons")
+    need_items = need_proof or wants(fields, "checklist_items")
 
     # proof: photos
     before_uploaded = False
     after_uploaded = False
-    try:
-        photos = list(job.photos.all())
-    except Exception:
-        photos = []
+    photos = []
+    if need_proof:
+        try:
+            photos = list(job.photos.all())
+        except Exception:
+            photos = []
 
     for p in photos:
+        # pending / rejected фото — ещё не proof
+        if not p.is_ready:
+            continue
         if p.photo_type == JobPhoto.TYPE_BEFORE:
             before_uploaded = True
         elif p.photo_type == JobPhoto.TYPE_AFTER:
@@ -692,10 +1049,12 @@ def build_planning_job_payload(job: Job):
 
     # proof: checklist (required)
     checklist_completed = False
-    try:
-        items = list(job.checklist_items.all())
-    except Exception:
-        items = []
+    items = []
+    if need_items:
+        try:
+            items = list(job.checklist_items.all())
+        except Exception:
+            items = []
 
     checklist_items_texts = [
         getattr(it, "text", "").strip()
@@ -728,7 +1087,7 @@ def build_planning_job_payload(job: Job):
 
     sla_reasons: list[str] = []
 
-    if job.status == Job.STATUS_COMPLETED:
+    if need_proof and job.status == Job.STATUS_COMPLETED:
         if not before_uploaded:
             sla_reasons.append("missing_before_photo")
         if not after_uploaded:
@@ -738,38 +1097,30 @@ def build_planning_job_payload(job: Job):
 
     sla_status = "violated" if sla_reasons else "ok"
 
-    checklist_template = getattr(job, "checklist_template", None)
-    checklist_template_payload = None
-    if checklist_template is not None:
-        checklist_template_payload = {
-            "id": checklist_template.id,
-            "name": checklist_template.name,
-        }
-
-    # Maintenance Context V1: include asset info
-    asset = getattr(job, "asset", None)
-    asset_payload = None
-    if asset is not None:
-        asset_payload = {
-            "id": asset.id,
-            "name": asset.name,
-        }
-
-    return {
+    payload = {
         "id": job.id,
         "scheduled_date": job.scheduled_date,
         "scheduled_start_time": job.scheduled_start_time,
         "scheduled_end_time": job.scheduled_end_time,
         "status": job.status,
-        "location": {
+    }
+
+    if wants(fields, "location"):
+        location = job.location
+        payload["location"] = {
             "id": getattr(location, "id", None),
             "name": getattr(location, "name", None),
             "address": getattr(location, "address", None),
-        },
-        "cleaner": {
+        }
+
+    if wants(fields, "cleaner"):
+        cleaner = job.cleaner
+        payload["cleaner"] = {
             "id": getattr(cleaner, "id", None),
             "full_name": getattr(cleaner, "full_name", None),
-        },
+        }
+
+    payload.update({
         "proof": {
             "before_uploaded": bool(before_uploaded),
             "after_uploaded": bool(after_uploaded),
@@ -780,12 +1131,109 @@ def build_planning_job_payload(job: Job):
         },
         "sla_status": sla_status,
         "sla_reasons": sla_reasons,
-        "checklist_template": checklist_template_payload,
-        "checklist_items": checklist_items_texts,
-        "asset": asset_payload,
-        "manager_notes": getattr(job, "manager_notes", "") or "",
+    })
+
+    if wants(fields, "checklist_template"):
+        checklist_template = getattr(job, "checklist_template", None)
+        checklist_template_payload = None
+        if checklist_template is not None:
+            checklist_template_payload = {
+                "id": checklist_template.id,
+                "name": checklist_template.name,
+            }
+        payload["checklist_template"] = checklist_template_payload
+
+    payload["checklist_items"] = checklist_items_texts
+
+    # Maintenance Context V1: include asset info
+    if wants(fields, "asset"):
+        asset = getattr(job, "asset", None)
+        asset_payload = None
+        if asset is not None:
+            asset_payload = {
+                "id": asset.id,
+                "name": asset.name,
+            }
+        payload["asset"] = asset_payload
+
+    payload["manager_notes"] = getattr(job, "manager_notes", "") or ""
+
+    if fields is None:
+        return payload
+    return {key: value for key, value in payload.items() if key in fields}
+
+
+def build_virtual_occurrence_payload(schedule: RecurringJobSchedule, day, fields=None):
+    """
+    Вхождение регулярной уборки, ещё не материализованное в Job, в формате
+    build_planning_job_payload: id = None, is_virtual + recurring_schedule_id
+    (материализация — POST /api/manager/recurring-jobs/<id>/occurrences/<date>/).
+    """
+    payload = {
+        "id": None,
+        "scheduled_date": day,
+        "scheduled_start_time": schedule.scheduled_start_time,
+        "scheduled_end_time": schedule.scheduled_end_time,
+        "status": Job.STATUS_SCHEDULED,
     }
 
+    if wants(fields, "location"):
+        payload["location"] = {
+            "id": schedule.location.id,
+            "name": schedule.location.name,
+            "address": getattr(schedule.location, "address", None),
+        }
+
+    if wants(fields, "cleaner"):
+        payload["cleaner"] = {
+            "id": schedule.cleaner.id,
+            "full_name": getattr(schedule.cleaner, "full_name", None),
+        }
+
+    payload.update({
+        "proof": {
+            "before_uploaded": False,
+            "after_uploaded": False,
+            "checklist_completed": False,
+            "before_photo": False,
+            "after_photo": False,
+            "checklist": False,
+        },
+        "sla_status": "ok",
+        "sla_reasons": [],
+    })
+
+    if wants(fields, "checklist_template"):
+        checklist_template = schedule.checklist_template
+        payload["checklist_template"] = (
+            {"id": checklist_template.id, "name": checklist_template.name}
+            if checklist_template is not None
+            else None
+        )
+
+    payload["checklist_items"] = []
+    payload["asset"] = None
+    payload["manager_notes"] = schedule.manager_notes or ""
+
+    if fields is not None:
+        payload = {key: value for key, value in payload.items() if key in fields}
+    payload["is_virtual"] = True
+    payload["recurring_schedule_id"] = schedule.id
+    return payload
+
+
+def active_recurring_schedules(company, date_from, date_to):
+    """Активные расписания компании, пересекающиеся с [date_from, date_to]."""
+    return (
+        RecurringJobSchedule.objects.filter(
+            company=company,
+            is_active=True,
+            start_date__lte=date_to,
+        )
+        .filter(Q(end_date__isnull=True) | Q(end_date__gte=date_from))
+        .select_related("location", "cleaner", "checklist_template")
+    )
+
 
 class ManagerJobForceCompleteView(APIView):
     """
@@ -897,6 +1345,7 @@ class ManagerJobForceCompleteView(APIView):
                 "force_completed_at",
                 "force_completed_by_id",
                 "force_complete_reason",
+                "updated_at",
             ])
 
             # Create audit event (TYPE_FORCE_COMPLETE now exists in model)
@@ -926,7 +1375,10 @@ class ManagerPlanningJobsView(APIView):
     """
     Job Planning list для менеджера (read-only).
 
-    GET /api/manager/jobs/planning/?date=YYYY-MM-DD
+    GET /api/manager/jobs/planning/?date=YYYY-MM-DD[&fields=id,status,location][&include_recurring=1]
+
+    include_recurring=1 — добавить ещё не созданные вхождения регулярных
+    уборок (is_virtual=true, id=null) на сегодня и будущие даты.
     """
 
     authentication_classes = [TokenAuthentication]
@@ -967,18 +1419,30 @@ class ManagerPlanningJobsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        qs = (
-            Job.objects.filter(
-                company=user.company,
-                scheduled_date=day,
-                context=Job.CONTEXT_CLEANING,  # Cleaning context only (exclude maintenance)
+        try:
+            fields = parse_fields(request.query_params.get("fields"), PLANNING_JOB_FIELDS)
+        except FieldsetError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        qs = Job.objects.filter(
+            company=user.company,
+            scheduled_date=day,
+            context=Job.CONTEXT_CLEANING,  # Cleaning context only (exclude maintenance)
+        ).order_by("scheduled_start_time", "id")
+        qs = apply_field_requirements(qs, fields, PLANNING_JOB_FIELDS)
+
+        data = [build_planning_job_payload(job, fields) for job in qs]
+
+        # виртуальные вхождения регулярных уборок (прошлое не разворачиваем)
+        include_recurring = (request.query_params.get("include_recurring") or "").lower() in ("1", "true")
+        if include_recurring and day >= timezone.localdate():
+            schedules = active_recurring_schedules(user.company, day, day)
+            data.extend(
+                build_virtual_occurrence_payload(schedule, occurrence_day, fields)
+                for schedule, occurrence_day in expand_occurrences(schedules, day, day)
             )
-            .select_related("location", "cleaner")
-            .prefetch_related("photos", "checklist_items")
-            .order_by("scheduled_start_time", "id")
-        )
+            data.sort(key=lambda row: row.get("scheduled_start_time") or time.min)
 
-        data = [build_planning_job_payload(job) for job in qs]
         return Response(data, status=status.HTTP_200_OK)
 
 
@@ -987,6 +1451,12 @@ class ManagerJobsHistoryView(APIView):
     Job History list для менеджера (read-only).
 
     GET /api/manager/jobs/history/?date_from=YYYY-MM-DD&date_to=YYYY-MM-DD
+
+    Keyset-пагинация (opt-in): &page_size=50[&cursor=...][&include_count=1]
+    → {"results", "next_cursor", "page_size"[, "estimated_count"]}.
+    Без page_size / cursor — прежний список.
+    &fields=id,status,... — sparse fieldset (PLANNING_JOB_FIELDS).
+    &stream=1 (без пагинации) — потоковый JSON-массив.
     """
 
     authentication_classes = [TokenAuthentication]
@@ -1021,17 +1491,18 @@ class ManagerJobsHistoryView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        qs = (
-            Job.objects.filter(
-                company=user.company,
-                scheduled_date__gte=date_from,
-                scheduled_date__lte=date_to,
-                context=Job.CONTEXT_CLEANING,  # Cleaning context only (exclude maintenance)
-            )
-            .select_related("location", "cleaner", "asset")
-            .prefetch_related("photos", "checklist_items")
-            .order_by("-scheduled_date", "-scheduled_start_time", "-id")
+        try:
+            fields = parse_fields(request.query_params.get("fields"), PLANNING_JOB_FIELDS)
+        except FieldsetError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        qs = Job.objects.filter(
+            company=user.company,
+            scheduled_date__gte=date_from,
+            scheduled_date__lte=date_to,
+            context=Job.CONTEXT_CLEANING,  # Cleaning context only (exclude maintenance)
         )
+        qs = apply_field_requirements(qs, fields, PLANNING_JOB_FIELDS)
 
         status_param = request.query_params.get("status")
         if status_param:
@@ -1050,8 +1521,39 @@ class ManagerJobsHistoryView(APIView):
         if asset_id:
             qs = qs.filter(asset_id=asset_id)
 
-        data = [build_planning_job_payload(job) for job in qs]
-        return Response(data, status=status.HTTP_200_OK)
+        cursor = request.query_params.get("cursor")
+        page_size_param = request.query_params.get("page_size")
+
+        if cursor is None and page_size_param is None:
+            # Legacy: весь диапазон одним списком; читаем чанками, чтобы не
+            # держать в памяти все Job + prefetch сразу.
+            qs = qs.order_by(*keyset_ordering(HISTORY_KEYSET_FIELDS))
+            rows = (build_planning_job_payload(job, fields) for job in qs.iterator(chunk_size=500))
+            if request.query_params.get("stream") in ("1", "true"):
+                # JSON пишется в ответ по мере чтения — без списка payload в памяти
+                return StreamingJSONListResponse(rows)
+            return Response(list(rows), status=status.HTTP_200_OK)
+
+        page_size = parse_page_size(page_size_param)
+        try:
+            jobs, next_cursor = paginate_keyset(
+                qs, HISTORY_KEYSET_FIELDS, HISTORY_KEYSET_PARSERS, cursor, page_size
+            )
+        except CursorError:
+            return Response(
+                {"detail": "Invalid cursor."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        payload = {
+            "results": [build_planning_job_payload(job, fields) for job in jobs],
+            "next_cursor": next_cursor,
+            "page_size": page_size,
+        }
+        if request.query_params.get("include_count") in ("1", "true"):
+            payload["estimated_count"] = estimate_count(qs)
+
+        return Response(payload, status=status.HTTP_200_OK)
 
 class ManagerJobsExportView(APIView):
     """
@@ -0,0 +1,214 @@
+# backend/apps/api/views_manager_recurring.py
+"""
+Регулярные уборки (RecurringJobSchedule) для менеджера.
+
+Вхождения разворачиваются из правила виртуально; Job создаётся на
+короткий горизонт (manage.py materialize_recurring_jobs) или при первом
+обращении к вхождению (.../occurrences/<date>/).
+"""
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from rest_framework import status
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.jobs.models import Job, RecurringJobSchedule
+from apps.jobs.recurring import expand_occurrences, materialize_occurrences
+
+from .serializers import PlanningJobSerializer, RecurringJobScheduleSerializer
+from .views_manager_jobs import (
+    CONSOLE_ROLES,
+    _job_creation_blocked,
+    active_recurring_schedules,
+    build_virtual_occurrence_payload,
+)
+
+OCCURRENCES_MAX_WINDOW_DAYS = 62
+
+
+def _forbidden():
+    return Response(
+        {"detail": "Only console users can manage recurring jobs."},
+        status=status.HTTP_403_FORBIDDEN,
+    )
+
+
+class ManagerRecurringJobsView(APIView):
+    """
+    GET  /api/manager/recurring-jobs/  — расписания компании
+    POST /api/manager/recurring-jobs/  — новое расписание
+    Body: {
+        "location_id": 1, "cleaner_id": 5, "checklist_template_id": 3,
+        "scheduled_start_time": "09:00", "scheduled_end_time": "11:00",
+        "frequency": "weekly", "interval": 1, "weekdays": [0, 1, 2, 3, 4],
+        "start_date": "2026-03-02", "end_date": null
+    }
+    """
+
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role not in CONSOLE_ROLES:
+            return _forbidden()
+
+        schedules = RecurringJobSchedule.objects.filter(company=request.user.company).order_by("id")
+        return Response(RecurringJobScheduleSerializer(schedules, many=True).data)
+
+    def post(self, request):
+        user = request.user
+        if user.role not in CONSOLE_ROLES:
+            return _forbidden()
+
+        serializer = RecurringJobScheduleSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        schedule = serializer.save(company=user.company, created_by=user)
+        return Response(
+            RecurringJobScheduleSerializer(schedule).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class ManagerRecurringJobDetailView(APIView):
+    """
+    GET / PATCH / DELETE /api/manager/recurring-jobs/<id>/
+
+    Изменения действуют на ещё не созданные вхождения; уже созданные
+    Job остаются как есть (и после удаления расписания).
+    """
+
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def _get_schedule(self, request, pk):
+        return get_object_or_404(RecurringJobSchedule, pk=pk, company=request.user.company)
+
+    def get(self, request, pk: int):
+        if request.user.role not in CONSOLE_ROLES:
+            return _forbidden()
+        return Response(RecurringJobScheduleSerializer(self._get_schedule(request, pk)).data)
+
+    def patch(self, request, pk: int):
+        if request.user.role not in CONSOLE_ROLES:
+            return _forbidden()
+
+        serializer = RecurringJobScheduleSerializer(
+            self._get_schedule(request, pk),
+            data=request.data,
+            partial=True,
+            context={"request": request},
+        )
+        serializer.is_valid(raise_exception=True)
+        schedule = serializer.save()
+        return Response(RecurringJobScheduleSerializer(schedule).data)
+
+    def delete(self, request, pk: int):
+        if request.user.role not in CONSOLE_ROLES:
+            return _forbidden()
+
+        self._get_schedule(request, pk).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ManagerRecurringOccurrencesView(APIView):
+    """
+    Виртуальные вхождения для календаря (без создания Job).
+
+    GET /api/manager/recurring-jobs/occurrences/?date_from=YYYY-MM-DD&date_to=YYYY-MM-DD
+
+    Окно до OCCURRENCES_MAX_WINDOW_DAYS дней; прошлые даты не
+    разворачиваются. Уже созданные вхождения приходят обычными jobs из
+    planning / history.
+    """
+
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        if user.role not in CONSOLE_ROLES:
+            return _forbidden()
+
+        date_from = parse_date(request.query_params.get("date_from") or "")
+        date_to = parse_date(request.query_params.get("date_to") or "")
+        if not date_from or not date_to:
+            return Response(
+                {"detail": "date_from and date_to are required: YYYY-MM-DD"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if date_to < date_from or (date_to - date_from).days >= OCCURRENCES_MAX_WINDOW_DAYS:
+            return Response(
+                {"detail": f"Window must be 1..{OCCURRENCES_MAX_WINDOW_DAYS} days."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        date_from = max(date_from, timezone.localdate())
+        if date_from > date_to:
+            return Response([])
+
+        schedules = active_recurring_schedules(user.company, date_from, date_to)
+        occurrences = expand_occurrences(schedules, date_from, date_to)
+        return Response([build_virtual_occurrence_payload(schedule, day) for schedule, day in occurrences])
+
+
+class ManagerRecurringOccurrenceMaterializeView(APIView):
+    """
+    Первое обращение к вхождению: создаёт (или возвращает) его Job,
+    чтобы менеджер мог его редактировать / переназначить.
+
+    POST /api/manager/recurring-jobs/<id>/occurrences/<YYYY-MM-DD>/
+    201 — Job создан, 200 — уже существовал.
+    """
+
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk: int, day: str):
+        user = request.user
+        if user.role not in CONSOLE_ROLES:
+            return _forbidden()
+
+        schedule = get_object_or_404(
+            RecurringJobSchedule.objects.select_related("location", "cleaner"),
+            pk=pk,
+            company=user.company,
+        )
+
+        occurrence_day = parse_date(day)
+        if occurrence_day is None or occurrence_day not in schedule.occurrences(occurrence_day, occurrence_day):
+            return Response(
+                {"detail": "Date is not an occurrence of this schedule."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        existing = Job.objects.filter(recurring_schedule=schedule, scheduled_date=occurrence_day).first()
+        if existing is not None:
+            return Response(PlanningJobSerializer(existing).data, status=status.HTTP_200_OK)
+
+        if not schedule.is_active:
+            return Response(
+                {"detail": "Schedule is inactive."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if occurrence_day < timezone.localdate():
+            return Response(
+                {"detail": "Past occurrences cannot be materialized."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not schedule.cleaner.is_active or not getattr(schedule.location, "is_active", True):
+            return Response(
+                {"detail": "Schedule cleaner or location is inactive."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        blocked = _job_creation_blocked(user.company)
+        if blocked is not None:
+            return blocked
+
+        materialize_occurrences([schedule], occurrence_day, occurrence_day)
+        job = Job.objects.get(recurring_schedule=schedule, scheduled_date=occurrence_day)
+        return Response(PlanningJobSerializer(job).data, status=status.HTTP_201_CREATED)
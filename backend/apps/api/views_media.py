@@ -0,0 +1,194 @@
+# backend/apps/api/views_media.py
+"""
+Защищённая раздача media (фото job-ов, превью, логотипы).
+
+GET /api/media/<key>
+
+Django только авторизует запрос и отвечает на conditional-запросы;
+байты отдаёт фронт-прокси:
+  - MEDIA_ACCEL_REDIRECT_PREFIX (nginx): X-Accel-Redirect: <prefix><key>,
+    internal location проксирует на MEDIA_ROOT / bucket (Range — на nginx);
+  - MEDIA_SENDFILE_HEADER (Apache mod_xsendfile / lighttpd): <header>: <path>.
+Без них (dev) — отдаём файл сами, с поддержкой Range.
+"""
+import hashlib
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.http import http_date, parse_etags
+
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.accounts.models import Company, User
+from apps.jobs.models import JobPhoto
+
+# <uuid>.jpg — оригинал, ключ никогда не перезаписывается другим содержимым.
+# Производные (<uuid>_thumb.jpg / _medium.jpg) сюда намеренно не попадают:
+# их перегенерируют на месте, им нужен ETag от size / mtime.
+IMMUTABLE_KEY_RE = re.compile(r"/[0-9a-f]{32}\.[a-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "private, no-cache"
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _media_company_id(key: str):
+    """
+    (company_id, job_id) владельца ключа; company_id=None — ключ не наш.
+    """
+    parts = key.split("/")
+
+    if parts[0] == "company" and len(parts) > 2 and parts[1].isdigit():
+        job_id = int(parts[3]) if len(parts) > 3 and parts[2] == "jobs" and parts[3].isdigit() else None
+        return int(parts[1]), job_id
+
+    if parts[0] == "company_logos" and len(parts) > 1:
+        if len(parts) > 2 and parts[1].isdigit():
+            return int(parts[1]), None
+        # ImageField (upload_to="company_logos/") — без company_id в ключе
+        company_id = Company.objects.filter(logo=key).values_list("id", flat=True).first()
+        return company_id, None
+
+    return None, None
+
+
+def _cleaner_can_read(user, key: str) -> bool:
+    """
+    Ключ — оригинал или превью фото одной из джоб клинера. По ссылкам File,
+    а не по job_id в пути: после dedup фото другой джобы указывает на
+    объект, загруженный в папку первой. URL в File — storage.url(key),
+    т.е. ключ всегда в конце.
+    """
+    marker = f"/{key}"
+    return JobPhoto.objects.filter(
+        Q(file__file_url__endswith=marker)
+        | Q(file__thumb_url__endswith=marker)
+        | Q(file__medium_url__endswith=marker),
+        job__cleaner=user,
+    ).exists()
+
+
+def _is_safe_key(key: str) -> bool:
+    return bool(key) and not key.startswith("/") and ".." not in key.split("/")
+
+
+def _etag_for(key: str, storage) -> tuple[str, str, object]:
+    """
+    (etag, cache_control, last_modified). Для uuid-ключей ETag считается
+    из самого ключа — без обращения к storage.
+    """
+    if IMMUTABLE_KEY_RE.search(key):
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+        return f'"{digest}"', IMMUTABLE_CACHE_CONTROL, None
+
+    size = storage.size(key)
+    modified = storage.get_modified_time(key)
+    digest = hashlib.sha1(f"{key}:{size}:{modified.timestamp()}".encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"', DEFAULT_CACHE_CONTROL, modified
+
+
+class MediaFileView(APIView):
+    """
+    GET /api/media/<key>
+
+    Доступ: пользователь той же компании; клинер — только фото своих job.
+    """
+
+    authentication_classes = [TokenAuthentication, SessionAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, key: str):
+        if not _is_safe_key(key):
+            raise Http404
+
+        company_id, job_id = _media_company_id(key)
+        if company_id is None or company_id != request.user.company_id:
+            raise Http404
+
+        if job_id is not None and request.user.role == User.ROLE_CLEANER:
+            if not _cleaner_can_read(request.user, key):
+                return Response(
+                    {"detail": "You do not have access to this file."},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+
+        storage = default_storage
+
+        # и для immutable-ключей до 304: удалённый объект (GC, удаление
+        # фото) не должен «жить» в кэше клиента по старому ETag
+        if not storage.exists(key):
+            raise Http404
+
+        etag, cache_control, last_modified = _etag_for(key, storage)
+
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+        if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == "*"):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+            return self._with_cache_headers(response, etag, cache_control, last_modified)
+
+        content_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+        accel_prefix = getattr(settings, "MEDIA_ACCEL_REDIRECT_PREFIX", "")
+        sendfile_header = getattr(settings, "MEDIA_SENDFILE_HEADER", "")
+
+        if accel_prefix:
+            response = HttpResponse(content_type=content_type)
+            response["X-Accel-Redirect"] = f"{accel_prefix.rstrip('/')}/{quote(key)}"
+        elif sendfile_header:
+            response = HttpResponse(content_type=content_type)
+            response[sendfile_header] = storage.path(key)
+        else:
+            response = self._serve_from_storage(request, storage, key, content_type)
+
+        return self._with_cache_headers(response, etag, cache_control, last_modified)
+
+    def _serve_from_storage(self, request, storage, key, content_type):
+        """
+        Fallback без прокси (dev): отдаём сами, один диапазон Range.
+        """
+        size = storage.size(key)
+        match = RANGE_RE.match(request.META.get("HTTP_RANGE", ""))
+
+        if match and (match.group(1) or match.group(2)):
+            start, end = match.group(1), match.group(2)
+            if start:
+                start = int(start)
+                end = min(int(end), size - 1) if end else size - 1
+            else:
+                # bytes=-N — последние N байт
+                start = max(size - int(end), 0)
+                end = size - 1
+
+            if start > end or start >= size:
+                response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+                response["Content-Range"] = f"bytes */{size}"
+                return response
+
+            with storage.open(key, "rb") as f:
+                f.seek(start)
+                body = f.read(end - start + 1)
+
+            response = HttpResponse(body, status=status.HTTP_206_PARTIAL_CONTENT, content_type=content_type)
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        else:
+            response = FileResponse(storage.open(key, "rb"), content_type=content_type)
+            response["Content-Length"] = str(size)
+
+        response["Accept-Ranges"] = "bytes"
+        return response
+
+    def _with_cache_headers(self, response, etag, cache_control, last_modified):
+        response["ETag"] = etag
+        response["Cache-Control"] = cache_control
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+        return response
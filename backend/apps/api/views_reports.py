@@ -5,6 +5,7 @@ from collections import Counter, defaultdict
 from datetime import timedelta, datetime
 
 from django.conf import settings
+from django.db.models import Exists, OuterRef
 from django.core.mail import EmailMessage
 from django.http import HttpResponse
 from django.utils import timezone
@@ -184,15 +185,27 @@ def compute_sla_status_and_reasons_for_job(job: Job) -> tuple[str, list[str]]:
         # если явно записали причины — это всегда нарушение
         return "violated", normalized_explicit
 
+    # Proof уже посчитан в запросе списка (annotate_sla_proof) — без запросов
+    if hasattr(job, "sla_has_before"):
+        before_exists = job.sla_has_before
+        after_exists = job.sla_has_after
+        if job.sla_has_required_items:
+            checklist_completed = not job.sla_has_open_required_items
+        else:
+            checklist_completed = not job.sla_has_open_items
+        return _sla_status_from_proof(job, before_exists, after_exists, checklist_completed)
+
     # 1) Фотографии
     before_exists = JobPhoto.objects.filter(
         job=job,
         photo_type=JobPhoto.TYPE_BEFORE,
+        processing_status=JobPhoto.STATUS_READY,
     ).exists()
 
     after_exists = JobPhoto.objects.filter(
         job=job,
         photo_type=JobPhoto.TYPE_AFTER,
+        processing_status=JobPhoto.STATUS_READY,
     ).exists()
 
     # 2) Чеклист
@@ -212,6 +225,10 @@ def compute_sla_status_and_reasons_for_job(job: Job) -> tuple[str, list[str]]:
         # если чеклиста нет вообще — считаем, что по чеклисту всё ок
         checklist_completed = True
 
+    return _sla_status_from_proof(job, before_exists, after_exists, checklist_completed)
+
+
+def _sla_status_from_proof(job: Job, before_exists: bool, after_exists: bool, checklist_completed: bool):
     reasons: list[str] = []
 
     # SLA считаем только для completed jobs
@@ -227,6 +244,26 @@ def compute_sla_status_and_reasons_for_job(job: Job) -> tuple[str, list[str]]:
     return sla_status, reasons
 
 
+def annotate_sla_proof(qs):
+    """
+    Proof для compute_sla_status_and_reasons_for_job одним запросом:
+    EXISTS-подзапросы по ready-фото и пунктам чеклиста вместо 4–5 запросов на job.
+    """
+    ready_photos = JobPhoto.objects.filter(
+        job=OuterRef("pk"),
+        processing_status=JobPhoto.STATUS_READY,
+    )
+    items = JobChecklistItem.objects.filter(job=OuterRef("pk"))
+
+    return qs.annotate(
+        sla_has_before=Exists(ready_photos.filter(photo_type=JobPhoto.TYPE_BEFORE)),
+        sla_has_after=Exists(ready_photos.filter(photo_type=JobPhoto.TYPE_AFTER)),
+        sla_has_required_items=Exists(items.filter(is_required=True)),
+        sla_has_open_required_items=Exists(items.filter(is_required=True, is_completed=False)),
+        sla_has_open_items=Exists(items.filter(is_completed=False)),
+    )
+
+
 class OwnerOverviewView(APIView):
     """
     High-level business overview для владельца компании.
@@ -7,6 +7,7 @@ from .models import (
     JobChecklistItem,
     File,
     JobPhoto,
+    RecurringJobSchedule,
 )
 
 
@@ -119,7 +120,15 @@ class FileAdmin(admin.ModelAdmin):
 
 @admin.register(JobPhoto)
 class JobPhotoAdmin(admin.ModelAdmin):
-    list_display = ("id", "job", "photo_type", "created_at")
-    list_filter = ("photo_type",)
+    list_display = ("id", "job", "photo_type", "processing_status", "created_at")
+    list_filter = ("photo_type", "processing_status")
     search_fields = ("job__id",)
     readonly_fields = ("created_at",)
+
+
+@admin.register(RecurringJobSchedule)
+class RecurringJobScheduleAdmin(admin.ModelAdmin):
+    list_display = ("id", "company", "location", "cleaner", "frequency", "interval", "start_date", "is_active")
+    list_filter = ("frequency", "is_active", "company")
+    search_fields = ("id", "location__name", "cleaner__full_name")
+    readonly_fields = ("created_at", "updated_at")
@@ -0,0 +1,139 @@
+# backend/apps/jobs/direct_upload.py
+"""
+Direct-to-storage загрузка фото (минуя Django worker).
+
+Поток:
+  1) upload-slot: сервер выдаёт подписанный токен + PUT URL
+     на ключ company/<id>/jobs/<id>/photos/<type>/<uuid>.jpg
+  2) клиент делает PUT; приёмник проверяет size / sha256 и пишет в storage
+  3) finalize: сервер проверяет объект (есть, size, JPEG SOI) и создаёт File /
+     JobPhoto("pending"); EXIF, политика хранения и превью — как у
+     multipart-загрузки, в apps.jobs.photo_processing
+
+Backends (settings.PHOTO_DIRECT_UPLOAD_BACKEND; пусто — выключена):
+  - "local": PUT на наш endpoint /api/uploads/photos/<token>/, который пишет
+             в default_storage и проверяет размер / sha256 сам.
+
+S3-бэкенда нет: finalize и apps.jobs.photo_processing читают объект из
+default_storage (FileSystemStorage), так что presigned PUT в bucket
+finalize бы просто не нашёл. Добавлять вместе со storage-бэкендом на S3.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+from .exif_reader import JPEG_SOI
+
+TOKEN_SALT = "apps.jobs.direct_upload"
+
+BACKEND_LOCAL = "local"
+
+# Прямую загрузку принимаем только в JPEG (HEIC конвертирует клиент
+# или обычный multipart endpoint).
+DIRECT_UPLOAD_CONTENT_TYPES = {"image/jpeg"}
+
+
+class DirectUploadError(Exception):
+    pass
+
+
+def get_backend() -> str:
+    return getattr(settings, "PHOTO_DIRECT_UPLOAD_BACKEND", "") or ""
+
+
+def is_enabled() -> bool:
+    return get_backend() == BACKEND_LOCAL
+
+
+def get_expires_seconds() -> int:
+    return int(getattr(settings, "PHOTO_DIRECT_UPLOAD_EXPIRES", 900))
+
+
+def get_max_bytes() -> int:
+    return int(getattr(settings, "PHOTO_DIRECT_UPLOAD_MAX_BYTES", 25 * 1024 * 1024))
+
+
+# --- Tokens -------------------------------------------------------------------
+
+def make_upload_token(*, job_id, user_id, photo_type, key, size_bytes, sha256, content_type) -> str:
+    return signing.dumps(
+        {
+            "job_id": job_id,
+            "user_id": user_id,
+            "photo_type": photo_type,
+            "key": key,
+            "size_bytes": size_bytes,
+            "sha256": sha256,
+            "content_type": content_type,
+        },
+        salt=TOKEN_SALT,
+        compress=True,
+    )
+
+
+def load_upload_token(token: str) -> dict:
+    try:
+        return signing.loads(token, salt=TOKEN_SALT, max_age=get_expires_seconds())
+    except signing.SignatureExpired:
+        raise DirectUploadError("Upload slot expired.")
+    except signing.BadSignature:
+        raise DirectUploadError("Invalid upload token.")
+
+
+# --- Upload instructions ------------------------------------------------------
+
+def build_upload_instructions(request, token: str, payload: dict) -> dict:
+    """
+    Что вернуть клиенту: URL, метод и заголовки, которые он обязан отправить.
+    """
+    url = request.build_absolute_uri(
+        reverse("job-photo-direct-upload", kwargs={"token": token})
+    )
+    return {"method": "PUT", "url": url, "headers": {"Content-Type": payload["content_type"]}}
+
+
+# --- Local stand-in -------------------------------------------------------------
+
+def store_local_upload(payload: dict, body: bytes) -> None:
+    """
+    PUT-приёмник для backend="local": отклоняет байты с другим
+    размером / sha256.
+    """
+    if len(body) != payload["size_bytes"]:
+        raise DirectUploadError("Size mismatch.")
+    if hashlib.sha256(body).hexdigest() != payload["sha256"]:
+        raise DirectUploadError("Checksum mismatch.")
+
+    key = payload["key"]
+    if default_storage.exists(key):
+        default_storage.delete(key)
+    default_storage.save(key, ContentFile(body))
+
+
+# --- Finalize helpers --------------------------------------------------------------
+
+def verify_uploaded_object(payload: dict, storage=None) -> None:
+    """
+    Объект есть, размер совпадает со слотом, начинается с JPEG SOI.
+    """
+    storage = storage or default_storage
+    key = payload["key"]
+
+    if not storage.exists(key):
+        raise DirectUploadError("Uploaded object not found.")
+
+    size = storage.size(key)
+    if size != payload["size_bytes"]:
+        raise DirectUploadError(
+            f"Uploaded object size mismatch: expected {payload['size_bytes']}, got {size}."
+        )
+
+    with storage.open(key, "rb") as f:
+        head = f.read(len(JPEG_SOI))
+    if head != JPEG_SOI:
+        raise DirectUploadError("Uploaded object is not a JPEG.")
+
@@ -0,0 +1,343 @@
+# backend/apps/jobs/exif_reader.py
+"""
+Лёгкий EXIF-ридер: читает только заголовки файла, пиксели не декодирует.
+
+JPEG: идём по маркерам до SOS, берём APP1 "Exif\\0\\0".
+HEIC/HEIF: ISOBMFF meta -> iinf (item типа "Exif") -> iloc (offset/length),
+           читаем только этот extent.
+Дальше — разбор TIFF: IFD0 -> Exif IFD (DateTimeOriginal) и GPS IFD.
+
+Возвращает dict с сырыми значениями тегов ({} — EXIF нет, None — формат
+не поддерживается). Интерпретация (GPS -> float, дата -> datetime)
+остаётся в apps.jobs.utils.
+"""
+import struct
+from typing import Optional
+
+# --- Precomputed tag tables -------------------------------------------------
+
+TAG_DATETIME = 0x0132
+TAG_EXIF_IFD = 0x8769
+TAG_GPS_IFD = 0x8825
+TAG_DATETIME_ORIGINAL = 0x9003
+
+GPS_LATITUDE_REF = 0x0001
+GPS_LATITUDE = 0x0002
+GPS_LONGITUDE_REF = 0x0003
+GPS_LONGITUDE = 0x0004
+
+IFD0_TAGS = frozenset({TAG_DATETIME, TAG_EXIF_IFD, TAG_GPS_IFD})
+EXIF_IFD_TAGS = frozenset({TAG_DATETIME_ORIGINAL})
+GPS_IFD_TAGS = frozenset({GPS_LATITUDE_REF, GPS_LATITUDE, GPS_LONGITUDE_REF, GPS_LONGITUDE})
+
+# TIFF field type -> размер одного значения в байтах
+TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1, 9: 4, 10: 8}
+
+# APP1 в JPEG ограничен 64KB; EXIF-item в HEIC обычно < 64KB, берём с запасом
+MAX_EXIF_BYTES = 256 * 1024
+
+JPEG_SOI = b"\xff\xd8"
+JPEG_SOS = 0xDA
+JPEG_EOI = 0xD9
+JPEG_APP1 = 0xE1
+EXIF_HEADER = b"Exif\x00\x00"
+
+HEIF_BRANDS = frozenset({b"heic", b"heix", b"heim", b"heis", b"hevc", b"hevx", b"mif1", b"msf1"})
+
+
+class ExifParseError(Exception):
+    pass
+
+
+def read_exif_header(fileobj) -> Optional[dict]:
+    """
+    Возвращает {"DateTimeOriginal", "DateTime", "GPSLatitudeRef", "GPSLatitude",
+    "GPSLongitudeRef", "GPSLongitude"} (отсутствующие — None);
+    {} — JPEG/HEIC без EXIF; None — формат не поддерживается.
+    Бросает ExifParseError на битых заголовках.
+    """
+    fileobj.seek(0)
+    head = fileobj.read(12)
+
+    if head[:2] == JPEG_SOI:
+        tiff = _jpeg_exif_tiff(fileobj)
+    elif head[4:8] == b"ftyp" and head[8:12] in HEIF_BRANDS:
+        tiff = _heif_exif_tiff(fileobj)
+    else:
+        return None
+
+    if not tiff:
+        return {}
+    return _parse_tiff(tiff)
+
+
+# --- JPEG ---------------------------------------------------------------------
+
+def _jpeg_exif_tiff(f) -> Optional[bytes]:
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            raise ExifParseError("Bad JPEG marker")
+
+        code = marker[1]
+        # fill bytes 0xFF 0xFF ...
+        while code == 0xFF:
+            nxt = f.read(1)
+            if not nxt:
+                raise ExifParseError("Truncated JPEG")
+            code = nxt[0]
+
+        if code in (JPEG_SOS, JPEG_EOI):
+            # дальше — сжатые данные, EXIF там не бывает
+            return None
+        if 0xD0 <= code <= 0xD7 or code == 0x01:
+            continue  # маркеры без длины
+
+        raw_len = f.read(2)
+        if len(raw_len) < 2:
+            raise ExifParseError("Truncated JPEG segment")
+        seg_len = struct.unpack(">H", raw_len)[0] - 2
+
+        if code == JPEG_APP1 and seg_len >= len(EXIF_HEADER):
+            data = f.read(seg_len)
+            if len(data) < seg_len:
+                raise ExifParseError("Truncated APP1 segment")
+            if data.startswith(EXIF_HEADER):
+                return data[len(EXIF_HEADER):]
+            continue  # XMP APP1
+
+        f.seek(seg_len, 1)
+
+
+# --- HEIC / ISOBMFF -------------------------------------------------------------
+
+def _read_box_header(f):
+    header = f.read(8)
+    if len(header) < 8:
+        return None, None, 0
+    size, box_type = struct.unpack(">I4s", header)
+    header_len = 8
+    if size == 1:
+        size = struct.unpack(">Q", f.read(8))[0]
+        header_len = 16
+    elif size == 0:
+        size = None  # до конца файла
+    return box_type, size, header_len
+
+
+def _iter_boxes(f, start: int, end: Optional[int]):
+    pos = start
+    while end is None or pos < end:
+        f.seek(pos)
+        box_type, size, header_len = _read_box_header(f)
+        if box_type is None:
+            return
+        yield box_type, pos + header_len, (pos + size) if size else end
+        if not size:
+            return
+        pos += size
+
+
+def _heif_exif_tiff(f) -> Optional[bytes]:
+    meta = None
+    for box_type, body_start, box_end in _iter_boxes(f, 0, None):
+        if box_type == b"meta":
+            meta = (body_start + 4, box_end)  # FullBox: version + flags
+            break
+        if box_type == b"mdat":
+            break
+    if meta is None:
+        return None
+
+    exif_item_id = None
+    locations = {}
+    idat_start = None
+
+    for box_type, body_start, box_end in _iter_boxes(f, meta[0], meta[1]):
+        if box_type == b"iinf":
+            exif_item_id = _heif_find_exif_item(f, body_start, box_end)
+        elif box_type == b"iloc":
+            locations = _heif_parse_iloc(f, body_start)
+        elif box_type == b"idat":
+            idat_start = body_start
+
+    if exif_item_id is None or exif_item_id not in locations:
+        return None
+
+    construction_method, extents = locations[exif_item_id]
+    if construction_method == 1:
+        if idat_start is None:
+            return None
+        base = idat_start
+    elif construction_method == 0:
+        base = 0
+    else:
+        return None
+
+    data = b""
+    for offset, length in extents:
+        if len(data) + length > MAX_EXIF_BYTES:
+            raise ExifParseError("EXIF item too large")
+        f.seek(base + offset)
+        data += f.read(length)
+
+    if len(data) < 4:
+        return None
+    # Exif item: 4 байта — смещение до TIFF header
+    tiff_offset = struct.unpack(">I", data[:4])[0]
+    return data[4 + tiff_offset:]
+
+
+def _heif_find_exif_item(f, start: int, end: int) -> Optional[int]:
+    f.seek(start)
+    version = f.read(4)[0]
+    count_fmt = ">H" if version == 0 else ">I"
+    f.read(struct.calcsize(count_fmt))
+
+    for box_type, body_start, _ in _iter_boxes(f, f.tell(), end):
+        if box_type != b"infe":
+            continue
+        f.seek(body_start)
+        infe_version = f.read(4)[0]
+        if infe_version < 2:
+            continue
+        id_fmt = ">H" if infe_version == 2 else ">I"
+        item_id = struct.unpack(id_fmt, f.read(struct.calcsize(id_fmt)))[0]
+        f.read(2)  # item_protection_index
+        if f.read(4) == b"Exif":
+            return item_id
+    return None
+
+
+def _read_uint(f, size: int) -> int:
+    if size == 0:
+        return 0
+    return int.from_bytes(f.read(size), "big")
+
+
+def _heif_parse_iloc(f, start: int) -> dict:
+    f.seek(start)
+    version = f.read(4)[0]
+    sizes = f.read(2)
+    offset_size, length_size = sizes[0] >> 4, sizes[0] & 0x0F
+    base_offset_size = sizes[1] >> 4
+    index_size = (sizes[1] & 0x0F) if version in (1, 2) else 0
+
+    item_count = _read_uint(f, 2 if version < 2 else 4)
+    locations = {}
+
+    for _ in range(item_count):
+        item_id = _read_uint(f, 2 if version < 2 else 4)
+        construction_method = 0
+        if version in (1, 2):
+            construction_method = _read_uint(f, 2) & 0x0F
+        _read_uint(f, 2)  # data_reference_index
+        base_offset = _read_uint(f, base_offset_size)
+        extent_count = _read_uint(f, 2)
+
+        extents = []
+        for _ in range(extent_count):
+            _read_uint(f, index_size)
+            extent_offset = _read_uint(f, offset_size)
+            extent_length = _read_uint(f, length_size)
+            extents.append((base_offset + extent_offset, extent_length))
+
+        locations[item_id] = (construction_method, extents)
+
+    return locations
+
+
+# --- TIFF ---------------------------------------------------------------------
+
+def _parse_tiff(tiff: bytes) -> dict:
+    if len(tiff) < 8:
+        return {}
+
+    if tiff[:2] == b"II":
+        bo = "<"
+    elif tiff[:2] == b"MM":
+        bo = ">"
+    else:
+        raise ExifParseError("Bad TIFF byte order")
+
+    magic, ifd0_offset = struct.unpack(bo + "HI", tiff[2:8])
+    if magic != 42:
+        raise ExifParseError("Bad TIFF magic")
+
+    if ifd0_offset + 2 > len(tiff) or not struct.unpack(bo + "H", tiff[ifd0_offset:ifd0_offset + 2])[0]:
+        return {}
+
+    ifd0 = _read_ifd(tiff, bo, ifd0_offset, IFD0_TAGS)
+
+    exif_ifd = {}
+    if TAG_EXIF_IFD in ifd0:
+        exif_ifd = _read_ifd(tiff, bo, ifd0[TAG_EXIF_IFD], EXIF_IFD_TAGS)
+
+    gps_ifd = {}
+    if TAG_GPS_IFD in ifd0:
+        gps_ifd = _read_ifd(tiff, bo, ifd0[TAG_GPS_IFD], GPS_IFD_TAGS)
+
+    return {
+        "DateTimeOriginal": exif_ifd.get(TAG_DATETIME_ORIGINAL),
+        "DateTime": ifd0.get(TAG_DATETIME),
+        "GPSLatitudeRef": gps_ifd.get(GPS_LATITUDE_REF),
+        "GPSLatitude": gps_ifd.get(GPS_LATITUDE),
+        "GPSLongitudeRef": gps_ifd.get(GPS_LONGITUDE_REF),
+        "GPSLongitude": gps_ifd.get(GPS_LONGITUDE),
+    }
+
+
+def _read_ifd(tiff: bytes, bo: str, offset, wanted: frozenset) -> dict:
+    if not isinstance(offset, int) or offset + 2 > len(tiff):
+        return {}
+
+    count = struct.unpack(bo + "H", tiff[offset:offset + 2])[0]
+    out = {}
+    pos = offset + 2
+
+    for _ in range(count):
+        entry = tiff[pos:pos + 12]
+        pos += 12
+        if len(entry) < 12:
+            break
+
+        tag, typ, n = struct.unpack(bo + "HHI", entry[:8])
+        if tag not in wanted:
+            continue
+
+        unit = TIFF_TYPE_SIZES.get(typ)
+        if unit is None:
+            continue
+
+        size = unit * n
+        if size <= 4:
+            raw = entry[8:8 + size]
+        else:
+            value_offset = struct.unpack(bo + "I", entry[8:12])[0]
+            raw = tiff[value_offset:value_offset + size]
+            if len(raw) < size:
+                continue
+
+        out[tag] = _decode_value(bo, typ, n, raw)
+
+    return out
+
+
+def _decode_value(bo: str, typ: int, n: int, raw: bytes):
+    if typ == 2:  # ASCII
+        return raw.split(b"\x00", 1)[0].decode("ascii", errors="ignore")
+    if typ == 3:
+        values = struct.unpack(bo + "H" * n, raw)
+    elif typ in (4, 9):
+        values = struct.unpack(bo + ("I" if typ == 4 else "i") * n, raw)
+    elif typ in (5, 10):
+        fmt = "I" if typ == 5 else "i"
+        ints = struct.unpack(bo + fmt * (2 * n), raw)
+        values = tuple(
+            (ints[i] / ints[i + 1]) if ints[i + 1] else 0.0
+            for i in range(0, len(ints), 2)
+        )
+    else:
+        return raw
+    return values[0] if n == 1 else values
@@ -6,6 +6,17 @@ import tempfile
 from io import BytesIO
 
 from django.core.files.uploadedfile import InMemoryUploadedFile
+from PIL import Image, ImageOps
+
+try:
+    # pillow_heif регистрирует HEIF-декодер в Pillow: HEIC открывается
+    # обычным Image.open(), без внешних процессов и временных файлов.
+    from pillow_heif import register_heif_opener  # type: ignore
+
+    register_heif_opener()
+    HEIF_DECODER_AVAILABLE = True
+except Exception:
+    HEIF_DECODER_AVAILABLE = False
 
 
 HEIC_CONTENT_TYPES = {
@@ -16,6 +27,9 @@ HEIC_CONTENT_TYPES = {
 }
 HEIC_EXTENSIONS = {".heic", ".heif"}
 
+# Качество JPEG при конвертации HEIC (близко к дефолту sips).
+HEIC_JPEG_QUALITY = 90
+
 
 def _is_heic(uploaded_file) -> bool:
     """
@@ -33,6 +47,13 @@ def _is_heic(uploaded_file) -> bool:
     )
 
 
+def raw_upload_extension(uploaded_file) -> str:
+    """
+    Расширение для сырого upload в storage (до нормализации).
+    """
+    return ".heic" if _is_heic(uploaded_file) else ".jpg"
+
+
 def _read_all_bytes(uploaded_file) -> bytes:
     """
     Надёжно читаем все байты из UploadedFile.
@@ -46,21 +67,46 @@ def _read_all_bytes(uploaded_file) -> bytes:
     return uploaded_file.read()
 
 
-def normalize_job_photo_to_jpeg(uploaded_file):
+def _heic_to_jpeg_bytes_in_process(uploaded_file) -> bytes:
     """
-    Принимает uploaded_file (любой формат).
-    Если HEIC/HEIF — конвертирует в JPEG через системный `sips`.
-    Иначе возвращает файл как есть.
+    Декодирует HEIC/HEIF через pillow_heif прямо из файлового объекта
+    (InMemoryUploadedFile — из памяти, TemporaryUploadedFile — из spooled
+    файла на диске) и кодирует в JPEG в памяти.
 
-    Возвращает объект UploadedFile, который можно передавать в FileField.
+    Ориентация: libheif применяет irot/imir при декодировании, а pillow_heif
+    сбрасывает EXIF Orientation в 1 — пиксели уже «правильные», повторного
+    поворота у клиентов не будет. Остальной EXIF (GPS, DateTimeOriginal)
+    и ICC-профиль переносятся в JPEG как есть.
     """
-    if uploaded_file is None:
-        return uploaded_file
+    try:
+        uploaded_file.seek(0)
+    except Exception:
+        pass
 
-    if not _is_heic(uploaded_file):
-        # не HEIC — отдаем как есть
-        return uploaded_file
+    with Image.open(uploaded_file) as img:
+        exif_bytes = img.info.get("exif")
+        icc_profile = img.info.get("icc_profile")
+
+        if img.mode != "RGB":
+            img = img.convert("RGB")
 
+        save_kwargs = {"format": "JPEG", "quality": HEIC_JPEG_QUALITY}
+        if exif_bytes:
+            save_kwargs["exif"] = exif_bytes
+        if icc_profile:
+            save_kwargs["icc_profile"] = icc_profile
+
+        buffer = BytesIO()
+        img.save(buffer, **save_kwargs)
+
+    return buffer.getvalue()
+
+
+def _heic_to_jpeg_bytes_with_sips(uploaded_file) -> bytes:
+    """
+    Legacy-путь: конвертация через системный `sips` (только macOS).
+    Используется, только если pillow_heif недоступен.
+    """
     # читаем байты исходного файла
     raw_bytes = _read_all_bytes(uploaded_file)
 
@@ -93,25 +139,7 @@ def normalize_job_photo_to_jpeg(uploaded_file):
 
         # читаем JPEG из dst_path
         with open(dst_path, "rb") as dst_f:
-            jpg_bytes = dst_f.read()
-
-        buffer = BytesIO(jpg_bytes)
-        buffer.seek(0)
-
-        # собираем нормальный UploadedFile
-        orig_name = uploaded_file.name or "photo.heic"
-        base_name, _ = os.path.splitext(orig_name)
-        new_name = base_name + ".jpg"
-
-        converted = InMemoryUploadedFile(
-            file=buffer,
-            field_name=getattr(uploaded_file, "field_name", "file"),
-            name=new_name,
-            content_type="image/jpeg",
-            size=len(jpg_bytes),
-            charset=None,
-        )
-        return converted
+            return dst_f.read()
 
     finally:
         # чистим за собой временные файлы
@@ -127,9 +155,132 @@ def normalize_job_photo_to_jpeg(uploaded_file):
                 pass
 
 
+def heic_to_jpeg_bytes(uploaded_file) -> bytes:
+    """
+    HEIC/HEIF -> JPEG bytes.
+    Основной путь — in-process (pillow_heif), fallback — `sips`.
+    """
+    if HEIF_DECODER_AVAILABLE:
+        return _heic_to_jpeg_bytes_in_process(uploaded_file)
+    return _heic_to_jpeg_bytes_with_sips(uploaded_file)
+
+
+def normalize_job_photo_to_jpeg(uploaded_file):
+    """
+    Принимает uploaded_file (любой формат).
+    Если HEIC/HEIF — конвертирует в JPEG in-process (pillow_heif).
+    Иначе возвращает файл как есть.
+
+    Возвращает объект UploadedFile, который можно передавать в FileField.
+    """
+    if uploaded_file is None:
+        return uploaded_file
+
+    if not _is_heic(uploaded_file):
+        # не HEIC — отдаем как есть
+        return uploaded_file
+
+    jpg_bytes = heic_to_jpeg_bytes(uploaded_file)
+
+    buffer = BytesIO(jpg_bytes)
+    buffer.seek(0)
+
+    # собираем нормальный UploadedFile
+    orig_name = uploaded_file.name or "photo.heic"
+    base_name, _ = os.path.splitext(orig_name)
+    new_name = base_name + ".jpg"
+
+    converted = InMemoryUploadedFile(
+        file=buffer,
+        field_name=getattr(uploaded_file, "field_name", "file"),
+        name=new_name,
+        content_type="image/jpeg",
+        size=len(jpg_bytes),
+        charset=None,
+    )
+    return converted
+
+
 def convert_to_jpeg_if_needed(uploaded_file):
     """
     Старое имя для совместимости. Просто обёртка над normalize_job_photo_to_jpeg.
     """
     return normalize_job_photo_to_jpeg(uploaded_file)
-    
\ No newline at end of file
+    
+
+def build_jpeg_derivatives(source, sizes: dict[str, int], quality: int = 80) -> dict[str, bytes]:
+    """
+    Уменьшенные копии (thumb / medium) из одного декодирования оригинала.
+
+    sizes: {"thumb": 320, "medium": 1280} — максимальная длинная сторона в px.
+    Для JPEG используем draft(): libjpeg декодирует сразу в 1/2..1/8 масштаба,
+    полный 12MP кадр в память не поднимается. Ориентация из EXIF применяется
+    к пикселям (в derivatives EXIF не пишем).
+    """
+    try:
+        source.seek(0)
+    except Exception:
+        pass
+
+    out: dict[str, bytes] = {}
+
+    with Image.open(source) as img:
+        largest = max(sizes.values())
+        img.draft("RGB", (largest, largest))
+        img = ImageOps.exif_transpose(img)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+
+        # от большего к меньшему: каждый следующий режем из предыдущего
+        for name, max_edge in sorted(sizes.items(), key=lambda kv: -kv[1]):
+            img = img.copy()
+            img.thumbnail((max_edge, max_edge))
+
+            buffer = BytesIO()
+            img.save(buffer, format="JPEG", quality=quality, optimize=True)
+            out[name] = buffer.getvalue()
+
+    return out
+
+
+def encode_jpeg_with_policy(
+    source,
+    max_long_edge: int = 0,
+    quality: int = 82,
+    strip_metadata: bool = True,
+) -> bytes:
+    """
+    Перекодирует фото (JPEG / HEIC / PNG ...) в JPEG по политике хранения:
+    - длинная сторона не больше max_long_edge (0 — без ограничения);
+    - ориентация из EXIF применяется к пикселям;
+    - strip_metadata: EXIF/XMP не пишем (ICC профиль сохраняем всегда).
+    """
+    try:
+        source.seek(0)
+    except Exception:
+        pass
+
+    with Image.open(source) as img:
+        icc_profile = img.info.get("icc_profile")
+
+        if max_long_edge:
+            # libjpeg сразу декодирует в уменьшенном масштабе (не меньше цели)
+            img.draft("RGB", (max_long_edge, max_long_edge))
+        img = ImageOps.exif_transpose(img)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+
+        if max_long_edge and max(img.size) > max_long_edge:
+            img.thumbnail((max_long_edge, max_long_edge), Image.Resampling.LANCZOS)
+
+        save_kwargs = {"format": "JPEG", "quality": quality, "optimize": True, "progressive": True}
+        if icc_profile:
+            save_kwargs["icc_profile"] = icc_profile
+        if not strip_metadata:
+            exif = img.getexif()
+            if exif:
+                save_kwargs["exif"] = exif.tobytes()
+
+        buffer = BytesIO()
+        img.save(buffer, **save_kwargs)
+        return buffer.getvalue()
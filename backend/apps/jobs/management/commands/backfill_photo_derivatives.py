@@ -0,0 +1,81 @@
+"""
+Generate thumb/medium derivatives for existing job photos.
+
+Processes File rows that belong to a JobPhoto and have no thumb_url yet,
+in primary-key batches (safe to interrupt and re-run).
+
+Usage:
+    python manage.py backfill_photo_derivatives
+    python manage.py backfill_photo_derivatives --company-id 18 --batch-size 200
+    python manage.py backfill_photo_derivatives --force      # regenerate all
+    python manage.py backfill_photo_derivatives --dry-run
+"""
+from django.core.management.base import BaseCommand
+
+from apps.jobs.models import File
+from apps.jobs.photo_storage import generate_photo_derivatives
+
+
+class Command(BaseCommand):
+    help = "Backfill thumb/medium derivatives for existing job photos"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--company-id",
+            type=int,
+            default=None,
+            help="Only process photos of this company",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Rows per batch (default: 100)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate derivatives even if they already exist",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count files that would be processed",
+        )
+
+    def handle(self, *args, **options):
+        qs = File.objects.filter(job_photo__isnull=False)
+        if options["company_id"]:
+            qs = qs.filter(job_photo__job__company_id=options["company_id"])
+        if not options["force"]:
+            qs = qs.filter(thumb_url="")
+
+        total = qs.count()
+        self.stdout.write(f"Files to process: {total}")
+        if options["dry_run"] or not total:
+            return
+
+        batch_size = max(1, options["batch_size"])
+        processed = 0
+        failed = 0
+        last_id = 0
+
+        while True:
+            batch = list(qs.filter(id__gt=last_id).order_by("id")[:batch_size])
+            if not batch:
+                break
+
+            for file_obj in batch:
+                try:
+                    generate_photo_derivatives(file_obj)
+                    processed += 1
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"File(id={file_obj.id}): {exc}")
+
+            last_id = batch[-1].id
+            self.stdout.write(f"  {processed + failed}/{total} (failed: {failed})")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Done: {processed} processed, {failed} failed")
+        )
@@ -0,0 +1,146 @@
+"""
+Micro-benchmark: header-only EXIF reader vs. full Pillow path.
+
+Runs extract_exif_data (header-only for JPEG/HEIC) and the legacy
+Pillow path over the same photos, reports per-photo latency and the
+speedup, and flags any sample where the two disagree.
+
+Usage:
+    # Real device photos (file or directory with .jpg/.jpeg/.heic/.heif)
+    python manage.py benchmark_exif_extract --path ~/Pictures/device-samples
+
+    # Synthetic 12MP JPEG/HEIC samples
+    python manage.py benchmark_exif_extract --synthetic 3 --iterations 50
+"""
+import os
+import statistics
+import time
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs import image_utils  # noqa: F401  (регистрирует HEIF в Pillow)
+from apps.jobs.utils import _extract_exif_data_pillow, extract_exif_data
+
+PHOTO_EXTENSIONS = {".jpg", ".jpeg", ".heic", ".heif"}
+
+
+class Command(BaseCommand):
+    help = "Benchmark header-only EXIF extraction against the Pillow path"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            type=str,
+            default=None,
+            help="Photo file or directory with .jpg/.jpeg/.heic/.heif files",
+        )
+        parser.add_argument(
+            "--synthetic",
+            type=int,
+            default=0,
+            help="Generate N synthetic JPEG + N HEIC samples (12MP, GPS EXIF)",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="Extractions per sample (default: 20)",
+        )
+
+    def handle(self, *args, **options):
+        samples = self._load_samples(options["path"], options["synthetic"])
+        if not samples:
+            raise CommandError("No samples: pass --path or --synthetic N")
+
+        iterations = max(1, options["iterations"])
+        self.stdout.write(f"Samples: {len(samples)}, iterations per sample: {iterations}")
+
+        header_ms = []
+        pillow_ms = []
+        mismatches = 0
+
+        for name, raw in samples:
+            header_result, header_t = self._time(extract_exif_data, raw, iterations)
+            pillow_result, pillow_t = self._time(_extract_exif_data_pillow, raw, iterations)
+            header_ms.extend(header_t)
+            pillow_ms.extend(pillow_t)
+
+            # Pillow не читает EXIF из HEIC (нет _getexif) — там сравнивать не с чем
+            if pillow_result[3] is False and header_result != pillow_result:
+                mismatches += 1
+                self.stdout.write(
+                    self.style.WARNING(f"  mismatch {name}: {header_result} != {pillow_result}")
+                )
+
+        self._report("header-only", header_ms)
+        self._report("pillow", pillow_ms)
+        self.stdout.write(
+            f"Speedup (median): {statistics.median(pillow_ms) / statistics.median(header_ms):.1f}x"
+        )
+
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f"Mismatches: {mismatches}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Results identical"))
+
+    def _time(self, extract, raw, iterations):
+        timings = []
+        result = None
+        for _ in range(iterations):
+            buffer = BytesIO(raw)
+            started = time.perf_counter()
+            result = extract(buffer)
+            timings.append((time.perf_counter() - started) * 1000)
+        return result, timings
+
+    def _report(self, name, timings_ms):
+        timings_ms = sorted(timings_ms)
+        p95 = timings_ms[min(len(timings_ms) - 1, int(len(timings_ms) * 0.95))]
+        self.stdout.write(
+            f"{name:>12}: mean={statistics.mean(timings_ms):.3f}ms "
+            f"p50={statistics.median(timings_ms):.3f}ms p95={p95:.3f}ms"
+        )
+
+    def _load_samples(self, path, synthetic):
+        samples = []
+
+        if path:
+            path = os.path.expanduser(path)
+            if os.path.isdir(path):
+                names = sorted(
+                    os.path.join(path, n)
+                    for n in os.listdir(path)
+                    if os.path.splitext(n)[1].lower() in PHOTO_EXTENSIONS
+                )
+            elif os.path.isfile(path):
+                names = [path]
+            else:
+                raise CommandError(f"Path not found: {path}")
+
+            for file_path in names:
+                with open(file_path, "rb") as f:
+                    samples.append((os.path.basename(file_path), f.read()))
+
+        for i in range(synthetic):
+            for fmt in ("JPEG", "HEIF"):
+                samples.append((f"synthetic_{i}.{fmt.lower()}", self._make_synthetic(fmt, seed=i)))
+
+        return samples
+
+    def _make_synthetic(self, fmt: str, seed: int) -> bytes:
+        from PIL import Image
+
+        img = Image.effect_noise((4032, 3024), 40 + seed).convert("RGB")
+        exif = Image.Exif()
+        exif[0x0132] = "2026:01:15 09:30:00"
+        exif.get_ifd(0x8769)[0x9003] = "2026:01:15 09:30:00"
+        gps = exif.get_ifd(0x8825)
+        gps[1] = "N"
+        gps[2] = (25.0, 12.0, 17.28)
+        gps[3] = "E"
+        gps[4] = (55.0, 16.0, 14.88)
+
+        buffer = BytesIO()
+        img.save(buffer, format=fmt, exif=exif.tobytes(), quality=85)
+        return buffer.getvalue()
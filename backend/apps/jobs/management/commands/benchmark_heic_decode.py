@@ -0,0 +1,120 @@
+"""
+Benchmark HEIC -> JPEG conversion latency per photo.
+
+Compares the in-process decoder (pillow_heif) with the legacy `sips`
+subprocess path (macOS only; skipped when `sips` is not on PATH).
+
+Usage:
+    # Real device photos (file or directory of .heic/.heif)
+    python manage.py benchmark_heic_decode --path ~/Pictures/iphone
+
+    # Synthetic corpus (no files needed)
+    python manage.py benchmark_heic_decode --synthetic 5 --iterations 10
+"""
+import os
+import shutil
+import statistics
+import time
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs import image_utils
+
+
+class Command(BaseCommand):
+    help = "Benchmark per-photo HEIC -> JPEG conversion latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            type=str,
+            default=None,
+            help="HEIC file or directory with .heic/.heif files",
+        )
+        parser.add_argument(
+            "--synthetic",
+            type=int,
+            default=0,
+            help="Generate N synthetic 12MP HEIC samples instead of reading files",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=5,
+            help="Conversions per sample (default: 5)",
+        )
+
+    def handle(self, *args, **options):
+        if not image_utils.HEIF_DECODER_AVAILABLE:
+            raise CommandError("pillow_heif is not installed — in-process decoder unavailable")
+
+        samples = self._load_samples(options["path"], options["synthetic"])
+        if not samples:
+            raise CommandError("No samples: pass --path or --synthetic N")
+
+        iterations = max(1, options["iterations"])
+        self.stdout.write(f"Samples: {len(samples)}, iterations per sample: {iterations}")
+
+        results = {
+            "in-process": self._run(samples, iterations, image_utils._heic_to_jpeg_bytes_in_process),
+        }
+        if shutil.which("sips"):
+            results["sips"] = self._run(samples, iterations, image_utils._heic_to_jpeg_bytes_with_sips)
+        else:
+            self.stdout.write(self.style.WARNING("sips not found — legacy path skipped"))
+
+        for name, timings in results.items():
+            timings_ms = sorted(t * 1000 for t in timings)
+            p95 = timings_ms[min(len(timings_ms) - 1, int(len(timings_ms) * 0.95))]
+            self.stdout.write(
+                f"{name:>10}: mean={statistics.mean(timings_ms):.1f}ms "
+                f"p50={statistics.median(timings_ms):.1f}ms p95={p95:.1f}ms "
+                f"n={len(timings_ms)}"
+            )
+
+    def _run(self, samples, iterations, convert):
+        timings = []
+        for name, raw in samples:
+            for _ in range(iterations):
+                upload = SimpleUploadedFile(name, raw, content_type="image/heic")
+                started = time.perf_counter()
+                convert(upload)
+                timings.append(time.perf_counter() - started)
+        return timings
+
+    def _load_samples(self, path, synthetic):
+        samples = []
+
+        if path:
+            path = os.path.expanduser(path)
+            if os.path.isdir(path):
+                names = sorted(
+                    os.path.join(path, n)
+                    for n in os.listdir(path)
+                    if os.path.splitext(n)[1].lower() in image_utils.HEIC_EXTENSIONS
+                )
+            elif os.path.isfile(path):
+                names = [path]
+            else:
+                raise CommandError(f"Path not found: {path}")
+
+            for file_path in names:
+                with open(file_path, "rb") as f:
+                    samples.append((os.path.basename(file_path), f.read()))
+
+        for i in range(synthetic):
+            samples.append((f"synthetic_{i}.heic", self._make_synthetic_heic(seed=i)))
+
+        return samples
+
+    def _make_synthetic_heic(self, seed: int) -> bytes:
+        """12MP (4032x3024) HEIC с шумом, чтобы кодек не сжал его в ноль."""
+        from PIL import Image
+
+        noise = Image.effect_noise((4032, 3024), 40 + seed)
+        img = Image.merge("RGB", (noise, noise.rotate(90, expand=False), noise))
+        buffer = BytesIO()
+        img.save(buffer, format="HEIF", quality=80)
+        return buffer.getvalue()
@@ -0,0 +1,142 @@
+"""
+Garbage-collect orphaned media objects (job photos, derivatives, logos).
+
+Streams the storage listing under company/ and company_logos/, merges it
+against the keys referenced by File rows of live job photos and company
+logos, and deletes (or quarantines) the rest in batches. Objects younger
+than --min-age-hours are skipped: an upload may not have created its
+File/JobPhoto rows yet.
+
+File rows left without a JobPhoto (Job cascade deletes) are pruned first,
+so their objects become collectable in the same run.
+
+Usage:
+    python manage.py gc_media --dry-run
+    python manage.py gc_media --quarantine          # move to quarantine/<date>/...
+    python manage.py gc_media --min-age-hours 48 --batch-size 500
+"""
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from apps.jobs.media_gc import (
+    iter_orphan_keys,
+    move_to_quarantine,
+    prune_orphan_file_rows,
+)
+from apps.jobs.models import File
+from apps.jobs.photo_storage import MEDIA_KEY_PREFIXES
+
+DRY_RUN_SAMPLE = 20
+
+
+class Command(BaseCommand):
+    help = "Delete or quarantine media objects not referenced by the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report orphans, change nothing",
+        )
+        parser.add_argument(
+            "--quarantine",
+            action="store_true",
+            help="Move orphans to quarantine/<YYYYMMDD>/ instead of deleting",
+        )
+        parser.add_argument(
+            "--min-age-hours",
+            type=float,
+            default=24,
+            help="Skip objects modified more recently than this (default: 24)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Objects per batch (default: 200)",
+        )
+        parser.add_argument(
+            "--prefix",
+            action="append",
+            default=None,
+            help=f"Storage prefix to scan (repeatable; default: {', '.join(MEDIA_KEY_PREFIXES)})",
+        )
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        dry_run = options["dry_run"]
+        prefixes = options["prefix"] or MEDIA_KEY_PREFIXES
+        batch_size = max(1, options["batch_size"])
+
+        if dry_run:
+            orphan_rows = File.objects.filter(job_photo__isnull=True).count()
+            self.stdout.write(f"Orphan File rows: {orphan_rows} (not pruned in dry-run)")
+        else:
+            self.stdout.write(f"Pruned orphan File rows: {prune_orphan_file_rows()}")
+
+        orphans = iter_orphan_keys(
+            storage,
+            prefixes=prefixes,
+            min_age=timedelta(hours=options["min_age_hours"]),
+        )
+
+        found = 0
+        total_bytes = 0
+        processed = 0
+        failed = 0
+        batch = []
+
+        for key in orphans:
+            found += 1
+            total_bytes += self._size(storage, key)
+
+            if dry_run:
+                if found <= DRY_RUN_SAMPLE:
+                    self.stdout.write(f"  orphan: {key}")
+                continue
+
+            batch.append(key)
+            if len(batch) >= batch_size:
+                ok, bad = self._collect(storage, batch, options["quarantine"])
+                processed += ok
+                failed += bad
+                batch = []
+                self.stdout.write(f"  {processed} collected (failed: {failed})")
+
+        if batch:
+            ok, bad = self._collect(storage, batch, options["quarantine"])
+            processed += ok
+            failed += bad
+
+        summary = f"Orphans: {found}, {total_bytes / (1024 * 1024):.1f} MB"
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f"{summary} (dry-run, nothing changed)"))
+            return
+
+        action = "quarantined" if options["quarantine"] else "deleted"
+        self.stdout.write(
+            self.style.SUCCESS(f"{summary}; {processed} {action}, {failed} failed")
+        )
+
+    def _collect(self, storage, keys, quarantine):
+        ok = 0
+        failed = 0
+        for key in keys:
+            try:
+                if quarantine:
+                    move_to_quarantine(storage, key)
+                else:
+                    storage.delete(key)
+                ok += 1
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"{key}: {exc}")
+        return ok, failed
+
+    def _size(self, storage, key):
+        try:
+            return storage.size(key)
+        except Exception:
+            return 0
@@ -0,0 +1,127 @@
+"""
+Materialize recurring cleaning schedules for a short horizon.
+
+Planning and calendar views expand RecurringJobSchedule occurrences
+virtually; real Job rows are only needed shortly before the visit (the
+cleaner app lists jobs). This command creates the missing jobs between
+today and today + --horizon-days for all active schedules, walking them in
+keyset batches (by id). Every batch is one bulk insert.
+
+Safe to re-run and to run on several nodes: schedules are row-locked while
+they are materialized and (recurring_schedule, scheduled_date) is unique.
+
+Schedules are skipped when the cleaner or location is inactive or the
+company is blocked. Trial companies get at most their remaining trial job
+quota, earliest occurrences first.
+
+Usage:
+    python manage.py materialize_recurring_jobs                    # today + tomorrow
+    python manage.py materialize_recurring_jobs --horizon-days 3
+    python manage.py materialize_recurring_jobs --dry-run
+"""
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.jobs.models import RecurringJobSchedule
+from apps.jobs.recurring import expand_occurrences, materialize_occurrences
+
+
+class Command(BaseCommand):
+    help = "Create Job rows for recurring cleaning schedules within a short horizon"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--horizon-days",
+            type=int,
+            default=1,
+            help="Materialize occurrences up to today + N days (default: 1)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Schedules per keyset batch (default: 200)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count occurrences that would be created",
+        )
+
+    def _materialize(self, schedules, date_from, date_to, dry_run, limit=None) -> int:
+        if not schedules:
+            return 0
+        if dry_run:
+            return len(expand_occurrences(schedules, date_from, date_to)[:limit])
+        return len(materialize_occurrences(schedules, date_from, date_to, limit=limit))
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        horizon_end = today + timedelta(days=max(0, options["horizon_days"]))
+        batch_size = max(1, options["batch_size"])
+        dry_run = options["dry_run"]
+        mode = "DRY-RUN" if dry_run else "APPLY"
+
+        candidates = (
+            RecurringJobSchedule.objects.filter(
+                is_active=True,
+                cleaner__is_active=True,
+                location__is_active=True,
+                start_date__lte=horizon_end,
+            )
+            .filter(Q(end_date__isnull=True) | Q(end_date__gte=today))
+            .select_related("company")
+        )
+
+        started = time.perf_counter()
+        blocked_companies = {}
+        planned = defaultdict(int)  # dry-run: джобы trial-компаний, «созданные» прошлыми батчами
+        scanned = skipped = created = 0
+        last_id = 0
+        while True:
+            batch = list(candidates.filter(pk__gt=last_id).order_by("pk")[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].pk
+            scanned += len(batch)
+
+            unlimited = []
+            trial = defaultdict(list)
+            for schedule in batch:
+                company = schedule.company
+                if company.id not in blocked_companies:
+                    blocked_companies[company.id] = company.is_blocked()
+                if blocked_companies[company.id]:
+                    skipped += 1
+                elif company.is_trial_active:
+                    trial[company.id].append(schedule)
+                else:
+                    unlimited.append(schedule)
+
+            created += self._materialize(unlimited, today, horizon_end, dry_run)
+
+            # trial: не больше остатка квоты компании (usage читается заново —
+            # его двигают и прошлые батчи, и API)
+            for company_id, schedules in trial.items():
+                remaining = schedules[0].company.trial_jobs_remaining() - planned[company_id]
+                if remaining <= 0:
+                    skipped += len(schedules)
+                    continue
+                count = self._materialize(schedules, today, horizon_end, dry_run, limit=remaining)
+                if dry_run:
+                    planned[company_id] += count
+                created += count
+
+        elapsed = time.perf_counter() - started
+        verb = "would be created" if dry_run else "created"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"[{mode}] horizon {horizon_end.isoformat()}: {scanned} schedules scanned, "
+                f"{skipped} skipped, {created} jobs {verb} in {elapsed:.2f}s"
+            )
+        )
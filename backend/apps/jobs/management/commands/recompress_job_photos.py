@@ -0,0 +1,116 @@
+"""
+Re-encode stored job photos according to each company's photo ingest policy
+(max long edge, JPEG quality, metadata stripping).
+
+Only photos not yet evaluated (File.original_size_bytes is null) are
+processed, in primary-key batches, so the command is safe to interrupt
+and re-run. Objects shared by several File rows (content-hash dedup) are
+re-encoded once.
+
+Usage:
+    python manage.py recompress_job_photos
+    python manage.py recompress_job_photos --company-id 18 --batch-size 200
+    python manage.py recompress_job_photos --dry-run
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+
+from apps.jobs.models import File, JobPhoto
+from apps.jobs.photo_processing import get_ingest_policy, recompress_stored_photo
+
+
+class Command(BaseCommand):
+    help = "Re-encode historical job photos with the company photo ingest policy"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--company-id",
+            type=int,
+            default=None,
+            help="Only process photos of this company",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Rows per batch (default: 100)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count files and their current size",
+        )
+
+    def handle(self, *args, **options):
+        qs = File.objects.filter(
+            job_photo__processing_status=JobPhoto.STATUS_READY,
+            original_size_bytes__isnull=True,
+        )
+        if options["company_id"]:
+            qs = qs.filter(job_photo__job__company_id=options["company_id"])
+
+        total = qs.count()
+        self.stdout.write(f"Files to process: {total}")
+        if options["dry_run"] or not total:
+            stored = qs.aggregate(total=Sum("size_bytes"))["total"] or 0
+            self.stdout.write(f"Current stored size: {_mb(stored)}")
+            return
+
+        batch_size = max(1, options["batch_size"])
+        seen_urls = set()
+        recompressed = 0
+        kept = 0
+        failed = 0
+        bytes_before = 0
+        bytes_after = 0
+        last_id = 0
+
+        while True:
+            batch = list(
+                qs.filter(id__gt=last_id)
+                .select_related("job_photo__job__company")
+                .order_by("id")[:batch_size]
+            )
+            if not batch:
+                break
+
+            for file_obj in batch:
+                # общий объект (dedup) уже перекодирован в этом прогоне
+                if file_obj.file_url in seen_urls:
+                    continue
+                seen_urls.add(file_obj.file_url)
+
+                policy = get_ingest_policy(file_obj.job_photo.job.company)
+                try:
+                    result = recompress_stored_photo(file_obj, policy)
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"File(id={file_obj.id}): {exc}")
+                    continue
+
+                if result is None:
+                    kept += 1
+                    continue
+
+                recompressed += 1
+                bytes_before += result[0]
+                bytes_after += result[1]
+
+            last_id = batch[-1].id
+            self.stdout.write(
+                f"  {recompressed + kept + failed} objects "
+                f"(re-encoded: {recompressed}, kept: {kept}, failed: {failed}), "
+                f"reclaimed {_mb(bytes_before - bytes_after)}"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done: {recompressed} re-encoded, {kept} kept, {failed} failed; "
+                f"{_mb(bytes_before)} -> {_mb(bytes_after)}, "
+                f"reclaimed {_mb(bytes_before - bytes_after)}"
+            )
+        )
+
+
+def _mb(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MB"
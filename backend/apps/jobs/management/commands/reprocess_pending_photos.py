@@ -0,0 +1,81 @@
+"""
+Process job photos stuck in processing_status="pending".
+
+dispatch_photo_processing() runs in an in-process thread pool, so a web
+worker restart loses its queue. This command (run from cron on one node)
+processes photos that have been pending longer than --older-than-minutes,
+synchronously and in primary-key batches. A photo that fails processing
+is rejected, so it is not picked up again.
+
+Usage:
+    python manage.py reprocess_pending_photos
+    python manage.py reprocess_pending_photos --older-than-minutes 30
+    python manage.py reprocess_pending_photos --dry-run
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.jobs.photo_processing import (
+    STALE_PENDING_AFTER,
+    process_job_photo_safely,
+    stale_pending_photos,
+)
+
+
+class Command(BaseCommand):
+    help = "Process job photos that have been pending for too long"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-minutes",
+            type=int,
+            default=int(STALE_PENDING_AFTER.total_seconds() // 60),
+            help="Only photos pending longer than N minutes (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Rows per batch (default: 100)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count photos that would be processed",
+        )
+
+    def handle(self, *args, **options):
+        older_than = timedelta(minutes=max(0, options["older_than_minutes"]))
+        qs = stale_pending_photos(older_than)
+
+        total = qs.count()
+        self.stdout.write(f"Stale pending photos: {total}")
+        if options["dry_run"] or not total:
+            return
+
+        batch_size = max(1, options["batch_size"])
+        last_id = 0
+        processed = 0
+
+        # набор фиксируем до обработки: фото, ставшие stale за время
+        # работы, подберёт следующий запуск
+        max_id = qs.order_by("-id").values_list("id", flat=True).first()
+        while True:
+            batch = list(
+                qs.filter(id__gt=last_id, id__lte=max_id).order_by("id").values_list("id", flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+
+            for photo_id in batch:
+                process_job_photo_safely(photo_id)
+                processed += 1
+
+            last_id = batch[-1]
+            self.stdout.write(f"  {processed}/{total}")
+
+        remaining = stale_pending_photos(older_than).filter(id__lte=max_id).count()
+        self.stdout.write(
+            self.style.SUCCESS(f"Done: {processed} processed, {remaining} still pending")
+        )
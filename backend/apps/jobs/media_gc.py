@@ -0,0 +1,135 @@
+# backend/apps/jobs/media_gc.py
+"""
+Поиск осиротевших объектов в default_storage (фото job-ов, логотипы).
+
+Объекты остаются в storage, когда:
+  - Job удаляется каскадом (JobPhoto уходит, File и объект — нет);
+  - логотип компании перезаписывается;
+  - upload упал между записью в storage и созданием File.
+
+Алгоритм — sorted merge: ключи, на которые ссылается БД, сортируются
+один раз; листинг storage обходится в том же порядке (по компонентам
+пути) потоково, без загрузки всего листинга в память.
+"""
+from datetime import timedelta
+from typing import Iterable, Iterator, Optional
+
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from apps.accounts.models import Company
+
+from .models import File
+from .photo_storage import MEDIA_KEY_PREFIXES, storage_path_from_url
+
+QUARANTINE_PREFIX = "quarantine"
+
+
+def _sort_key(key: str) -> tuple:
+    return tuple(key.split("/"))
+
+
+def iter_storage_keys(storage, prefix: str) -> Iterator[str]:
+    """
+    Все ключи под prefix в порядке _sort_key (DFS по отсортированным каталогам).
+    """
+    try:
+        dirs, files = storage.listdir(prefix)
+    except (FileNotFoundError, NotADirectoryError):
+        return
+
+    entries = sorted([(name, True) for name in dirs] + [(name, False) for name in files])
+    for name, is_dir in entries:
+        path = f"{prefix.rstrip('/')}/{name}" if prefix else name
+        if is_dir:
+            yield from iter_storage_keys(storage, path)
+        else:
+            yield path
+
+
+def referenced_media_keys() -> list[tuple]:
+    """
+    Отсортированные ключи, на которые ссылается БД:
+    File (оригинал + превью) живых JobPhoto и логотипы компаний.
+    """
+    keys = set()
+
+    rows = File.objects.filter(job_photo__isnull=False).values_list(
+        "file_url", "thumb_url", "medium_url"
+    )
+    for urls in rows.iterator(chunk_size=2000):
+        for url in urls:
+            key = storage_path_from_url(url)
+            if key:
+                keys.add(key)
+
+    for logo_name, logo_url in Company.objects.values_list("logo", "logo_url").iterator():
+        if logo_name:
+            keys.add(logo_name)
+        key = storage_path_from_url(logo_url)
+        if key:
+            keys.add(key)
+
+    return sorted(_sort_key(key) for key in keys)
+
+
+def find_orphan_keys(storage_keys: Iterable[str], referenced: list[tuple]) -> Iterator[str]:
+    """
+    Merge двух отсортированных потоков: ключи storage, которых нет в referenced.
+    """
+    ref_iter = iter(referenced)
+    ref = next(ref_iter, None)
+
+    for key in storage_keys:
+        current = _sort_key(key)
+        while ref is not None and ref < current:
+            ref = next(ref_iter, None)
+        if ref == current:
+            continue
+        yield key
+
+
+def is_older_than(storage, key: str, min_age: timedelta) -> bool:
+    """
+    Свежие объекты не трогаем: upload мог ещё не создать File / JobPhoto.
+    """
+    try:
+        modified = storage.get_modified_time(key)
+    except (NotImplementedError, OSError):
+        return True
+    return modified <= timezone.now() - min_age
+
+
+def iter_orphan_keys(
+    storage=None,
+    prefixes: Iterable[str] = MEDIA_KEY_PREFIXES,
+    min_age: Optional[timedelta] = None,
+) -> Iterator[str]:
+    storage = storage or default_storage
+    referenced = referenced_media_keys()
+
+    for prefix in prefixes:
+        for key in find_orphan_keys(iter_storage_keys(storage, prefix.rstrip("/")), referenced):
+            if min_age is None or is_older_than(storage, key, min_age):
+                yield key
+
+
+def quarantine_key(key: str, now=None) -> str:
+    now = now or timezone.now()
+    return f"{QUARANTINE_PREFIX}/{now:%Y%m%d}/{key}"
+
+
+def move_to_quarantine(storage, key: str) -> str:
+    target = quarantine_key(key)
+    with storage.open(key, "rb") as src:
+        saved = storage.save(target, src)
+    storage.delete(key)
+    return saved
+
+
+def prune_orphan_file_rows() -> int:
+    """
+    File без JobPhoto (Job удалён каскадом). File используется только JobPhoto.
+    """
+    deleted, _ = File.objects.filter(job_photo__isnull=True).delete()
+    return deleted
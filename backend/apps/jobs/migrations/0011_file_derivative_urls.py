@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 06:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps_jobs', '0010_add_priority_and_sla_deadline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='file',
+            name='medium_url',
+            field=models.URLField(blank=True, max_length=1000),
+        ),
+        migrations.AddField(
+            model_name='file',
+            name='thumb_url',
+            field=models.URLField(blank=True, max_length=1000),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 06:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps_jobs', '0012_file_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobphoto',
+            name='processing_error',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='jobphoto',
+            name='processing_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('rejected', 'Rejected')], default='ready', max_length=16),
+        ),
+    ]
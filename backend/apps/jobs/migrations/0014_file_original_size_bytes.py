@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-19 06:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps_jobs', '0013_jobphoto_processing_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='file',
+            name='original_size_bytes',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-19 07:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps_jobs', '0014_file_original_size_bytes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['company', 'context', '-scheduled_date', '-scheduled_start_time', '-id'], name='jobs_company_history_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-19 07:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps_jobs', '0015_job_company_history_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobMutationReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(max_length=64)),
+                ('operation', models.CharField(max_length=32)),
+                ('device_timestamp', models.DateTimeField(blank=True, null=True)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('result', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mutation_receipts', to='apps_jobs.job')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_mutation_receipts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'job_mutation_receipts',
+                'constraints': [models.UniqueConstraint(fields=('user', 'idempotency_key'), name='uniq_job_mutation_user_key')],
+            },
+        ),
+    ]
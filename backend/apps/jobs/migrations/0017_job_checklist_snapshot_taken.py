@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-19 07:21
+
+from django.db import migrations, models
+
+
+def backfill_snapshot_taken(apps, schema_editor):
+    """
+    Джобы, у которых уже есть пункты чеклиста, повторный snapshot не получают.
+    """
+    Job = apps.get_model("apps_jobs", "Job")
+    JobChecklistItem = apps.get_model("apps_jobs", "JobChecklistItem")
+
+    Job.objects.filter(
+        id__in=JobChecklistItem.objects.values("job_id")
+    ).update(checklist_snapshot_taken=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps_jobs', '0016_job_mutation_receipt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='checklist_snapshot_taken',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(backfill_snapshot_taken, migrations.RunPython.noop),
+    ]
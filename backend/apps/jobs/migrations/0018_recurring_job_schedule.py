@@ -0,0 +1,54 @@
+# Generated by Django 5.2.9 on 2026-10-19 07:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps_accounts', '0009_company_usage'),
+        ('apps_jobs', '0017_job_checklist_snapshot_taken'),
+        ('apps_locations', '0003_add_context_to_checklisttemplate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurringJobSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scheduled_start_time', models.TimeField(blank=True, null=True)),
+                ('scheduled_end_time', models.TimeField(blank=True, null=True)),
+                ('manager_notes', models.TextField(blank=True)),
+                ('frequency', models.CharField(choices=[('weekly', 'Weekly'), ('monthly', 'Monthly')], default='weekly', max_length=16)),
+                ('interval', models.PositiveSmallIntegerField(default=1)),
+                ('weekdays', models.JSONField(blank=True, default=list)),
+                ('month_day', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('checklist_template', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='recurring_job_schedules', to='apps_locations.checklisttemplate')),
+                ('cleaner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurring_job_schedules', to=settings.AUTH_USER_MODEL)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurring_job_schedules', to='apps_accounts.company')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_recurring_job_schedules', to=settings.AUTH_USER_MODEL)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurring_job_schedules', to='apps_locations.location')),
+            ],
+            options={
+                'db_table': 'recurring_job_schedules',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='recurring_schedule',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='apps_jobs.recurringjobschedule'),
+        ),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(fields=('recurring_schedule', 'scheduled_date'), name='uniq_job_recurring_occurrence'),
+        ),
+    ]
@@ -1,13 +1,35 @@
 # backend/apps/jobs/models.py
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+
 from django.core.exceptions import ValidationError
 from django.db import models, transaction
+from django.db.models.functions import Cast
 from django.utils import timezone
 
 from apps.accounts.models import Company, User
-from apps.locations.models import Location, ChecklistTemplate
+from apps.locations.models import Location, ChecklistTemplate, ChecklistTemplateItem
 # Note: Asset import deferred to avoid circular import - see asset FK below
 
 
+class JobCompletionBlocked(ValidationError):
+    """
+    Отказ check-out со структурированным e.message:
+    {"code": "JOB_COMPLETION_BLOCKED", "message": ..., "fields": {...}}.
+    ValidationError(dict) с вложенным dict Django разобрать не может
+    (AttributeError в конструкторе), поэтому payload кладём в message.
+    """
+
+    def __init__(self, fields: dict):
+        super().__init__("Cannot complete job", code="JOB_COMPLETION_BLOCKED")
+        self.message = {
+            "code": "JOB_COMPLETION_BLOCKED",
+            "message": "Cannot complete job",
+            "fields": fields,
+        }
+
+
 class Job(models.Model):
     """
     Уборка на конкретной локации, в конкретный день, за конкретным клинером.
@@ -86,6 +108,8 @@ class Job(models.Model):
         blank=True,
         related_name="jobs",
     )
+    # snapshot checklist_template в JobChecklistItem уже сделан (один раз, см. save)
+    checklist_snapshot_taken = models.BooleanField(default=False)
 
     # Maintenance Context V1: optional asset link for service visits
     # See: docs/product/MAINTENANCE_CONTEXT_V1_SCOPE.md Section 4.2
@@ -162,11 +186,34 @@ class Job(models.Model):
         help_text="Reason provided by manager for force-completing this job",
     )
 
+    # вхождение регулярного расписания (материализованное, см. apps.jobs.recurring)
+    recurring_schedule = models.ForeignKey(
+        "RecurringJobSchedule",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="jobs",
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "jobs"
+        constraints = [
+            # одно вхождение расписания — одна джоба (NULL не конфликтуют)
+            models.UniqueConstraint(
+                fields=["recurring_schedule", "scheduled_date"],
+                name="uniq_job_recurring_occurrence",
+            ),
+        ]
+        indexes = [
+            # history / service visits: company + context, свежие первыми (keyset)
+            models.Index(
+                fields=["company", "context", "-scheduled_date", "-scheduled_start_time", "-id"],
+                name="jobs_company_history_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"Job #{self.id} – {self.location} – {self.scheduled_date}"
@@ -184,89 +231,74 @@ class Job(models.Model):
             if self.checklist_template.company_id != self.company_id:
                 raise ValidationError("Checklist template must belong to the same company as the job")
 
-    def _get_template_items_qs(self):
-        """
-        Пытаемся найти связанные пункты шаблона чеклиста, не зная точный related_name.
-        Поддерживаем несколько вариантов, чтобы не утыкаться в странный related_name.
+    def save(self, *args, **kwargs):
         """
-        template = self.checklist_template
-        if template is None:
-            return None
-
-        # самые вероятные варианты
-        candidates = [
-            "items",
-            "template_items",
-            "checklist_items",
-            "checklisttemplateitem_set",
-        ]
+        Snapshot checklist_template в JobChecklistItem делается один раз
+        (флаг checklist_snapshot_taken) одним bulk_create — для admin и
+        create_with_checklist, которые создают Job обычным save().
 
-        for attr in candidates:
-            if hasattr(template, attr):
-                qs = getattr(template, attr)
-                try:
-                    # manager / related manager
-                    return qs.all()
-                except Exception:
-                    continue
+        Переходы статусов (check_in / check_out / force complete) сохраняют
+        с update_fields без checklist_template — это ровно один UPDATE.
+        """
+        if not self._needs_checklist_snapshot(kwargs.get("update_fields")):
+            super().save(*args, **kwargs)
+            return
 
-        print(f"[Job.save] No related items manager found on ChecklistTemplate(id={template.id})")
-        return None
+        with transaction.atomic():
+            is_new = self.pk is None
+            self.checklist_snapshot_taken = True
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "checklist_snapshot_taken"}
+            super().save(*args, **kwargs)
+
+            # пункты, добавленные вручную до привязки шаблона, не дублируем
+            if is_new or not self.checklist_items.exists():
+                Job.snapshot_checklists({self.pk: self.checklist_template_id})
+
+    def _needs_checklist_snapshot(self, update_fields) -> bool:
+        if not self.checklist_template_id or self.checklist_snapshot_taken:
+            return False
+        if update_fields is not None and not {"checklist_template", "checklist_template_id"} & set(update_fields):
+            return False
+        # шаблон чужой компании не копируем (см. clean)
+        return not self.company_id or self.checklist_template.company_id == self.company_id
 
-    def save(self, *args, **kwargs):
+    @classmethod
+    def touch(cls, job_id) -> None:
         """
-        ВАЖНО для MVP:
-        - Django admin создаёт Job через обычный save()
-        - create_with_checklist() может не использоваться
-        Поэтому: если у Job есть checklist_template и нет checklist_items,
-        автоматически делаем snapshot в JobChecklistItem.
+        Сдвигает updated_at без save(). Фото и чеклист живут в своих таблицах,
+        а delta sync (manager active ?updated_since=) смотрит на Job.updated_at.
         """
-        is_new = self.pk is None
-
-        super().save(*args, **kwargs)
-
-        # Если шаблон не задан — нечего снимать
-        if not self.checklist_template_id:
-            return
-
-        # Уже есть checklist_items — ничего не делаем
-        if self.checklist_items.exists():
-            return
+        cls.objects.filter(pk=job_id).update(updated_at=timezone.now())
 
-        # На всякий случай ещё раз проверим company
-        if self.company_id and self.checklist_template.company_id != self.company_id:
-            print(
-                f"[Job.save] ChecklistTemplate(id={self.checklist_template_id}) "
-                f"company mismatch for Job(id={self.id})"
+    @classmethod
+    def snapshot_checklists(cls, template_ids_by_job_id: dict) -> int:
+        """
+        Snapshot пунктов шаблонов в JobChecklistItem для многих джоб сразу:
+        один запрос за пунктами всех шаблонов и один bulk_create.
+        template_ids_by_job_id: {job_id: template_id}. Возвращает число пунктов.
+        """
+        template_ids = {tid for tid in template_ids_by_job_id.values() if tid}
+        if not template_ids:
+            return 0
+
+        items_by_template = defaultdict(list)
+        for item in ChecklistTemplateItem.objects.filter(template_id__in=template_ids).order_by("order", "id"):
+            items_by_template[item.template_id].append(item)
+
+        snapshot = [
+            JobChecklistItem(
+                job_id=job_id,
+                order=item.order,
+                text=item.text,
+                is_required=item.is_required,
+                is_completed=False,
             )
-            return
-
-        items_qs = self._get_template_items_qs()
-        if items_qs is None:
-            print(f"[Job.save] No template items for checklist_template={self.checklist_template_id}")
-            return
-
-        with transaction.atomic():
-            created_count = 0
-            for item in items_qs:
-                order_val = getattr(item, "order", None)
-                if order_val is None:
-                    order_val = getattr(item, "order_index", 1)
-
-                is_required_val = getattr(item, "is_required", True)
-
-                JobChecklistItem.objects.create(
-                    job=self,
-                    order=int(order_val),
-                    text=item.text,
-                    is_required=bool(is_required_val),
-                )
-                created_count += 1
-
-        print(
-            f"[Job.save] Created {created_count} checklist items for Job(id={self.id}), "
-            f"template={self.checklist_template_id}"
-        )
+            for job_id, template_id in template_ids_by_job_id.items()
+            for item in items_by_template.get(template_id, ())
+        ]
+        JobChecklistItem.objects.bulk_create(snapshot, batch_size=500)
+        return len(snapshot)
 
     @classmethod
     def create_with_checklist(
@@ -282,9 +314,8 @@ class Job(models.Model):
         manager_notes: str = "",
     ) -> "Job":
         """
-        Создаёт Job и копирует пункты checklist_template в JobChecklistItem.
-        Теперь snapshot гарантирован в save(), но метод оставляем
-        для явного использования из API/сервисов.
+        Создаёт Job и копирует пункты checklist_template в JobChecklistItem
+        (snapshot делает save(), метод оставлен для явного использования).
         """
         with transaction.atomic():
             job = cls.objects.create(
@@ -299,58 +330,102 @@ class Job(models.Model):
             )
             return job
 
+    def completion_blockers(self) -> dict:
+        """
+        Блокеры check-out: фото до/после (есть и прошли обработку) и
+        невыполненные обязательные пункты чек-листа.
+
+        Префетченные photos / checklist_items (сделанные под той же
+        блокировкой, что и check-out) используются без запроса; остальное —
+        одним запросом (UNION ALL статусов фото и id открытых пунктов).
+        """
+        cache = getattr(self, "_prefetched_objects_cache", {})
+        photo_statuses = None
+        required_open = None
+
+        if "photos" in cache:
+            photo_statuses = {photo.photo_type: photo.processing_status for photo in cache["photos"]}
+        if "checklist_items" in cache:
+            required_open = [
+                item.id for item in cache["checklist_items"] if item.is_required and not item.is_completed
+            ]
+
+        parts = []
+        if photo_statuses is None:
+            photo_statuses = {}
+            parts.append(
+                JobPhoto.objects.filter(job_id=self.pk)
+                .annotate(kind=models.Value("photo"), key=models.F("photo_type"), value=models.F("processing_status"))
+                .values_list("kind", "key", "value")
+            )
+        if required_open is None:
+            required_open = []
+            parts.append(
+                JobChecklistItem.objects.filter(job_id=self.pk, is_required=True, is_completed=False)
+                .annotate(
+                    kind=models.Value("item"),
+                    key=Cast("id", output_field=models.CharField()),
+                    value=models.Value(""),
+                )
+                .values_list("kind", "key", "value")
+            )
+
+        if parts:
+            rows = parts[0].order_by().union(*(part.order_by() for part in parts[1:]), all=True)
+            for kind, key, value in rows:
+                if kind == "photo":
+                    photo_statuses[key] = value
+                else:
+                    required_open.append(int(key))
+            required_open.sort()
+
+        blockers = {}
+
+        # 1) Фото до/после обязательны и должны пройти обработку
+        for photo_type in (JobPhoto.TYPE_BEFORE, JobPhoto.TYPE_AFTER):
+            photo_status = photo_statuses.get(photo_type)
+            if photo_status is None:
+                blockers[f"photos.{photo_type}"] = "required"
+            elif photo_status == JobPhoto.STATUS_PENDING:
+                blockers[f"photos.{photo_type}"] = "processing"
+            elif photo_status == JobPhoto.STATUS_REJECTED:
+                blockers[f"photos.{photo_type}"] = "rejected"
+
+        # 2) Обязательные пункты чек-листа должны быть выполнены
+        if required_open:
+            blockers["checklist.required"] = required_open
+
+        return blockers
+
     def check_in(self):
         if self.status != self.STATUS_SCHEDULED:
             raise ValidationError("Job is not in scheduled state")
 
         self.status = self.STATUS_IN_PROGRESS
         self.actual_start_time = timezone.now()
-        self.save(update_fields=["status", "actual_start_time"])
+        self.save(update_fields=["status", "actual_start_time", "updated_at"])
 
     def check_out(self):
         """
         Complete the job (check-out).
 
-        Raises ValidationError with structured format:
+        Raises JobCompletionBlocked (ValidationError), e.message:
         {
             "code": "JOB_COMPLETION_BLOCKED",
-            "message": "Cannot check out: missing required items",
+            "message": "Cannot complete job",
             "fields": {"photos.before": "required", ...}
         }
         """
         if self.status != self.STATUS_IN_PROGRESS:
-            raise ValidationError({
-                "code": "JOB_COMPLETION_BLOCKED",
-                "message": "Cannot complete job",
-                "fields": {"status": "must_be_in_progress"}
-            })
-
-        # Collect all blockers
-        blockers = {}
-
-        # 1) Фото до/после обязательны
-        has_before = self.photos.filter(photo_type=JobPhoto.TYPE_BEFORE).exists()
-        has_after = self.photos.filter(photo_type=JobPhoto.TYPE_AFTER).exists()
-        if not has_before:
-            blockers["photos.before"] = "required"
-        if not has_after:
-            blockers["photos.after"] = "required"
-
-        # 2) Обязательные пункты чек-листа должны быть выполнены
-        required_incomplete = self.checklist_items.filter(is_required=True, is_completed=False)
-        if required_incomplete.exists():
-            blockers["checklist.required"] = list(required_incomplete.values_list("id", flat=True))
+            raise JobCompletionBlocked({"status": "must_be_in_progress"})
 
+        blockers = self.completion_blockers()
         if blockers:
-            raise ValidationError({
-                "code": "JOB_COMPLETION_BLOCKED",
-                "message": "Cannot complete job",
-                "fields": blockers
-            })
+            raise JobCompletionBlocked(blockers)
 
         self.status = self.STATUS_COMPLETED
         self.actual_end_time = timezone.now()
-        self.save(update_fields=["status", "actual_end_time"])
+        self.save(update_fields=["status", "actual_end_time", "updated_at"])
 
 
 class JobCheckEvent(models.Model):
@@ -456,9 +531,18 @@ class File(models.Model):
     Хранение: file_url — источник правды (локально или S3/Spaces).
     """
     file_url = models.URLField(max_length=1000)
+    # Превью (derivatives) рядом с оригиналом; пусто, пока не сгенерированы
+    thumb_url = models.URLField(max_length=1000, blank=True)
+    medium_url = models.URLField(max_length=1000, blank=True)
+    # SHA-256 загруженных байт: одинаковые загрузки в рамках компании
+    # ссылаются на один объект в storage (ref count = число File с этим file_url)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
     original_name = models.CharField(max_length=255, blank=True)
     content_type = models.CharField(max_length=100, blank=True)
+    # size_bytes — хранимый объект; original_size_bytes — как загрузили
+    # (до перекодирования по политике компании, null — не перекодировали)
     size_bytes = models.PositiveIntegerField(null=True, blank=True)
+    original_size_bytes = models.PositiveIntegerField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -495,8 +579,29 @@ class JobPhoto(models.Model):
         related_name="job_photo",
     )
 
+    # Обработка после загрузки (apps.jobs.photo_processing):
+    # pending  — сырой upload сохранён, EXIF / нормализация / превью ещё не готовы
+    # ready    — фото проверено и годится как proof
+    # rejected — не прошло проверку (формат, расстояние), см. processing_error
+    STATUS_PENDING = "pending"
+    STATUS_READY = "ready"
+    STATUS_REJECTED = "rejected"
+
+    PROCESSING_STATUSES = (
+        (STATUS_PENDING, "Pending"),
+        (STATUS_READY, "Ready"),
+        (STATUS_REJECTED, "Rejected"),
+    )
+
     photo_type = models.CharField(max_length=10, choices=PHOTO_TYPES)
 
+    processing_status = models.CharField(
+        max_length=16,
+        choices=PROCESSING_STATUSES,
+        default=STATUS_READY,
+    )
+    processing_error = models.CharField(max_length=255, blank=True)
+
     # EXIF (optional)
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
@@ -516,3 +621,166 @@ class JobPhoto(models.Model):
 
     def __str__(self) -> str:
         return f"Job {self.job_id} {self.photo_type}"
+
+    @property
+    def is_ready(self) -> bool:
+        return self.processing_status == self.STATUS_READY
+
+
+class JobMutationReceipt(models.Model):
+    """
+    Применённая операция офлайн-батча клинера (POST /api/jobs/<id>/mutations/).
+
+    Приложение повторяет батч после потери сети с теми же ключами:
+    операция с уже известным (user, idempotency_key) не применяется
+    повторно, клиент получает сохранённый результат.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="job_mutation_receipts",
+    )
+    job = models.ForeignKey(
+        Job,
+        on_delete=models.CASCADE,
+        related_name="mutation_receipts",
+    )
+
+    idempotency_key = models.CharField(max_length=64)
+    operation = models.CharField(max_length=32)
+    # время операции на устройстве — только для разбора инцидентов,
+    # на применение операции не влияет
+    device_timestamp = models.DateTimeField(null=True, blank=True)
+
+    status_code = models.PositiveSmallIntegerField()
+    result = models.JSONField(default=dict)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "job_mutation_receipts"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "idempotency_key"],
+                name="uniq_job_mutation_user_key",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"Job {self.job_id} {self.operation} {self.idempotency_key}"
+
+
+class RecurringJobSchedule(models.Model):
+    """
+    Регулярная уборка: одна и та же джоба (локация, клинер, шаблон, время)
+    по правилу повторения.
+
+    - weekly: дни недели weekdays (0 = пн … 6 = вс), каждые interval недель
+      (отсчёт от недели start_date);
+    - monthly: день месяца month_day (31 → последний день короткого
+      месяца), каждые interval месяцев от месяца start_date.
+
+    Вхождения разворачиваются виртуально (occurrences); Job создаётся
+    только на короткий горизонт или при первом обращении к вхождению
+    (apps.jobs.recurring.materialize_occurrences).
+    """
+
+    FREQUENCY_WEEKLY = "weekly"
+    FREQUENCY_MONTHLY = "monthly"
+
+    FREQUENCY_CHOICES = [
+        (FREQUENCY_WEEKLY, "Weekly"),
+        (FREQUENCY_MONTHLY, "Monthly"),
+    ]
+
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name="recurring_job_schedules",
+    )
+    location = models.ForeignKey(
+        Location,
+        on_delete=models.CASCADE,
+        related_name="recurring_job_schedules",
+    )
+    cleaner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="recurring_job_schedules",
+    )
+    checklist_template = models.ForeignKey(
+        ChecklistTemplate,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="recurring_job_schedules",
+    )
+
+    scheduled_start_time = models.TimeField(null=True, blank=True)
+    scheduled_end_time = models.TimeField(null=True, blank=True)
+    manager_notes = models.TextField(blank=True)
+
+    frequency = models.CharField(
+        max_length=16,
+        choices=FREQUENCY_CHOICES,
+        default=FREQUENCY_WEEKLY,
+    )
+    interval = models.PositiveSmallIntegerField(default=1)
+    weekdays = models.JSONField(default=list, blank=True)
+    month_day = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+
+    is_active = models.BooleanField(default=True)
+
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="created_recurring_job_schedules",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "recurring_job_schedules"
+        ordering = ["id"]
+
+    def __str__(self) -> str:
+        return f"Schedule {self.id} {self.frequency} @ {self.location_id}"
+
+    def occurrences(self, date_from: date, date_to: date) -> list[date]:
+        """Даты вхождений в [date_from, date_to] (в памяти, без запросов)."""
+        start = max(date_from, self.start_date)
+        end = min(date_to, self.end_date) if self.end_date else date_to
+        if start > end:
+            return []
+
+        interval = max(1, self.interval or 1)
+        dates = []
+
+        if self.frequency == self.FREQUENCY_MONTHLY:
+            month_day = self.month_day or self.start_date.day
+            year, month = start.year, start.month
+            while (year, month) <= (end.year, end.month):
+                months = (year - self.start_date.year) * 12 + month - self.start_date.month
+                if months % interval == 0:
+                    day = date(year, month, min(month_day, calendar.monthrange(year, month)[1]))
+                    if start <= day <= end:
+                        dates.append(day)
+                month += 1
+                if month > 12:
+                    year, month = year + 1, 1
+            return dates
+
+        weekdays = set(self.weekdays or [self.start_date.weekday()])
+        anchor = self.start_date - timedelta(days=self.start_date.weekday())
+        day = start
+        while day <= end:
+            if day.weekday() in weekdays and ((day - anchor).days // 7) % interval == 0:
+                dates.append(day)
+            day += timedelta(days=1)
+        return dates
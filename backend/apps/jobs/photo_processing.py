@@ -0,0 +1,303 @@
+# backend/apps/jobs/photo_processing.py
+"""
+Обработка фото job-а вне HTTP-запроса.
+
+Upload сохраняет сырые байты и JobPhoto(processing_status="pending"),
+после коммита dispatch_photo_processing() отдаёт фото в локальный пул
+потоков, который:
+  1) читает EXIF (координаты / время съёмки),
+  2) проверяет расстояние до Location,
+  3) перекодирует в JPEG по политике компании (HEIC -> JPEG, ограничение
+     длинной стороны, качество, без лишних метаданных),
+  4) генерирует превью,
+  5) переводит фото в "ready" (или "rejected" с processing_error).
+
+settings.PHOTO_PROCESSING_WORKERS = 0 — обработка синхронно в
+on_commit-callback (тесты, отладка).
+
+Пул живёт в процессе веб-воркера: рестарт / деплой теряет очередь, фото
+остаются "pending". manage.py reprocess_pending_photos (cron) обрабатывает
+фото, ждущие дольше STALE_PENDING_AFTER.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO
+from typing import Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import close_old_connections, connection
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .exif_reader import JPEG_SOI, read_exif_header
+from .image_utils import encode_jpeg_with_policy
+from .models import File, Job, JobPhoto
+from .photo_storage import (
+    delete_photo_objects,
+    generate_photo_derivatives,
+    rekeyed_photo_key,
+    storage_path_from_url,
+)
+from .utils import distance_m, extract_exif_data
+
+logger = logging.getLogger(__name__)
+
+# Максимальное расстояние от точки съёмки до Location
+PHOTO_MAX_DISTANCE_M = 100
+
+# pending дольше этого — задача, скорее всего, потеряна вместе с процессом
+STALE_PENDING_AFTER = timedelta(minutes=15)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_worker_count() -> int:
+    return int(getattr(settings, "PHOTO_PROCESSING_WORKERS", 2))
+
+
+def get_ingest_policy(company) -> dict:
+    """
+    Политика хранения фото компании -> kwargs для encode_jpeg_with_policy.
+    """
+    return {
+        "max_long_edge": company.photo_max_long_edge or 0,
+        "quality": company.photo_jpeg_quality,
+        "strip_metadata": company.photo_strip_metadata,
+    }
+
+
+def photo_distance_violation(location, latitude, longitude) -> Optional[float]:
+    """
+    Расстояние (м), если фото снято дальше PHOTO_MAX_DISTANCE_M от Location;
+    None — проверка пройдена или координат нет.
+    """
+    if latitude is None or longitude is None or location is None:
+        return None
+    if location.latitude is None or location.longitude is None:
+        return None
+
+    dist = distance_m(latitude, longitude, location.latitude, location.longitude)
+    return dist if dist > PHOTO_MAX_DISTANCE_M else None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, get_worker_count()),
+                thread_name_prefix="photo-processing",
+            )
+        return _executor
+
+
+def dispatch_photo_processing(photo_id: int) -> None:
+    """
+    Вызывать через transaction.on_commit — воркер должен видеть строку.
+    """
+    if get_worker_count() <= 0:
+        process_job_photo_safely(photo_id)
+        return
+
+    _get_executor().submit(_process_in_worker, photo_id)
+
+
+def _process_in_worker(photo_id: int) -> None:
+    close_old_connections()
+    try:
+        process_job_photo_safely(photo_id)
+    finally:
+        # у каждого потока пула своё соединение с БД
+        connection.close()
+
+
+def process_job_photo_safely(photo_id: int) -> None:
+    """
+    process_job_photo; ошибка переводит фото в "rejected", а не оставляет
+    его pending.
+    """
+    try:
+        process_job_photo(photo_id)
+    except Exception:
+        logger.exception("Photo processing failed for JobPhoto(id=%s)", photo_id)
+        _reject(photo_id, "Photo processing failed.")
+
+
+def stale_pending_photos(older_than: timedelta = STALE_PENDING_AFTER):
+    """pending-фото, загруженные раньше now - older_than."""
+    return JobPhoto.objects.filter(
+        processing_status=JobPhoto.STATUS_PENDING,
+        created_at__lt=timezone.now() - older_than,
+    )
+
+
+def _reject(photo_id: int, error: str) -> None:
+    updated = JobPhoto.objects.filter(
+        pk=photo_id,
+        processing_status=JobPhoto.STATUS_PENDING,
+    ).update(
+        processing_status=JobPhoto.STATUS_REJECTED,
+        processing_error=error[:255],
+    )
+    if updated:
+        Job.touch(JobPhoto.objects.filter(pk=photo_id).values_list("job_id", flat=True).first())
+
+
+def _keep_original(raw: bytes, encoded: Optional[bytes], policy: dict) -> bool:
+    """
+    JPEG, который перекодирование не уменьшило, храним как есть (без лишнего
+    поколения потерь) — если только не нужно вырезать из него EXIF.
+    """
+    if encoded is None:
+        return True
+    if not raw.startswith(JPEG_SOI) or len(encoded) < len(raw):
+        return False
+    if not policy["strip_metadata"]:
+        return True
+    try:
+        return not read_exif_header(BytesIO(raw))
+    except Exception:
+        return False
+
+
+def process_job_photo(photo_id: int, storage=None) -> Optional[str]:
+    """
+    Обрабатывает pending-фото. Возвращает итоговый processing_status
+    (None — фото уже нет или оно не pending).
+    """
+    storage = storage or default_storage
+
+    photo = (
+        JobPhoto.objects.select_related("file", "job__location", "job__company")
+        .filter(pk=photo_id)
+        .first()
+    )
+    if photo is None or photo.processing_status != JobPhoto.STATUS_PENDING:
+        return None
+
+    file_obj = photo.file
+    raw_key = storage_path_from_url(file_obj.file_url)
+    if not raw_key:
+        raise ValueError(f"Cannot resolve storage key for File(id={file_obj.id})")
+
+    with storage.open(raw_key, "rb") as f:
+        raw = f.read()
+
+    upload = SimpleUploadedFile(
+        file_obj.original_name or os.path.basename(raw_key),
+        raw,
+        content_type=file_obj.content_type or "",
+    )
+
+    # 1-2) EXIF + расстояние
+    exif_lat, exif_lon, exif_dt, _exif_missing = extract_exif_data(upload)
+
+    dist = photo_distance_violation(photo.job.location, exif_lat, exif_lon)
+    if dist is not None:
+        _reject(photo.id, f"Photo too far from job location ({round(dist, 2)} m).")
+        return JobPhoto.STATUS_REJECTED
+
+    # 3) JPEG по политике компании
+    policy = get_ingest_policy(photo.job.company)
+    try:
+        encoded = encode_jpeg_with_policy(BytesIO(raw), **policy)
+    except Exception as exc:
+        if raw_key.endswith(".heic"):
+            _reject(photo.id, f"Unsupported image format: {exc}")
+            return JobPhoto.STATUS_REJECTED
+        # не смогли декодировать — храним как загрузили (как и раньше)
+        logger.warning("Cannot re-encode JobPhoto(id=%s): %s", photo.id, exc)
+        encoded = None
+
+    file_updates = {"original_size_bytes": len(raw)}
+    if _keep_original(raw, encoded, policy):
+        file_updates["size_bytes"] = len(raw)
+    else:
+        saved_path = storage.save(rekeyed_photo_key(raw_key), ContentFile(encoded))
+        file_updates.update({
+            "file_url": storage.url(saved_path),
+            "content_type": "image/jpeg",
+            "size_bytes": len(encoded),
+        })
+
+    if not File.objects.filter(pk=file_obj.pk).update(**file_updates):
+        # фото удалили, пока шла обработка
+        if "file_url" in file_updates:
+            delete_photo_objects(File(file_url=file_updates["file_url"]), storage=storage)
+        return None
+
+    if "file_url" in file_updates:
+        try:
+            storage.delete(raw_key)
+        except Exception:
+            logger.warning("Failed to delete raw upload %s", raw_key)
+    for field, value in file_updates.items():
+        setattr(file_obj, field, value)
+
+    # 4) превью — best effort, без них фото всё равно годится
+    try:
+        generate_photo_derivatives(file_obj, storage=storage)
+    except Exception:
+        logger.exception("Failed to generate derivatives for File(id=%s)", file_obj.id)
+
+    # 5) ready — только если фото всё ещё pending (не удалено / не обработано другим воркером)
+    if JobPhoto.objects.filter(
+        pk=photo.id,
+        processing_status=JobPhoto.STATUS_PENDING,
+    ).update(
+        processing_status=JobPhoto.STATUS_READY,
+        processing_error="",
+        latitude=exif_lat,
+        longitude=exif_lon,
+        photo_timestamp=exif_dt,
+    ):
+        Job.touch(photo.job_id)
+    return JobPhoto.STATUS_READY
+
+
+def recompress_stored_photo(file_obj: File, policy: dict, storage=None) -> Optional[tuple[int, int]]:
+    """
+    Перекодирует уже сохранённое фото по политике (для исторических данных).
+    Все File, разделяющие объект (dedup), переключаются на новый ключ.
+
+    Возвращает (байт до, байт после) или None, если перекодирование
+    не уменьшило файл (объект остаётся как есть).
+    """
+    storage = storage or default_storage
+
+    key = storage_path_from_url(file_obj.file_url)
+    if not key:
+        raise ValueError(f"Cannot resolve storage key for File(id={file_obj.id})")
+
+    with storage.open(key, "rb") as f:
+        raw = f.read()
+
+    encoded = encode_jpeg_with_policy(BytesIO(raw), **policy)
+    shared = File.objects.filter(file_url=file_obj.file_url)
+
+    if len(encoded) >= len(raw):
+        shared.filter(original_size_bytes__isnull=True).update(original_size_bytes=len(raw))
+        return None
+
+    saved_path = storage.save(rekeyed_photo_key(key), ContentFile(encoded))
+    shared.update(
+        file_url=storage.url(saved_path),
+        content_type="image/jpeg",
+        size_bytes=len(encoded),
+        original_size_bytes=Coalesce(F("original_size_bytes"), len(raw)),
+    )
+
+    try:
+        storage.delete(key)
+    except Exception:
+        logger.warning("Failed to delete replaced photo %s", key)
+
+    return len(raw), len(encoded)
@@ -0,0 +1,209 @@
+# backend/apps/jobs/photo_storage.py
+"""
+Хранение фото job-ов в default_storage.
+
+Схема ключей:
+    company/<company_id>/jobs/<job_id>/photos/<photo_type>/<uuid>.jpg
+Derivatives лежат рядом с оригиналом:
+    .../<uuid>_thumb.jpg, .../<uuid>_medium.jpg
+"""
+import hashlib
+import logging
+import os
+import uuid
+from typing import Optional
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .image_utils import build_jpeg_derivatives
+from .models import File, JobPhoto
+
+logger = logging.getLogger(__name__)
+
+# name -> максимальная длинная сторона (px)
+PHOTO_DERIVATIVES = {
+    "thumb": 320,
+    "medium": 1280,
+}
+PHOTO_DERIVATIVE_QUALITY = 80
+
+# Префиксы ключей, под которыми приложение пишет в default_storage
+# (фото job-ов и логотипы компаний)
+MEDIA_KEY_PREFIXES = ("company/", "company_logos/")
+
+
+def photo_storage_key(company_id: int, job_id: int, photo_type: str, ext: str = ".jpg") -> str:
+    return (
+        f"company/{company_id}/jobs/{job_id}/photos/"
+        f"{photo_type}/{uuid.uuid4().hex}{ext}"
+    )
+
+
+def rekeyed_photo_key(original_key: str) -> str:
+    """
+    Новый ключ рядом с оригиналом (объекты неизменяемы: перекодированный
+    файл всегда пишется под новым uuid).
+    """
+    return f"{os.path.dirname(original_key)}/{uuid.uuid4().hex}.jpg"
+
+
+def derivative_storage_key(original_key: str, name: str) -> str:
+    base, _ = os.path.splitext(original_key)
+    return f"{base}_{name}.jpg"
+
+
+def storage_path_from_url(file_url: str) -> Optional[str]:
+    """
+    file_url (как вернул default_storage.url) -> ключ в storage.
+    Поддерживает относительные (/media/...) и абсолютные URL.
+    """
+    if not file_url:
+        return None
+
+    media_url = getattr(settings, "MEDIA_URL", "/media/") or "/media/"
+    path = urlparse(file_url).path if "://" in file_url else file_url
+
+    media_path = urlparse(media_url).path if "://" in media_url else media_url
+    if media_path and path.startswith(media_path):
+        return path[len(media_path):].lstrip("/") or None
+
+    # S3/CDN: ключ начинается с company/ (или company_logos/) где-то в пути
+    for prefix in MEDIA_KEY_PREFIXES:
+        marker = path.find(f"/{prefix}")
+        if marker != -1:
+            return path[marker + 1:]
+
+    return None
+
+
+def compute_content_hash(uploaded_file) -> str:
+    """
+    SHA-256 загруженного файла, читаем чанками (TemporaryUploadedFile не
+    поднимается в память целиком).
+    """
+    digest = hashlib.sha256()
+
+    try:
+        uploaded_file.seek(0)
+    except Exception:
+        pass
+
+    if hasattr(uploaded_file, "chunks"):
+        for chunk in uploaded_file.chunks():
+            digest.update(chunk)
+    else:
+        digest.update(uploaded_file.read())
+
+    try:
+        uploaded_file.seek(0)
+    except Exception:
+        pass
+
+    return digest.hexdigest()
+
+
+def find_photo_by_content_hash(company_id: int, content_hash: str) -> Optional[JobPhoto]:
+    """
+    Обработанное (ready) фото компании с теми же байтами
+    (dedup только внутри компании).
+    """
+    if not content_hash:
+        return None
+
+    return (
+        JobPhoto.objects.filter(
+            job__company_id=company_id,
+            file__content_hash=content_hash,
+            processing_status=JobPhoto.STATUS_READY,
+        )
+        .select_related("file")
+        .order_by("id")
+        .first()
+    )
+
+
+def file_reference_count(file_url: str) -> int:
+    return File.objects.filter(file_url=file_url).count()
+
+
+def release_photo_objects(file_obj: File, storage=None) -> bool:
+    """
+    Вызывать после удаления File-строки: удаляет объекты из storage,
+    только если на file_url больше никто не ссылается.
+    Возвращает True, если объекты удалены.
+    """
+    if file_obj.file_url and file_reference_count(file_obj.file_url) > 0:
+        return False
+
+    delete_photo_objects(file_obj, storage=storage)
+    return True
+
+
+def generate_photo_derivatives(file_obj: File, storage=None) -> dict[str, str]:
+    """
+    Генерирует thumb/medium для File и сохраняет URL-ы в модели.
+    Возвращает {name: url}.
+    """
+    storage = storage or default_storage
+
+    original_key = storage_path_from_url(file_obj.file_url)
+    if not original_key:
+        raise ValueError(f"Cannot resolve storage key for File(id={file_obj.id})")
+
+    with storage.open(original_key, "rb") as src:
+        derivatives = build_jpeg_derivatives(
+            src,
+            PHOTO_DERIVATIVES,
+            quality=PHOTO_DERIVATIVE_QUALITY,
+        )
+
+    urls = {}
+    for name, data in derivatives.items():
+        key = derivative_storage_key(original_key, name)
+        if storage.exists(key):
+            storage.delete(key)
+        saved_path = storage.save(key, ContentFile(data))
+        urls[name] = storage.url(saved_path)
+
+    # все File, разделяющие объект (dedup), получают те же превью
+    File.objects.filter(file_url=file_obj.file_url).update(
+        thumb_url=urls.get("thumb", ""),
+        medium_url=urls.get("medium", ""),
+    )
+    file_obj.thumb_url = urls.get("thumb", "")
+    file_obj.medium_url = urls.get("medium", "")
+    return urls
+
+
+def generate_photo_derivatives_for_file_id(file_id: int) -> None:
+    """
+    Точка входа для transaction.on_commit: ошибки логируем, но не пробрасываем —
+    upload уже закоммичен, отсутствие превью не должно ломать ответ.
+    """
+    file_obj = File.objects.filter(pk=file_id).first()
+    if file_obj is None:
+        return
+
+    try:
+        generate_photo_derivatives(file_obj)
+    except Exception:
+        logger.exception("Failed to generate derivatives for File(id=%s)", file_id)
+
+
+def delete_photo_objects(file_obj: File, storage=None) -> None:
+    """
+    Удаляет из storage оригинал и derivatives файла (best effort).
+    """
+    storage = storage or default_storage
+
+    for url in (file_obj.file_url, file_obj.thumb_url, file_obj.medium_url):
+        key = storage_path_from_url(url)
+        if not key:
+            continue
+        try:
+            storage.delete(key)
+        except Exception:
+            logger.warning("Failed to delete storage object %s", key)
@@ -0,0 +1,115 @@
+"""
+Регулярные уборки (RecurringJobSchedule): виртуальные вхождения и
+ленивая материализация.
+
+Планирование показывает вхождения, развёрнутые из правила в памяти
+(expand_occurrences); строка Job появляется только на короткий горизонт
+(manage.py materialize_recurring_jobs) или при первом обращении к
+вхождению (materialize_occurrences из API). Так jobs не заполняется
+месяцами спекулятивных строк.
+
+Вхождение = (schedule, scheduled_date); unique у Job не даёт создать его
+дважды, параллельную материализацию сериализует блокировка строк
+расписаний.
+"""
+
+from collections import defaultdict
+from datetime import time
+
+from django.db import transaction
+
+from apps.accounts.usage import adjust_usage
+from apps.jobs.models import Job, RecurringJobSchedule
+
+
+def materialized_dates(schedule_ids, date_from, date_to) -> dict:
+    """{schedule_id: {scheduled_date: job_id}} уже созданных вхождений."""
+    materialized = defaultdict(dict)
+    if not schedule_ids:
+        return materialized
+
+    rows = Job.objects.filter(
+        recurring_schedule_id__in=schedule_ids,
+        scheduled_date__gte=date_from,
+        scheduled_date__lte=date_to,
+    ).values_list("recurring_schedule_id", "scheduled_date", "id")
+    for schedule_id, scheduled_date, job_id in rows:
+        materialized[schedule_id][scheduled_date] = job_id
+    return materialized
+
+
+def expand_occurrences(schedules, date_from, date_to) -> list:
+    """
+    Виртуальные вхождения [(schedule, date)] без Job, по дате.
+    Один запрос на все расписания (проверка уже материализованных).
+    """
+    schedules = list(schedules)
+    materialized = materialized_dates([s.id for s in schedules], date_from, date_to)
+
+    occurrences = [
+        (schedule, day)
+        for schedule in schedules
+        for day in schedule.occurrences(date_from, date_to)
+        if day not in materialized[schedule.id]
+    ]
+    occurrences.sort(key=lambda pair: (pair[1], pair[0].scheduled_start_time or time.min, pair[0].id))
+    return occurrences
+
+
+def build_occurrence_job(schedule: RecurringJobSchedule, day) -> Job:
+    return Job(
+        company_id=schedule.company_id,
+        location_id=schedule.location_id,
+        cleaner_id=schedule.cleaner_id,
+        scheduled_date=day,
+        scheduled_start_time=schedule.scheduled_start_time,
+        scheduled_end_time=schedule.scheduled_end_time,
+        status=Job.STATUS_SCHEDULED,
+        context=Job.CONTEXT_CLEANING,
+        manager_notes=schedule.manager_notes,
+        checklist_template_id=schedule.checklist_template_id,
+        # bulk_create не вызывает save() — snapshot делаем сами
+        checklist_snapshot_taken=bool(schedule.checklist_template_id),
+        recurring_schedule_id=schedule.id,
+    )
+
+
+def materialize_occurrences(schedules, date_from, date_to, limit=None) -> list:
+    """
+    Создаёт Job для всех ещё не материализованных вхождений расписаний в
+    [date_from, date_to]: блокировка расписаний, один INSERT джоб, один
+    snapshot чек-листов, один сдвиг счётчика usage на компанию.
+    limit — не больше стольких джоб, ранние вхождения первыми (остаток
+    trial-квоты компании). Возвращает созданные джобы.
+    """
+    schedules = list(schedules)
+    if not schedules:
+        return []
+
+    with transaction.atomic():
+        # параллельные материализации тех же расписаний ждут здесь
+        list(
+            RecurringJobSchedule.objects.select_for_update()
+            .filter(pk__in=[s.id for s in schedules])
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+        occurrences = expand_occurrences(schedules, date_from, date_to)
+        if limit is not None:
+            occurrences = occurrences[:limit]
+        jobs = [build_occurrence_job(schedule, day) for schedule, day in occurrences]
+        if not jobs:
+            return []
+
+        created = Job.objects.bulk_create(jobs, batch_size=500)
+
+        # bulk_create не шлёт post_save — счётчик двигаем сами
+        per_company = defaultdict(int)
+        for job in created:
+            per_company[job.company_id] += 1
+        for company_id, count in per_company.items():
+            adjust_usage(company_id, jobs_count=count)
+
+        Job.snapshot_checklists({job.id: job.checklist_template_id for job in created})
+    return created
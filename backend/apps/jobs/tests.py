@@ -173,6 +173,33 @@ class JobsChecklistTests(TestCase):
         self.items = list(JobChecklistItem.objects.filter(job=self.job).order_by("order", "id"))
         self.assertTrue(len(self.items) >= 2)
 
+    def test_checklist_snapshot_is_taken_once(self):
+        self.assertTrue(self.job.checklist_snapshot_taken)
+
+        # полный save() уже не смотрит в чеклист: один UPDATE, без дублей пунктов
+        with self.assertNumQueries(1):
+            self.job.save()
+        self.assertEqual(JobChecklistItem.objects.filter(job=self.job).count(), len(self.items))
+
+    def test_status_transitions_issue_single_update(self):
+        from apps.jobs.models import File, JobPhoto
+
+        with self.assertNumQueries(1):
+            self.job.check_in()
+
+        JobChecklistItem.objects.filter(job=self.job).update(is_completed=True)
+        for photo_type in (JobPhoto.TYPE_BEFORE, JobPhoto.TYPE_AFTER):
+            JobPhoto.objects.create(
+                job=self.job,
+                file=File.objects.create(file_url=f"/media/{photo_type}.jpg"),
+                photo_type=photo_type,
+            )
+
+        # блокеры (фото + чеклист) одним запросом и один UPDATE
+        with self.assertNumQueries(2):
+            self.job.check_out()
+        self.assertEqual(self.job.status, Job.STATUS_COMPLETED)
+
     def test_checklist_cannot_be_updated_by_other_cleaner(self):
         # переводим job в in_progress, чтобы упереться именно в Forbidden
         self.job.check_in()
@@ -228,6 +255,40 @@ class JobsChecklistTests(TestCase):
         self.assertTrue(self.items[0].is_completed)
         self.assertTrue(self.items[1].is_completed)
 
+    def test_checklist_api_updates_are_conditional_updates_with_summary(self):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(user=self.cleaner_1)
+        toggle_url = f"/api/jobs/{self.job.id}/checklist/{self.items[0].id}/toggle/"
+        bulk_url = f"/api/jobs/{self.job.id}/checklist/bulk-update/"
+
+        # джоба ещё не in_progress — UPDATE не затронул строк
+        self.assertEqual(client.post(toggle_url, {"is_completed": True}, format="json").status_code, 400)
+
+        Job.objects.filter(pk=self.job.pk).update(status=Job.STATUS_IN_PROGRESS)
+        # условный UPDATE пункта, touch джобы, сводка — без SELECT ... FOR UPDATE
+        with self.assertNumQueries(3):
+            resp = client.post(toggle_url, {"is_completed": True}, format="json")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            resp.data["summary"],
+            {"total_count": 2, "completed_count": 1, "required_remaining": 1, "checklist_completed": False},
+        )
+
+        # неизвестный пункт — весь bulk откатывается
+        missing = {"items": [{"id": self.items[1].id, "is_completed": True}, {"id": 999999}]}
+        self.assertEqual(client.post(bulk_url, missing, format="json").status_code, 400)
+        self.items[1].refresh_from_db()
+        self.assertFalse(self.items[1].is_completed)
+
+        both = {"items": [{"id": self.items[0].id, "is_completed": False}, {"id": self.items[1].id}]}
+        resp = client.post(bulk_url, both, format="json")
+        self.assertEqual(resp.data["updated_count"], 2)
+        self.assertEqual(resp.data["summary"]["completed_count"], 1)
+        self.items[0].refresh_from_db()
+        self.assertFalse(self.items[0].is_completed)
+
     def test_check_out_fails_if_required_items_not_completed(self):
         # В in_progress
         self.job.check_in()
@@ -244,3 +305,325 @@ class JobsChecklistTests(TestCase):
         self.assertEqual(resp.status_code, 400)
         payload = json.loads(resp.content.decode("utf-8"))
         self.assertFalse(payload["ok"])
+
+
+# =============================================================================
+# HEIC -> JPEG normalization (in-process, pillow_heif)
+# =============================================================================
+
+def _make_heic(size=(64, 32), mode="RGB", orientation=None, with_gps=False) -> bytes:
+    """
+    Генерирует HEIC-сэмпл для тестового корпуса.
+    iPhone-подобные варианты: ориентация в EXIF, GPS IFD, альфа-канал.
+    """
+    from io import BytesIO
+    from PIL import Image
+
+    img = Image.new(mode, size, (200, 10, 10, 255)[: len(mode)])
+    exif = Image.Exif()
+    exif[0x0132] = "2026:01:15 09:30:00"  # DateTime
+    if orientation is not None:
+        exif[0x0112] = orientation
+    if with_gps:
+        gps = exif.get_ifd(0x8825)
+        gps[1] = "N"
+        gps[2] = (25.0, 12.0, 17.28)
+        gps[3] = "E"
+        gps[4] = (55.0, 16.0, 14.88)
+
+    buffer = BytesIO()
+    img.save(buffer, format="HEIF", exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+HEIC_CORPUS = {
+    "landscape.heic": dict(size=(64, 32)),
+    "portrait_rotated.heic": dict(size=(64, 32), orientation=6),
+    "with_gps.HEIC": dict(size=(48, 48), with_gps=True),
+    "alpha.heif": dict(size=(32, 32), mode="RGBA"),
+}
+
+
+class HeicNormalizationTests(TestCase):
+    def _open(self, uploaded):
+        from PIL import Image
+
+        uploaded.seek(0)
+        return Image.open(uploaded)
+
+    def test_corpus_converts_to_jpeg_in_process(self):
+        from unittest.mock import patch
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from apps.jobs.image_utils import normalize_job_photo_to_jpeg
+
+        for name, params in HEIC_CORPUS.items():
+            with self.subTest(sample=name), patch("subprocess.run") as run:
+                upload = SimpleUploadedFile(name, _make_heic(**params), content_type="image/heic")
+                converted = normalize_job_photo_to_jpeg(upload)
+
+                run.assert_not_called()
+                self.assertEqual(converted.content_type, "image/jpeg")
+                self.assertTrue(converted.name.endswith(".jpg"))
+
+                img = self._open(converted)
+                self.assertEqual(img.format, "JPEG")
+                self.assertEqual(img.mode, "RGB")
+
+                converted.seek(0)
+                self.assertEqual(converted.size, len(converted.read()))
+
+    def test_orientation_applied_and_exif_preserved(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from apps.jobs.image_utils import normalize_job_photo_to_jpeg
+        from apps.jobs.utils import extract_exif_data
+
+        upload = SimpleUploadedFile(
+            "IMG_0001.HEIC",
+            _make_heic(size=(64, 32), orientation=6, with_gps=True),
+            content_type="image/heic",
+        )
+        converted = normalize_job_photo_to_jpeg(upload)
+
+        img = self._open(converted)
+        # Поворот применён к пикселям, EXIF Orientation сброшен — без двойного поворота
+        self.assertEqual(img.size, (32, 64))
+        self.assertIn(img.getexif().get(0x0112), (None, 1))
+
+        converted.seek(0)
+        lat, lon, dt, exif_missing = extract_exif_data(converted)
+        self.assertFalse(exif_missing)
+        self.assertAlmostEqual(lat, 25.2048, places=4)
+        self.assertAlmostEqual(lon, 55.2708, places=4)
+        self.assertEqual(dt.strftime("%Y-%m-%d %H:%M:%S"), "2026-01-15 09:30:00")
+
+    def test_spooled_upload_is_decoded_from_disk(self):
+        from django.core.files.uploadedfile import TemporaryUploadedFile
+        from apps.jobs.image_utils import normalize_job_photo_to_jpeg
+
+        raw = _make_heic(size=(40, 30))
+        upload = TemporaryUploadedFile("big.heic", "image/heic", len(raw), None)
+        try:
+            upload.write(raw)
+            upload.seek(0)
+            converted = normalize_job_photo_to_jpeg(upload)
+            self.assertEqual(self._open(converted).size, (40, 30))
+        finally:
+            upload.close()
+
+    def test_non_heic_returned_as_is(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from apps.jobs.image_utils import normalize_job_photo_to_jpeg
+
+        upload = SimpleUploadedFile("photo.jpg", b"\xff\xd8\xff", content_type="image/jpeg")
+        self.assertIs(normalize_job_photo_to_jpeg(upload), upload)
+
+
+# =============================================================================
+# Header-only EXIF reader
+# =============================================================================
+
+class _CountingReader:
+    """File-like обёртка: считает, сколько байт реально прочитано."""
+
+    def __init__(self, data: bytes):
+        from io import BytesIO
+
+        self._buf = BytesIO(data)
+        self.bytes_read = 0
+
+    def read(self, n=-1):
+        chunk = self._buf.read(n)
+        self.bytes_read += len(chunk)
+        return chunk
+
+    def seek(self, *args):
+        return self._buf.seek(*args)
+
+    def tell(self):
+        return self._buf.tell()
+
+
+def _make_photo(fmt: str, size=(64, 32), endian="<", with_gps=True) -> bytes:
+    from io import BytesIO
+    from PIL import Image
+
+    img = Image.effect_noise(size, 50).convert("RGB")
+    exif = Image.Exif()
+    exif.endian = endian
+    exif[0x0132] = "2026:01:15 09:30:00"  # DateTime
+    exif.get_ifd(0x8769)[0x9003] = "2026:01:14 08:00:01"  # DateTimeOriginal
+    if with_gps:
+        gps = exif.get_ifd(0x8825)
+        gps[1] = "S"
+        gps[2] = (25.0, 12.0, 17.28)
+        gps[3] = "W"
+        gps[4] = (55.0, 16.0, 14.88)
+
+    buffer = BytesIO()
+    img.save(buffer, format=fmt, exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+class ExifHeaderReaderTests(TestCase):
+    def test_matches_pillow_for_jpeg(self):
+        from io import BytesIO
+        from apps.jobs.utils import _extract_exif_data_pillow, extract_exif_data
+
+        for endian in ("<", ">"):
+            with self.subTest(endian=endian):
+                raw = _make_photo("JPEG", endian=endian)
+                self.assertEqual(
+                    extract_exif_data(BytesIO(raw)),
+                    _extract_exif_data_pillow(BytesIO(raw)),
+                )
+
+    def test_reads_heic_gps_and_datetime_original(self):
+        from io import BytesIO
+        import apps.jobs.image_utils  # noqa: F401  (HEIF encoder)
+        from apps.jobs.utils import extract_exif_data
+
+        lat, lon, dt, exif_missing = extract_exif_data(BytesIO(_make_photo("HEIF")))
+
+        self.assertFalse(exif_missing)
+        self.assertAlmostEqual(lat, -25.2048, places=4)
+        self.assertAlmostEqual(lon, -55.2708, places=4)
+        self.assertEqual(dt.strftime("%Y-%m-%d %H:%M:%S"), "2026-01-14 08:00:01")
+
+    def test_reads_only_header_bytes(self):
+        from apps.jobs.exif_reader import read_exif_header
+
+        raw = _make_photo("JPEG", size=(1600, 1200))
+        reader = _CountingReader(raw)
+        tags = read_exif_header(reader)
+
+        self.assertEqual(tags["GPSLatitudeRef"], "S")
+        self.assertLess(reader.bytes_read, 4096)
+        self.assertGreater(len(raw), 100_000)
+
+    def test_missing_or_broken_exif(self):
+        from io import BytesIO
+        from apps.jobs.utils import extract_exif_data
+
+        missing = (None, None, None, True)
+        self.assertEqual(extract_exif_data(BytesIO(_make_photo("JPEG")[:40])), missing)
+        self.assertEqual(extract_exif_data(BytesIO(b"\xff\xd8\xff\xd9")), missing)
+
+        lat, lon, dt, exif_missing = extract_exif_data(
+            BytesIO(_make_photo("JPEG", with_gps=False))
+        )
+        self.assertEqual((lat, lon, exif_missing), (None, None, False))
+        self.assertIsNotNone(dt)
+
+
+class MediaGarbageCollectorTests(TestCase):
+    def setUp(self):
+        import tempfile
+
+        self.media_root = tempfile.mkdtemp()
+        self.override = self.settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+
+        self.company = Company.objects.create(name="GC Co")
+        cleaner = User.objects.create_user(
+            email="gc-cleaner@test.com",
+            phone="+15550009999",
+            password="pass12345",
+            role=User.ROLE_CLEANER,
+            company=self.company,
+        )
+        self.location = Location.objects.create(company=self.company, name="Loc", address="A")
+        self.job = Job.objects.create(
+            company=self.company,
+            location=self.location,
+            cleaner=cleaner,
+            scheduled_date=date(2026, 1, 15),
+        )
+
+    def tearDown(self):
+        import shutil
+
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _put(self, key: str) -> str:
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+
+        return default_storage.save(key, ContentFile(b"x" * 10))
+
+    def test_gc_media_removes_only_unreferenced_objects(self):
+        from io import StringIO
+        from django.core.files.storage import default_storage
+        from django.core.management import call_command
+        from apps.jobs.media_gc import iter_orphan_keys, quarantine_key
+        from apps.jobs.models import File, JobPhoto
+
+        prefix = f"company/{self.company.id}/jobs/{self.job.id}/photos/before"
+        live = self._put(f"{prefix}/live.jpg")
+        live_thumb = self._put(f"{prefix}/live_thumb.jpg")
+        db_file = File.objects.create(
+            file_url=default_storage.url(live),
+            thumb_url=default_storage.url(live_thumb),
+        )
+        JobPhoto.objects.create(job=self.job, file=db_file, photo_type=JobPhoto.TYPE_BEFORE)
+
+        # File без JobPhoto (job удалили каскадом) и объект без File вообще
+        dead = self._put(f"company/{self.company.id}/jobs/999/photos/after/dead.jpg")
+        File.objects.create(file_url=default_storage.url(dead))
+        stray = self._put(f"company/{self.company.id}/jobs/{self.job.id}/photos/after/stray.jpg")
+
+        logo = self._put(f"company_logos/{self.company.id}/logo.png")
+        old_logo = self._put(f"company_logos/{self.company.id}/old.png")
+        self.company.logo_url = default_storage.url(logo)
+        self.company.save(update_fields=["logo_url"])
+
+        self.assertEqual(sorted(iter_orphan_keys()), sorted([dead, old_logo, stray]))
+
+        out = StringIO()
+        call_command("gc_media", "--dry-run", "--min-age-hours", "0", stdout=out)
+        self.assertIn("Orphans: 3", out.getvalue())
+        self.assertTrue(default_storage.exists(stray))
+
+        call_command("gc_media", "--quarantine", "--min-age-hours", "0", stdout=StringIO())
+
+        for key in (live, live_thumb, logo):
+            self.assertTrue(default_storage.exists(key))
+        for key in (dead, stray, old_logo):
+            self.assertFalse(default_storage.exists(key))
+        self.assertFalse(File.objects.filter(job_photo__isnull=True).exists())
+        self.assertTrue(default_storage.exists(quarantine_key(stray)))
+
+        # свежие объекты (моложе --min-age-hours) не трогаем
+        fresh = self._put(f"{prefix}/fresh.jpg")
+        call_command("gc_media", stdout=StringIO())
+        self.assertTrue(default_storage.exists(fresh))
+
+
+class RecurringJobScheduleOccurrencesTests(TestCase):
+    def test_weekly_and_monthly_rules(self):
+        from apps.jobs.models import RecurringJobSchedule
+
+        # пн/ср/пт каждые 2 недели, отсчёт от недели start_date (пн 2026-03-02)
+        weekly = RecurringJobSchedule(
+            frequency=RecurringJobSchedule.FREQUENCY_WEEKLY,
+            interval=2,
+            weekdays=[0, 2, 4],
+            start_date=date(2026, 3, 4),
+        )
+        self.assertEqual(
+            weekly.occurrences(date(2026, 3, 1), date(2026, 3, 20)),
+            [date(2026, 3, 4), date(2026, 3, 6), date(2026, 3, 16), date(2026, 3, 18), date(2026, 3, 20)],
+        )
+
+        # 31-е каждый месяц → последний день короткого месяца; end_date обрезает
+        monthly = RecurringJobSchedule(
+            frequency=RecurringJobSchedule.FREQUENCY_MONTHLY,
+            interval=1,
+            month_day=31,
+            start_date=date(2026, 1, 1),
+            end_date=date(2026, 4, 29),
+        )
+        self.assertEqual(
+            monthly.occurrences(date(2026, 1, 1), date(2026, 12, 31)),
+            [date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31)],
+        )
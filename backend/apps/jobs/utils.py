@@ -5,6 +5,8 @@ from typing import Optional, Tuple
 
 from django.utils import timezone
 
+from .exif_reader import read_exif_header
+
 
 def distance_m(lat1, lon1, lat2, lon2):
     """
@@ -42,6 +44,42 @@ def extract_exif_data(uploaded_file) -> tuple[Optional[float], Optional[float],
     MVP-логика:
       - если EXIF нет/не распарсился => (None, None, None, True)
       - если частично есть => exif_missing=False, но поля могут быть None
+
+    JPEG и HEIC читаются header-only (apps.jobs.exif_reader) — без
+    декодирования картинки. Остальные форматы — через Pillow.
+    """
+    try:
+        uploaded_file.seek(0)
+    except Exception:
+        pass
+
+    try:
+        tags = read_exif_header(uploaded_file)
+    except Exception:
+        return None, None, None, True
+    finally:
+        try:
+            uploaded_file.seek(0)
+        except Exception:
+            pass
+
+    if tags is None:
+        return _extract_exif_data_pillow(uploaded_file)
+
+    if not tags:
+        return None, None, None, True
+
+    photo_dt = _parse_exif_datetime(tags["DateTimeOriginal"] or tags["DateTime"])
+    lat = _gps_to_decimal(tags["GPSLatitude"], tags["GPSLatitudeRef"])
+    lon = _gps_to_decimal(tags["GPSLongitude"], tags["GPSLongitudeRef"])
+
+    return lat, lon, photo_dt, False
+
+
+def _extract_exif_data_pillow(uploaded_file) -> tuple[Optional[float], Optional[float], Optional[datetime], bool]:
+    """
+    Полный путь через Pillow (Image.open + _getexif) — для форматов,
+    которые не покрывает header-only ридер.
     """
     try:
         from PIL import Image, ExifTags  # type: ignore
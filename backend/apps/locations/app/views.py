@@ -4,6 +4,7 @@ from rest_framework import generics, permissions
 
 from apps.locations.models import Location
 from apps.locations.app.serializers import LocationSerializer
+from apps.api.resource_versions import FAMILY_LOCATIONS, conditional_on
 
 
 class ManagerLocationsListCreateView(generics.ListCreateAPIView):
@@ -27,6 +28,10 @@ class ManagerLocationsListCreateView(generics.ListCreateAPIView):
 
         return qs.order_by("id")
 
+    @conditional_on(FAMILY_LOCATIONS)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         user = self.request.user
         company = getattr(user, "company", None)
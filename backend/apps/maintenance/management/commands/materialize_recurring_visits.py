@@ -0,0 +1,135 @@
+"""
+Rolling-horizon materialization of recurring maintenance visits.
+
+Walks active RecurringVisitTemplates of all companies in keyset batches
+(by id) and generates the missing visits between today and
+today + --horizon-days, respecting template end_date and the status and
+period of the linked ServiceContract. Trial companies get at most their
+remaining job quota, earliest dates first; once it is used up their
+templates are skipped.
+
+Safe to run from cron on several nodes at once: every template is
+generated under a transaction-scoped advisory lock (PostgreSQL), a node
+that cannot take the lock skips the template, and the
+(template, scheduled_date) unique constraint rejects any duplicate.
+
+Usage:
+    python manage.py materialize_recurring_visits                     # 60 days ahead
+    python manage.py materialize_recurring_visits --horizon-days 90
+    python manage.py materialize_recurring_visits --dry-run           # count pending visits only
+"""
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.maintenance.models import RecurringVisitTemplate, ServiceContract
+from apps.maintenance.recurring import (
+    materialization_window,
+    materialize_template,
+    pending_visit_dates,
+)
+
+
+class Command(BaseCommand):
+    help = "Generate missing recurring maintenance visits up to N days ahead"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--horizon-days",
+            type=int,
+            default=60,
+            help="How many days ahead the schedule must be materialized (default: 60)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Templates per keyset batch (default: 200)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count pending visits, create nothing",
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        horizon_end = today + timedelta(days=max(0, options["horizon_days"]))
+        batch_size = max(1, options["batch_size"])
+        dry_run = options["dry_run"]
+        mode = "DRY-RUN" if dry_run else "APPLY"
+
+        # грубый отбор в SQL; точная проверка — под блокировкой шаблона
+        candidates = (
+            RecurringVisitTemplate.objects.filter(
+                is_active=True,
+                assigned_technician__isnull=False,
+                start_date__lte=horizon_end,
+            )
+            .filter(Q(end_date__isnull=True) | Q(end_date__gte=today))
+            .filter(Q(service_contract__isnull=True) | Q(service_contract__status=ServiceContract.STATUS_ACTIVE))
+        )
+
+        started = time.perf_counter()
+        scanned = touched = skipped = visits = 0
+        last_id = 0
+        # dry-run: сколько trial-квоты компании уже «потратили» предыдущие шаблоны
+        planned = defaultdict(int)
+        while True:
+            batch = list(
+                candidates.filter(pk__gt=last_id).order_by("pk").values_list("pk", flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1]
+
+            for template_id in batch:
+                scanned += 1
+                if dry_run:
+                    pending = self._pending_count(template_id, horizon_end, today, planned)
+                else:
+                    result = materialize_template(template_id, horizon_end, today)
+                    pending = None if result is None else result.generated_count
+
+                if pending is None:
+                    skipped += 1
+                elif pending:
+                    touched += 1
+                    visits += pending
+
+        elapsed = time.perf_counter() - started
+        rate = visits / elapsed if elapsed > 0 else 0.0
+        verb = "pending" if dry_run else "generated"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"[{mode}] horizon {horizon_end.isoformat()}: {scanned} templates scanned, "
+                f"{skipped} skipped, {visits} visits {verb} for {touched} templates "
+                f"in {elapsed:.2f}s ({rate:.1f} visits/s)"
+            )
+        )
+
+    def _pending_count(self, template_id, horizon_end, today, planned):
+        template = (
+            RecurringVisitTemplate.objects.select_related("company", "service_contract")
+            .filter(pk=template_id)
+            .first()
+        )
+        window = materialization_window(template, horizon_end, today) if template else None
+        if window is None:
+            return None
+        date_from, date_to = window
+        dates, _ = pending_visit_dates(template, date_to, date_from)
+
+        remaining = template.company.trial_jobs_remaining()
+        if remaining is None:
+            return len(dates)
+        remaining -= planned[template.company_id]
+        if remaining <= 0:
+            return None
+        count = min(len(dates), remaining)
+        planned[template.company_id] += count
+        return count
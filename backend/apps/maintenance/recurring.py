@@ -0,0 +1,260 @@
+"""
+Генерация визитов (Job) из RecurringVisitTemplate.
+
+Даты считаются в памяти, Job / JobChecklistItem / GeneratedVisitLog
+пишутся bulk_create — несколько запросов на любой горизонт вместо
+нескольких запросов на каждый визит.
+
+Идемпотентность держит unique (template, scheduled_date) у
+GeneratedVisitLog: лог пишется с ignore_conflicts, а джобы, чья дата
+уже занята параллельной генерацией, удаляются в той же транзакции.
+
+materialize_template — шаг rolling-horizon планировщика
+(manage.py materialize_recurring_visits): под advisory lock шаблона
+догенерирует визиты от сегодня до горизонта; у trial-компании — не больше
+оставшейся квоты джоб, ближайшие даты первыми.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.accounts.usage import adjust_usage, lock_usage
+from apps.jobs.models import Job
+from apps.maintenance.models import GeneratedVisitLog, RecurringVisitTemplate, ServiceContract
+
+logger = logging.getLogger(__name__)
+
+# старшие биты ключа pg advisory lock (младшие 40 — id шаблона)
+RECURRING_LOCK_NAMESPACE = 0x5256
+
+
+@dataclass
+class GenerationResult:
+    visits: list = field(default_factory=list)  # [(job_id, scheduled_date)]
+    skipped_count: int = 0
+    checklist_items_count: int = 0
+    duration_ms: float = 0.0
+
+    @property
+    def generated_count(self) -> int:
+        return len(self.visits)
+
+    @property
+    def visits_per_second(self) -> float:
+        if not self.visits or self.duration_ms <= 0:
+            return 0.0
+        return round(len(self.visits) / (self.duration_ms / 1000), 1)
+
+
+def visit_dates(template: RecurringVisitTemplate, date_to: date, date_from: date | None = None) -> list[date]:
+    """
+    Даты визитов от start_date до min(date_to, end_date) с шагом частоты;
+    date_from отсекает более ранние даты (сетка остаётся от start_date).
+    """
+    end_date = date_to
+    if template.end_date and template.end_date < end_date:
+        end_date = template.end_date
+
+    step = timedelta(days=template.get_interval_days())
+    dates = []
+    current = template.start_date
+    while current <= end_date:
+        if date_from is None or current >= date_from:
+            dates.append(current)
+        current += step
+    return dates
+
+
+def pending_visit_dates(template: RecurringVisitTemplate, date_to: date, date_from: date | None = None) -> tuple:
+    """(даты без визита, число уже сгенерированных дат в диапазоне)."""
+    candidates = visit_dates(template, date_to, date_from)
+    if not candidates:
+        return [], 0
+
+    existing_dates = set(
+        GeneratedVisitLog.objects.filter(
+            template=template,
+            scheduled_date__gte=candidates[0],
+            scheduled_date__lte=candidates[-1],
+        ).values_list("scheduled_date", flat=True)
+    )
+    dates = [d for d in candidates if d not in existing_dates]
+    return dates, len(candidates) - len(dates)
+
+
+def generate_visits(
+    template: RecurringVisitTemplate,
+    date_to: date,
+    generated_by=None,
+    date_from: date | None = None,
+    limit: int | None = None,
+) -> GenerationResult:
+    """
+    Создаёт недостающие визиты шаблона до date_to включительно
+    (и не раньше date_from, если задан); limit — не больше стольких
+    визитов, ближайшие даты первыми.
+    Повторный вызов с тем же date_to ничего не создаёт.
+    """
+    started = time.perf_counter()
+    result = GenerationResult()
+
+    dates, result.skipped_count = pending_visit_dates(template, date_to, date_from)
+    if limit is not None:
+        dates = dates[:limit]
+
+    if dates:
+        checklist_template_id = template.checklist_template_id
+        # шаблон чужой компании не копируем (см. Job.clean)
+        if checklist_template_id and template.checklist_template.company_id != template.company_id:
+            checklist_template_id = None
+
+        with transaction.atomic():
+            jobs = Job.objects.bulk_create(
+                [
+                    Job(
+                        company_id=template.company_id,
+                        location_id=template.location_id,
+                        asset_id=template.asset_id,
+                        cleaner_id=template.assigned_technician_id,
+                        scheduled_date=visit_date,
+                        scheduled_start_time=template.scheduled_start_time,
+                        scheduled_end_time=template.scheduled_end_time,
+                        status=Job.STATUS_SCHEDULED,
+                        context=Job.CONTEXT_MAINTENANCE,
+                        maintenance_category_id=template.maintenance_category_id,
+                        manager_notes=template.manager_notes,
+                        checklist_template_id=checklist_template_id,
+                        # bulk_create не вызывает save() — snapshot делаем сами ниже
+                        checklist_snapshot_taken=bool(checklist_template_id),
+                    )
+                    for visit_date in dates
+                ],
+                batch_size=500,
+            )
+            # bulk_create не шлёт post_save — счётчик двигаем сами
+            adjust_usage(template.company_id, jobs_count=len(jobs))
+
+            GeneratedVisitLog.objects.bulk_create(
+                [
+                    GeneratedVisitLog(
+                        template=template,
+                        job_id=job.id,
+                        scheduled_date=job.scheduled_date,
+                        generated_by=generated_by,
+                    )
+                    for job in jobs
+                ],
+                batch_size=500,
+                ignore_conflicts=True,
+            )
+
+            # какие даты достались нам, а какие — параллельной генерации
+            owned_job_ids = set(
+                GeneratedVisitLog.objects.filter(
+                    template=template,
+                    scheduled_date__gte=dates[0],
+                    scheduled_date__lte=dates[-1],
+                ).values_list("job_id", flat=True)
+            )
+            lost_ids = [job.id for job in jobs if job.id not in owned_job_ids]
+            if lost_ids:
+                Job.objects.filter(pk__in=lost_ids).delete()
+
+            result.visits = [(job.id, job.scheduled_date) for job in jobs if job.id in owned_job_ids]
+            result.skipped_count += len(lost_ids)
+            result.checklist_items_count = Job.snapshot_checklists(
+                {job_id: checklist_template_id for job_id, _ in result.visits}
+            )
+
+    result.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(
+        "Generated %d visits for RecurringVisitTemplate(id=%s) in %.1f ms (%.1f visits/s, %d skipped)",
+        result.generated_count,
+        template.id,
+        result.duration_ms,
+        result.visits_per_second,
+        result.skipped_count,
+    )
+    return result
+
+
+def materialization_window(template: RecurringVisitTemplate, horizon_end: date, today: date | None = None):
+    """
+    (date_from, date_to) для планировщика или None, если шаблону сейчас
+    нечего генерировать: неактивен, нет техника (Job.cleaner обязателен),
+    компания заблокирована, исчерпала trial-квоту джоб или привязанный
+    контракт не active. Окно сужается до срока контракта.
+    """
+    today = today or timezone.localdate()
+    if not template.is_active or not template.assigned_technician_id:
+        return None
+    if template.company.is_blocked() or template.company.trial_jobs_remaining() == 0:
+        return None
+
+    date_from, date_to = today, horizon_end
+    contract = template.service_contract
+    if contract is not None:
+        if contract.status != ServiceContract.STATUS_ACTIVE:
+            return None
+        date_from = max(date_from, contract.start_date)
+        if contract.end_date:
+            date_to = min(date_to, contract.end_date)
+
+    if date_from > date_to:
+        return None
+    return date_from, date_to
+
+
+def _try_lock_template(template_id) -> bool:
+    """
+    Транзакционный advisory lock шаблона на Postgres: второй узел cron не
+    ждёт, а пропускает шаблон. На остальных БД блокировки нет — запись
+    сериализует сама БД, дубли отсекает unique у GeneratedVisitLog.
+    """
+    if connection.vendor != "postgresql":
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_try_advisory_xact_lock(%s)",
+            [(RECURRING_LOCK_NAMESPACE << 40) | template_id],
+        )
+        return cursor.fetchone()[0]
+
+
+def materialize_template(template_id, horizon_end: date, today: date | None = None):
+    """
+    Догенерирует визиты шаблона в окне [today, horizon_end].
+    None — шаблон занят другим узлом или генерировать нечего.
+    """
+    with transaction.atomic():
+        if not _try_lock_template(template_id):
+            return None
+
+        # перечитываем под блокировкой: шаблон могли выключить
+        template = (
+            RecurringVisitTemplate.objects.select_related("company", "checklist_template", "service_contract")
+            .filter(pk=template_id)
+            .first()
+        )
+        if template is None:
+            return None
+
+        company = template.company
+        if company.is_trial_active:
+            # квоту trial делят все шаблоны компании — другие узлы ждут,
+            # пока эта генерация не закоммитит свои джобы
+            lock_usage(company)
+
+        window = materialization_window(template, horizon_end, today)
+        if window is None:
+            return None
+
+        date_from, date_to = window
+        return generate_visits(
+            template, date_to, date_from=date_from, limit=company.trial_jobs_remaining()
+        )
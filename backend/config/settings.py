@@ -187,6 +187,31 @@ MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
 
+# Раздача media через /api/media/<key> (apps/api/views_media.py):
+# Django авторизует, байты отдаёт прокси.
+#   MEDIA_ACCEL_REDIRECT_PREFIX — nginx internal location, напр. "/_protected_media/"
+#   MEDIA_SENDFILE_HEADER       — "X-Sendfile" (Apache mod_xsendfile)
+# MEDIA_PROTECTED_URLS=True — API отдаёт ссылки на /api/media/ вместо MEDIA_URL.
+
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX", "")
+MEDIA_SENDFILE_HEADER = os.getenv("MEDIA_SENDFILE_HEADER", "")
+MEDIA_PROTECTED_URLS = os.getenv("MEDIA_PROTECTED_URLS", "False").lower() in ("true", "1", "yes")
+
+
+# Direct-to-storage загрузка фото (подписанный PUT, см. apps/jobs/direct_upload.py)
+# "local" — PUT на /api/uploads/photos/<token>/ (dev / тесты)
+# ""      — выключена (upload-slot отвечает 404, клиент грузит multipart);
+#           по умолчанию вне DEBUG, включается явно
+
+PHOTO_DIRECT_UPLOAD_BACKEND = os.getenv("PHOTO_DIRECT_UPLOAD_BACKEND", "local" if DEBUG else "")
+PHOTO_DIRECT_UPLOAD_EXPIRES = int(os.getenv("PHOTO_DIRECT_UPLOAD_EXPIRES", "900"))
+PHOTO_DIRECT_UPLOAD_MAX_BYTES = int(os.getenv("PHOTO_DIRECT_UPLOAD_MAX_BYTES", str(25 * 1024 * 1024)))
+
+# Пул потоков для обработки фото после upload (apps/jobs/photo_processing.py);
+# 0 — обрабатывать синхронно в on_commit (тесты / отладка)
+PHOTO_PROCESSING_WORKERS = int(os.getenv("PHOTO_PROCESSING_WORKERS", "2"))
+
+
 # Default primary key field type
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -194,6 +219,9 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # DRF
 
+# API_FAST_JSON=False — вернуть стандартный DRF JSONRenderer (orjson не используется)
+API_FAST_JSON = os.getenv("API_FAST_JSON", "True").lower() in ("true", "1", "yes")
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.TokenAuthentication",
@@ -202,6 +230,10 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "apps.api.renderers.FastJSONRenderer" if API_FAST_JSON else "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
 
 